@@ -0,0 +1,171 @@
+"""
+bench_parse.py
+
+Microbenchmark of convert.jboss_command_to_http_request parse throughput in commands/sec
+
+The original regex based parser is kept here, unchanged apart from raising ValueError instead of exiting, so the
+single pass parser can be compared against it on the commands both of them understand
+
+Usage:
+    python -m benchmarks.bench_parse [--seconds 1.0]
+"""
+
+import convert.convert as convert
+import argparse
+import logging
+import re
+import time
+
+COMMANDS = [
+    ':read-resource',
+    ':read-attribute(name=server-state)',
+    '/subsystem=undertow:read-resource()',
+    '/subsystem=undertow/server=default-server:read-attribute(name=default-host)',
+    '/subsystem=datasources/data-source=ExampleDS/statistics=pool:read-resource(include-runtime=true)',
+    '/subsystem=datasources/data-source=ExampleDS:write-attribute(name=max-pool-size,value=50)',
+    '/core-service=management/service=configuration-changes:add(max-history=200)',
+    ':read-operation-description(name=whoami,access-control=true)',
+]
+
+# Commands with quoted, escaped and nested values that only the single pass parser understands
+COMPLEX_COMMANDS = [
+    '/subsystem=naming/binding="java:global/ExampleDS":add(binding-type=simple,value="a,b")',
+    '/interface=public:write-attribute(name=inet-address,value=${jboss.bind.address:127.0.0.1})',
+    '/subsystem=logging/logger=org.jboss:add(handlers=[FILE,"CONSOLE"],level=INFO)',
+    '/subsystem=datasources/data-source=ExampleDS:write-attribute(name=pool,value={min=1,max=5})',
+]
+
+
+def legacy_jboss_command_to_http_request(cli_call, request_type):
+    """The original convert.jboss_command_to_http_request"""
+
+    logging.debug(f'Full CLI call: {cli_call}')
+    logging.debug(f'Using HTTP Request: {request_type}')
+
+    operation_no_args, path, args = None, None, None
+
+    if cli_call.count(':') < 1:
+        raise ValueError(cli_call)
+
+    elif cli_call.count(':') > 1:
+        raise ValueError(cli_call)
+
+    elif cli_call.startswith(':'):
+        logging.debug('Executing standalone operation')
+
+        cli_call = cli_call.split(':', 1)[1]
+        operation_no_args, args = legacy_get_operation_and_args(cli_call, request_type)
+
+    elif cli_call.startswith('/') and cli_call.count(':') == 1:
+        logging.debug('We have a path and an operation defined')
+
+        isolated_operation = cli_call.split(':')[1]
+        isolated_path = cli_call.split(':')[0]
+
+        operation_no_args, args = legacy_get_operation_and_args(isolated_operation, request_type)
+        path = legacy_get_path_to_resource(isolated_path, request_type)
+
+    else:
+        raise ValueError(cli_call)
+
+    if request_type == "GET":
+        operation_no_args = operation_no_args.split('-', 1)[1]
+
+    logging.debug(f'Path: {path}')
+    logging.debug(f'Operation: {operation_no_args}')
+    logging.debug(f'Arguments: {args}')
+
+    api_call = {"operation": operation_no_args}
+
+    if args is not None:
+        api_call = {**api_call, **args}
+
+    if path is not None:
+        api_call = {**api_call, "address": path}
+
+    logging.debug(f'API call being returned: {api_call}')
+
+    return api_call
+
+
+def legacy_get_operation_and_args(isolated_operation, request_type):
+    """The original convert.get_operation_and_args"""
+
+    re_empty_args = re.compile(r'\(\)')
+    re_no_args = re.compile(r'^[^\(]+')
+    re_args = re.compile(r'\(([^)]+)\)')
+    args = None
+
+    if '(' not in isolated_operation:
+        operation_no_args = isolated_operation
+
+    elif re_empty_args.search(isolated_operation):
+        operation_no_args = re_no_args.search(isolated_operation)
+        operation_no_args = operation_no_args.group(0)
+
+    else:
+        operation_no_args = re_no_args.search(isolated_operation)
+        operation_no_args = operation_no_args.group(0)
+        arguments = re_args.search(isolated_operation)
+        arguments = arguments.group(1)
+
+        args = dict(item.split("=") for item in arguments.split(','))
+
+    logging.debug(f'Found operation: {operation_no_args}')
+    logging.debug(f'Found arguments: {args}')
+
+    return operation_no_args, args
+
+
+def legacy_get_path_to_resource(isolated_path, request_type):
+    """The original convert.get_path_to_resource"""
+
+    if request_type == "GET":
+        path = isolated_path.replace('=', '/')
+
+    else:
+        path = re.split(r'/|=', isolated_path)
+        path = list(filter(None, path))
+
+    logging.debug(f'Original full path: {isolated_path}')
+    logging.debug(f'Modified return path: {path}')
+
+    return path
+
+
+def throughput(parse, commands, seconds):
+    """Returns how many commands per second parse converts, running for roughly the given number of seconds"""
+
+    calls = [(command, convert.get_request_type(command)) for command in commands]
+    parsed = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+
+    while time.perf_counter() < deadline:
+        for command, request_type in calls:
+            parse(command, request_type)
+
+        parsed += len(calls)
+
+    return parsed / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JBOSS CLI command parse throughput")
+    parser.add_argument("--seconds", type=float, default=1.0, help="How long to run each benchmark (default: 1.0)")
+    args = parser.parse_args()
+
+    # Both parsers log at debug level, which is disabled here just as it is at the INFO level set by jboss_api
+    legacy = throughput(legacy_jboss_command_to_http_request, COMMANDS, args.seconds)
+    current = throughput(convert.jboss_command_to_http_request, COMMANDS, args.seconds)
+
+    print(f'legacy parser:      {legacy:12,.0f} commands/sec')
+    print(f'single pass parser: {current:12,.0f} commands/sec')
+    print(f'speedup:            {current / legacy:12.2f}x')
+
+    complex_values = throughput(convert.jboss_command_to_http_request, COMPLEX_COMMANDS, args.seconds)
+    print(f'single pass parser, quoted and nested values: {complex_values:12,.0f} commands/sec')
+
+
+if __name__ == '__main__':
+    main()
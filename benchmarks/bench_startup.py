@@ -0,0 +1,123 @@
+"""
+bench_startup.py
+
+Cold start benchmark of jboss_api.py, measured with python -X importtime and tracked against a budget
+
+Benchmarks:
+    import: time to import jboss_api, which must not import the HTTP stack
+    dry-run: time spent importing modules by ./jboss_api.py --dry-run, on top of the interpreter's own startup
+    process: wall time of the whole ./jboss_api.py --dry-run process
+
+Each is the median of several runs in fresh interpreters. The run fails when a median is over its budget, or when
+any of HTTP_MODULES was imported by the dry run.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 7]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Milliseconds, with room for a noisy machine but well below the 250ms jboss_api took to import with requests
+BUDGET_MS = {
+    "import": 120,
+    "dry-run": 120,
+    "process": 300,
+}
+
+# Modules the parse only path must never import
+HTTP_MODULES = ("requests", "urllib3", "asyncio", "jboss_client")
+
+DRY_RUN_COMMAND = '/subsystem=undertow/server=default-server:read-attribute(name=default-host)'
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(arguments):
+    """Runs python -X importtime with arguments and returns { top level module: cumulative microseconds }
+
+    Modules imported by the interpreter before site finished loading are left out, so only what jboss_api.py itself
+    imports is counted
+    """
+
+    modules = {}
+    started = False
+
+    for line in _importtime(arguments):
+        _, cumulative, name = line.split("|")
+
+        # Nested imports are indented below the module importing them
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+
+        if started:
+            modules[name.strip()] = int(cumulative)
+
+        started = started or name.strip() == "site"
+
+    return modules
+
+
+def imported_modules(arguments):
+    """Returns the names of every module imported when running python -X importtime with arguments"""
+
+    return {line.split("|")[2].strip() for line in _importtime(arguments)}
+
+
+def _importtime(arguments):
+    """Returns the -X importtime lines written by running python with arguments"""
+
+    process = subprocess.run([sys.executable, "-X", "importtime"] + arguments, cwd=ROOT, capture_output=True,
+                             text=True, check=True)
+
+    return [line for line in process.stderr.splitlines() if line.startswith("import time:") and line.count("|") == 2]
+
+
+def run(runs):
+    """Returns { benchmark: median milliseconds } and the HTTP modules imported by the dry run"""
+
+    dry_run = ["jboss_api.py", "--dry-run", DRY_RUN_COMMAND]
+    samples = {name: [] for name in BUDGET_MS}
+
+    for _ in range(runs):
+        samples["import"].append(import_times(["-c", "import jboss_api"])["jboss_api"] / 1000)
+        samples["dry-run"].append(sum(import_times(dry_run).values()) / 1000)
+
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + dry_run, cwd=ROOT, capture_output=True, check=True)
+        samples["process"].append((time.perf_counter() - start) * 1000)
+
+    leaked = sorted(module for module in imported_modules(dry_run) if module.split('.')[0] in HTTP_MODULES)
+
+    return {name: statistics.median(values) for name, values in samples.items()}, leaked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cold start of jboss_api.py against a budget")
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters per benchmark (default: 7)")
+    args = parser.parse_args()
+
+    results, leaked = run(args.runs)
+    over = []
+
+    for name, milliseconds in results.items():
+        status = "ok"
+        if milliseconds > BUDGET_MS[name]:
+            status = "OVER BUDGET"
+            over.append(name)
+
+        print(f'{name:<10}{milliseconds:>10.1f} ms  budget {BUDGET_MS[name]:>5} ms  {status}')
+
+    if leaked:
+        print(f'--dry-run imported the HTTP stack: {", ".join(leaked)}')
+
+    if over or leaked:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+"""
+bench_suite.py
+
+End to end benchmarks of the JBOSS CLI to HTTP API client against the local stand-in server, benchmarks/standin.py
+
+Benchmarks:
+    parse: convert.jboss_command_to_http_request throughput in commands/sec
+    latency: p50 and p99 of single read-attribute calls through JBossClient.execute in milliseconds
+    batch: jboss_api.call_jboss_api_batch throughput in commands/sec, one and several commands in flight
+    fleet: jboss_fleet.run_fleet throughput in commands/sec against several stand-in hosts
+    memory: peak Python memory in MB of reading a large recursive read-resource, whole and streamed
+
+Results can be saved as a baseline and later runs compared against it, failing when any benchmark regressed by more
+than the threshold. Timings depend on the machine, so baselines are only meaningful on the machine that saved them.
+
+Usage:
+    python -m benchmarks.bench_suite [--seconds 1.0] [--latency 0] [--only parse latency ...]
+    python -m benchmarks.bench_suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_suite --compare benchmarks/baseline.json [--threshold 0.2]
+"""
+
+from benchmarks.bench_parse import COMMANDS, throughput
+from benchmarks.standin import StandInServer
+from jboss_client import JBossClient
+from jboss_fleet import run_fleet
+import convert.convert as convert
+import jboss_api
+import argparse
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+USER = "admin"
+PASSWORD = "admin"
+
+LATENCY_COMMAND = ':read-attribute(name=server-state)'
+
+BATCH_COMMANDS = [
+    ':read-attribute(name=server-state)',
+    '/subsystem=undertow:read-resource',
+    '/subsystem=undertow/server=default-server:write-attribute(name=default-host,value=default-host)',
+    ':whoami',
+]
+
+FLEET_HOSTS = 4
+MEMORY_PAYLOAD_SIZE = 8 * 1024 * 1024
+
+# Which direction is an improvement, for each unit
+HIGHER_IS_BETTER = {"commands/sec": True, "ms": False, "MB": False}
+
+
+def bench_parse(seconds, latency):
+    """Returns the parse throughput results"""
+
+    return {"parse": (throughput(convert.jboss_command_to_http_request, COMMANDS, seconds), "commands/sec")}
+
+
+def bench_latency(seconds, latency):
+    """Returns the p50 and p99 latency of single calls over a kept alive connection"""
+
+    with StandInServer(user=USER, password=PASSWORD, latency=latency) as server:
+        client = JBossClient(server.url, server.port, USER, PASSWORD, single_flight=False)
+
+        # The first call pays for the connection and the digest challenge
+        client.execute(LATENCY_COMMAND)
+
+        samples = []
+        deadline = time.perf_counter() + seconds
+
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            client.execute(LATENCY_COMMAND)
+            samples.append(time.perf_counter() - start)
+
+        client.close()
+
+    samples.sort()
+
+    return {
+        "latency-p50": (samples[len(samples) // 2] * 1000, "ms"),
+        "latency-p99": (samples[min(len(samples) - 1, len(samples) * 99 // 100)] * 1000, "ms"),
+    }
+
+
+def bench_batch(seconds, latency):
+    """Returns the throughput of call_jboss_api_batch with 1 and 8 commands in flight"""
+
+    results = {}
+
+    with StandInServer(user=USER, password=PASSWORD, latency=latency) as server:
+        jboss_api.JBOSS_URL, jboss_api.JBOSS_PORT = server.url, str(server.port)
+        jboss_api.API_AUTH_USER, jboss_api.API_AUTH_PWD = USER, PASSWORD
+
+        for max_in_flight in (1, 8):
+            commands = 0
+            deadline = time.perf_counter() + seconds
+            start = time.perf_counter()
+
+            while time.perf_counter() < deadline:
+                jboss_api.call_jboss_api_batch(BATCH_COMMANDS * 25, io.StringIO(), max_in_flight)
+                commands += len(BATCH_COMMANDS) * 25
+
+            results[f'batch-{max_in_flight}'] = (commands / (time.perf_counter() - start), "commands/sec")
+
+        jboss_api.get_client().close()
+
+    return results
+
+
+def bench_fleet(seconds, latency):
+    """Returns the throughput of run_fleet across several stand-in hosts"""
+
+    servers = [StandInServer(user=USER, password=PASSWORD, latency=latency).start() for _ in range(FLEET_HOSTS)]
+    inventory = [{"url": server.url, "port": str(server.port), "user": USER, "password": PASSWORD}
+                 for server in servers]
+
+    try:
+        commands = 0
+        deadline = time.perf_counter() + seconds
+        start = time.perf_counter()
+
+        while time.perf_counter() < deadline:
+            commands += len(run_fleet(inventory, BATCH_COMMANDS * 5))
+
+        return {"fleet": (commands / (time.perf_counter() - start), "commands/sec")}
+
+    finally:
+        for server in servers:
+            server.stop()
+
+
+def bench_memory(seconds, latency):
+    """Returns the peak memory of reading a large recursive read-resource whole and as streamed records"""
+
+    command = ':read-resource(recursive=true)'
+    results = {}
+
+    with StandInServer(user=USER, password=PASSWORD, payload_size=MEMORY_PAYLOAD_SIZE) as server:
+        client = JBossClient(server.url, server.port, USER, PASSWORD)
+
+        # Builds the cached response body of the server and the digest challenge outside of the measurement
+        client.execute(command)
+
+        for name, read in (("memory-whole", lambda: client.execute(command)),
+                           ("memory-stream", lambda: sum(1 for _ in client.stream_records(command)))):
+            tracemalloc.start()
+            read()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            results[name] = (peak / 1024 / 1024, "MB")
+
+        client.close()
+
+    return results
+
+
+BENCHMARKS = {
+    "parse": bench_parse,
+    "latency": bench_latency,
+    "batch": bench_batch,
+    "fleet": bench_fleet,
+    "memory": bench_memory,
+}
+
+
+def run(names, seconds, latency):
+    """Returns { benchmark: { value, unit } } for the named benchmarks"""
+
+    results = {}
+
+    for name in names:
+        for result, (value, unit) in BENCHMARKS[name](seconds, latency).items():
+            results[result] = {"value": round(value, 3), "unit": unit}
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Returns a line per benchmark comparing results with baseline, and the names of the regressed benchmarks
+
+    Parameters
+    ----------
+    results: dict
+        As returned by run
+    baseline: dict
+        Results saved by an earlier run
+    threshold: float
+        Relative change in the wrong direction counted as a regression, E.g 0.2 for 20%
+
+    """
+
+    lines, regressions = [], []
+
+    for name, result in results.items():
+        previous = baseline.get(name)
+
+        if previous is None or not previous["value"]:
+            lines.append(f'{name:<16}{result["value"]:>14,.3f} {result["unit"]:<14}(no baseline)')
+            continue
+
+        change = (result["value"] - previous["value"]) / previous["value"]
+        worse = -change if HIGHER_IS_BETTER[result["unit"]] else change
+
+        status = "ok"
+        if worse > threshold:
+            status = "REGRESSION"
+            regressions.append(name)
+
+        lines.append(f'{name:<16}{result["value"]:>14,.3f} {result["unit"]:<14}'
+                     f'{previous["value"]:>14,.3f} {change:>+8.1%}  {status}')
+
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the JBOSS client against a local stand-in server")
+    parser.add_argument("--seconds", type=float, default=1.0, help="How long to run each benchmark (default: 1.0)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds the stand-in server takes per operation (default: 0)")
+    parser.add_argument("--only", nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help="Benchmarks to run (default: all)")
+    parser.add_argument("--save-baseline", metavar="FILE", help="Save the results as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help="Compare the results with a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown counted as a regression by --compare (default: 0.2)")
+    args = parser.parse_args()
+
+    results = run(args.only, args.seconds, args.latency)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+
+        lines, regressions = compare(results, baseline, args.threshold)
+        print('\n'.join(lines))
+
+        if regressions:
+            print(f'Regressed by more than {args.threshold:.0%}: {", ".join(regressions)}')
+            sys.exit(1)
+
+    else:
+        for name, result in results.items():
+            print(f'{name:<16}{result["value"]:>14,.3f} {result["unit"]}')
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as baseline_file:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "seconds": args.seconds,
+                "latency": args.latency,
+                "results": results
+            }, baseline_file, indent=2)
+            baseline_file.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+bench_transport.py
+
+Bytes on the wire and decode time of large read-resource responses, for every transport and compression
+
+Benchmarks, for json and dmr (application/dmr-encoded), each plain and gzip compressed:
+    decode: the response body of a recursive read of many data sources, shaped like a real datasources subsystem with
+    the same attribute names repeated in every resource. Reports its size on the wire and the median milliseconds to
+    decompress and decode it
+    http: the same JBossClient.execute of :read-resource(recursive=true) against the local stand-in server, reporting
+    the bytes the client received and the median milliseconds of the whole request
+
+Usage:
+    python -m benchmarks.bench_transport [--resources 2000] [--payload-size 4194304] [--runs 5]
+"""
+
+from benchmarks.standin import StandInServer
+from jboss_client import JBossClient
+from jboss_dmr import TRANSPORTS, from_base64, to_base64
+import argparse
+import gzip
+import json
+import statistics
+import time
+
+USER = "admin"
+PASSWORD = "admin"
+
+HTTP_COMMAND = ':read-resource(recursive=true)'
+
+# gzip level of undertow's default Deflater
+COMPRESSION_LEVEL = 6
+
+STATISTICS_ENABLED = {
+    "EXPRESSION_VALUE": "${wildfly.datasources.statistics-enabled:${wildfly.statistics-enabled:false}}"
+}
+
+
+def data_source(position):
+    """Returns the attributes of a generated data source, with the values a default WildFly data source has"""
+
+    return {
+        "allocation-retry": None, "allocation-retry-wait-millis": None, "allow-multiple-users": False,
+        "background-validation": None, "background-validation-millis": None, "blocking-timeout-wait-millis": None,
+        "capacity-decrementer-class": None, "capacity-incrementer-class": None, "check-valid-connection-sql": None,
+        "connectable": False, "connection-listener-class": None, "connection-properties": None,
+        "connection-url": f'jdbc:h2:mem:test-{position}', "datasource-class": None, "driver-class": None,
+        "driver-name": "h2", "enabled": True, "enlistment-trace": False, "exception-sorter-class-name": None,
+        "flush-strategy": None, "idle-timeout-minutes": None, "initial-pool-size": None,
+        "jndi-name": f'java:jboss/datasources/DataSource{position}', "jta": True, "max-pool-size": 20,
+        "mcp": "org.jboss.jca.core.connectionmanager.pool.mcp.LeakDumperManagedConnectionPool", "min-pool-size": 0,
+        "password": "sa", "pool-fair": None, "pool-prefill": None, "pool-use-strict-min": None, "query-timeout": None,
+        "share-prepared-statements": False, "spy": False, "statistics-enabled": STATISTICS_ENABLED,
+        "track-statements": "NOWARN", "tracking": False, "transaction-isolation": None, "use-ccm": True,
+        "use-fast-fail": False, "user-name": "sa", "validate-on-match": None,
+    }
+
+
+def model(resources):
+    """Returns the { outcome, result } of a recursive read of a datasources subsystem with resources data sources"""
+
+    return {"outcome": "success", "result": {"subsystem": {"datasources": {
+        "data-source": {f'DataSource{position}': data_source(position) for position in range(resources)},
+        "jdbc-driver": {"h2": {"driver-name": "h2", "driver-module-name": "com.h2database.h2"}},
+    }}}}
+
+
+def bench_decode(resources, runs):
+    """Returns { variant: (bytes on the wire, median decode milliseconds) } for a recursive read of resources"""
+
+    value = model(resources)
+    bodies = {"json": json.dumps(value).encode(), "dmr": to_base64(value)}
+    decoders = {"json": json.loads, "dmr": from_base64}
+
+    results = {}
+
+    for transport in TRANSPORTS:
+        for compressed in (False, True):
+            body = gzip.compress(bodies[transport], COMPRESSION_LEVEL) if compressed else bodies[transport]
+            samples = []
+
+            for _ in range(runs):
+                start = time.perf_counter()
+                decoded = decoders[transport](gzip.decompress(body) if compressed else body)
+                samples.append((time.perf_counter() - start) * 1000)
+
+            assert decoded == value
+            results[_variant(transport, compressed)] = (len(body), statistics.median(samples))
+
+    return results
+
+
+def bench_http(payload_size, runs):
+    """Returns { variant: (bytes received, median request milliseconds) } of recursive reads from the stand-in"""
+
+    results = {}
+
+    with StandInServer(payload_size=payload_size, gzip=True) as server:
+        for transport in TRANSPORTS:
+            for compressed in (False, True):
+                with JBossClient(server.url, server.port, USER, PASSWORD, transport=transport,
+                                 compress=compressed) as client:
+                    # The first request answers the digest challenge and opens the connection
+                    client.execute(HTTP_COMMAND)
+                    received = client.stats()[f'{server.url}:{server.port}/management']["bytes_received"]
+                    samples = []
+
+                    for _ in range(runs):
+                        start = time.perf_counter()
+                        client.execute(HTTP_COMMAND)
+                        samples.append((time.perf_counter() - start) * 1000)
+
+                results[_variant(transport, compressed)] = (received, statistics.median(samples))
+
+    return results
+
+
+def _variant(transport, compressed):
+    return f'{transport}+gzip' if compressed else transport
+
+
+def _print(title, results, unit):
+    print(title)
+
+    baseline = results["json"][0]
+    for variant, (size, milliseconds) in results.items():
+        print(f'  {variant:<10}{size:>12,} bytes {size / baseline:>7.1%} of json  {milliseconds:>8.1f} ms {unit}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bytes on the wire and decode time of each transport")
+    parser.add_argument("--resources", type=int, default=2000,
+                        help="Data sources in the decoded read-resource (default: 2000)")
+    parser.add_argument("--payload-size", type=int, default=4 * 1024 * 1024,
+                        help="Approximate size of the stand-in's read-resource result in bytes (default: 4194304)")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per variant (default: 5)")
+    args = parser.parse_args()
+
+    _print(f'decode: recursive read of {args.resources} data sources', bench_decode(args.resources, args.runs),
+           "to decode")
+    _print(f'http: {HTTP_COMMAND} of ~{args.payload_size:,} bytes from the stand-in',
+           bench_http(args.payload_size, args.runs), "per request")
+
+
+if __name__ == '__main__':
+    main()
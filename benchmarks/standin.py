@@ -0,0 +1,681 @@
+"""
+standin.py
+
+Local stand-in for the JBOSS HTTP management endpoint, for benchmarks and tests without a real WildFly
+
+Only what the client relies on is implemented:
+    Digest authentication (MD5, qop=auth) against a single user, answering a 401 challenge like JBOSS
+    HTTP GET /management/<address>?operation=<name> for the read operations JBOSS allows over GET, answering with
+    the bare result on success
+    HTTP POST /management with a JSON operation, answering with { outcome, result }
+    application/dmr-encoded operations and results, as the content type and Accept header of a request ask for
+    gzip compressed responses for clients sending Accept-Encoding: gzip, when started with gzip enabled
+    HTTP POST /management-upload with a multipart/form-data operation and file, adding or replacing a deployment
+    Composite operations, answering with a step-N result per step
+    Wildcard addresses such as /host=*/server=* for the read operations JBOSS expands itself, answering with a list
+    of { address, outcome, result }
+    500 answers with { outcome: failed, failure-description } for unknown resources and operations
+
+Any address containing a path element named missing is unknown, and every resource type has the children listed
+in CHILDREN. The results of read-resource are generated: every
+resource has attributes filling roughly payload_size bytes, and recursive reads of the root include a tree of
+child resources of about the same total size, so response sizes can be chosen from the command line. Deployments
+only exist once uploaded, and their read-resource returns the SHA-1 of their content.
+
+Tests can serve a management model of their own instead, the attributes of each resource by address. The operations
+in MODEL_OPERATIONS then read and change it as JBOSS would, a failed composite operation leaves it unchanged, and
+when the model has a CONFIGURATION_CHANGES resource with a max-history attribute, list-changes returns the history
+of the writes, newest first.
+
+Usage:
+    python -m benchmarks.standin [--port 9990] [--latency 0.005] [--payload-size 1024] [--gzip]
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+import argparse
+import base64
+import contextlib
+import gzip
+import hashlib
+import jboss_dmr
+import json
+import os
+import re
+import threading
+import time
+
+REALM = "ManagementRealm"
+
+# Operations served over HTTP GET, by the name used in the URL
+GET_OPERATIONS = {
+    "attribute": "read-attribute",
+    "resource": "read-resource",
+    "resource-description": "read-resource-description",
+    "snapshots": "list-snapshots",
+    "operation-names": "read-operation-names",
+}
+
+KNOWN_OPERATIONS = set(GET_OPERATIONS.values()) | {
+    "whoami", "write-attribute", "undefine-attribute", "add", "remove", "reload", "read-children-names",
+    "read-children-types", "read-children-resources", "read-operation-description", "composite",
+    "full-replace-deployment", "list-changes", "deploy", "undeploy"
+}
+
+# Operations answered from the model of a stand-in started with one
+MODEL_OPERATIONS = {
+    "read-resource", "read-attribute", "write-attribute", "undefine-attribute", "add", "remove", "read-children-names",
+    "read-children-types", "list-changes"
+}
+
+WRITE_OPERATIONS = {"write-attribute", "undefine-attribute", "add", "remove"}
+
+# Address of the configuration change history, see /subsystem=core-management/service=configuration-changes
+CONFIGURATION_CHANGES = ("subsystem", "core-management", "service", "configuration-changes")
+
+# Arguments of an add operation that are not attributes of the new resource
+OPERATION_ARGUMENTS = {"operation", "address", "operation-headers", "json.pretty"}
+
+RE_DIGEST_FIELD = re.compile(r'(\w+)=(?:"([^"]*)"|([^\s,]+))')
+
+RE_BOUNDARY = re.compile(r'boundary="?([^";]+)"?')
+
+# Attributes per child resource in generated recursive results
+CHILD_ATTRIBUTES = 8
+
+# Names of the children of every resource type, as returned by read-children-names and matched by wildcards
+CHILDREN = ("child-0", "child-1")
+
+WILDCARD_OPERATIONS = {"read-resource", "read-attribute", "read-resource-description"}
+
+
+class StandInServer:
+    """Stand-in JBOSS management endpoint running in a background thread
+
+    Parameters
+    ----------
+    port: int
+        Port to listen on, 0 picks a free one
+    user: str
+        User accepted by digest authentication
+    password: str
+        Password of the user
+    latency: float
+        Seconds every operation takes, E.g to simulate server processing
+    payload_size: int
+        Approximate size in bytes of a read-resource result
+    gzip: bool
+        Compress the responses of clients accepting gzip, as JBOSS does
+    model: dict
+        Attributes of each resource by address, E.g {("subsystem", "undertow"): {"statistics-enabled": False}},
+        served instead of generated resources. Resources between the root and a listed address exist too
+    not_found_status: int
+        HTTP status of a read sent with HTTP GET of a resource that does not exist, E.g 404 as some servers answer
+
+    """
+
+    def __init__(self, port=0, user="admin", password="admin", latency=0.0, payload_size=1024, gzip=False,
+                 model=None, not_found_status=500):
+        self.user = user
+        self.password = password
+        self.latency = latency
+        self.payload_size = payload_size
+        self.gzip = gzip
+        self.not_found_status = not_found_status
+        self.nonce = hashlib.md5(os.urandom(16)).hexdigest()
+        self.requests = 0
+        self.uploads = 0
+
+        # Operations being served right now, and the most there ever were at the same time
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        # SHA-1 digest of the content of every deployment, by name, and the names of those that are not enabled
+        self.deployments = {}
+        self.disabled = set()
+
+        self.model = None
+        if model is not None:
+            self.model = {tuple(address): dict(attributes) for address, attributes in model.items()}
+
+        # Configuration changes of the model, newest first, as list-changes returns them
+        self.changes = []
+        self._last_change = 0
+        self._model_lock = threading.RLock()
+
+        self._bodies = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.standin = self
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._httpd.server_address[1]
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1'
+
+    def start(self):
+        """Starts serving in a background thread"""
+
+        # stop() waits for serve_forever to notice the shutdown, which it checks every poll_interval seconds
+        self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops serving and closes the listening socket"""
+
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def execute(self, operation):
+        """Returns the (status, body) answer of an operation in the POST form"""
+
+        with self.serving():
+            if self.model is None:
+                return self._execute(operation)
+
+            # Operations on the model run one at a time, so a composite operation can be rolled back as a whole
+            with self._model_lock:
+                saved = {address: dict(attributes) for address, attributes in self.model.items()}
+                status, body = self._execute(operation)
+
+                if status != 200:
+                    self.model = saved
+
+                elif _writes(operation):
+                    self._record_change(_writes(operation))
+                    body = {**body, "response-headers": {"operation-requires-reload": True,
+                                                         "process-state": "reload-required"}}
+
+                return status, body
+
+    @contextlib.contextmanager
+    def serving(self):
+        """Counts an operation while it is served, taking latency seconds"""
+
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+
+            yield
+
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _execute(self, operation):
+        name = operation.get("operation")
+        address = operation.get("address") or []
+
+        if name == "composite":
+            steps = {}
+
+            for position, step in enumerate(operation.get("steps", []), 1):
+                status, body = self._step(step)
+                steps[f'step-{position}'] = body
+
+                if status != 200:
+                    return 500, {"outcome": "failed", "result": steps, "rolled-back": True,
+                                 "failure-description": f'Composite step-{position} failed'}
+
+            return 200, {"outcome": "success", "result": steps}
+
+        return self._step({**operation, "address": address})
+
+    def _step(self, operation):
+        name = operation.get("operation")
+        address = operation.get("address") or []
+
+        if "missing" in address[::2] or "missing" in address[1::2]:
+            return 500, _failed(f"WFLYCTL0216: Management resource '{address}' not found")
+
+        if name not in KNOWN_OPERATIONS:
+            return 500, _failed(f"WFLYCTL0031: No operation named '{name}' exists at address {address}")
+
+        if "*" in address[1::2]:
+            if name not in WILDCARD_OPERATIONS:
+                return 500, _failed(f"WFLYCTL0212: Invalid resource address element '*' for operation '{name}'")
+
+            steps = []
+            for concrete in self._expand(address):
+                _, body = self._step({**operation, "address": concrete})
+                pairs = [{concrete[position]: concrete[position + 1]} for position in range(0, len(concrete), 2)]
+                steps.append({"address": pairs, **body})
+
+            return 200, {"outcome": "success", "result": steps}
+
+        if address[:1] == ["deployment"]:
+            return self._deployment(operation, address[1] if len(address) > 1 else None)
+
+        if self.model is not None and name in MODEL_OPERATIONS:
+            return self._model_step(operation, tuple(address))
+
+        if name == "read-resource":
+            recursive = str(operation.get("recursive", "false")).lower() == "true"
+            return 200, {"outcome": "success", "result": json.loads(self.resource_body(recursive and not address))}
+
+        if name == "read-attribute":
+            return 200, {"outcome": "success", "result": f'value-of-{operation.get("name")}'}
+
+        if name == "whoami":
+            return 200, {"outcome": "success", "result": {"identity": {"username": self.user, "realm": REALM}}}
+
+        if name == "read-children-names":
+            return 200, {"outcome": "success", "result": list(CHILDREN)}
+
+        if name == "read-children-types":
+            # Generated resources only have children in recursive results
+            return 200, {"outcome": "success", "result": []}
+
+        return 200, {"outcome": "success", "result": None}
+
+    def _model_step(self, operation, address):
+        """Returns the (status, body) answer of an operation on the model"""
+
+        name = operation["operation"]
+
+        if name == "add":
+            if address in self.model:
+                return 500, _failed(f"WFLYCTL0212: Duplicate resource {list(address)}")
+
+            if not self._exists(address[:-2]):
+                return 500, _failed(f"WFLYCTL0216: Management resource '{list(address[:-2])}' not found")
+
+            self.model[address] = {argument: value for argument, value in operation.items()
+                                   if argument not in OPERATION_ARGUMENTS}
+            return 200, {"outcome": "success", "result": None}
+
+        if not self._exists(address):
+            return 500, _failed(f"WFLYCTL0216: Management resource '{list(address)}' not found")
+
+        attributes = self.model.setdefault(address, {}) if name in WRITE_OPERATIONS else self.model.get(address, {})
+
+        if name == "read-resource":
+            if _flag(operation, "attributes-only"):
+                return 200, {"outcome": "success", "result": dict(attributes)}
+
+            return 200, {"outcome": "success", "result": self._tree(address, _flag(operation, "recursive"))}
+
+        if name == "read-attribute":
+            if operation.get("name") not in attributes:
+                return 500, _failed(f"WFLYCTL0201: Unknown attribute '{operation.get('name')}'")
+
+            return 200, {"outcome": "success", "result": attributes[operation["name"]]}
+
+        if name == "write-attribute":
+            attributes[operation.get("name")] = operation.get("value")
+
+        elif name == "undefine-attribute":
+            attributes[operation.get("name")] = None
+
+        elif name == "remove":
+            for resource in [resource for resource in self.model if resource[:len(address)] == address]:
+                del self.model[resource]
+
+        elif name == "read-children-types":
+            return 200, {"outcome": "success", "result": sorted(self._children(address))}
+
+        elif name == "read-children-names":
+            return 200, {"outcome": "success",
+                         "result": sorted(self._children(address).get(operation.get("child-type"), ()))}
+
+        elif name == "list-changes":
+            if address != CONFIGURATION_CHANGES:
+                return 500, _failed(f"WFLYCTL0031: No operation named '{name}' exists at address {list(address)}")
+
+            return 200, {"outcome": "success", "result": list(self.changes)}
+
+        return 200, {"outcome": "success", "result": None}
+
+    def _exists(self, address):
+        return not address or any(resource[:len(address)] == address for resource in self.model)
+
+    def _children(self, address):
+        """Returns { child type: { child name: None } } of the resource at address in the model"""
+
+        children = {}
+
+        for resource in self.model:
+            if len(resource) > len(address) and resource[:len(address)] == address:
+                child_type, child = resource[len(address):len(address) + 2]
+                children.setdefault(child_type, {})[child] = None
+
+        return children
+
+    def _tree(self, address, recursive):
+        """Returns the read-resource result of a resource of the model, with every resource below it if recursive"""
+
+        tree = dict(self.model.get(address, {}))
+
+        for child_type, children in self._children(address).items():
+            tree[child_type] = {child: self._tree(address + (child_type, child), True) if recursive else None
+                                for child in children}
+
+        return tree
+
+    def _expand(self, address):
+        """Returns every concrete address matched by an address with wildcard values"""
+
+        addresses = [[]]
+
+        for position in range(0, len(address), 2):
+            if address[position + 1] != "*":
+                addresses = [concrete + address[position:position + 2] for concrete in addresses]
+                continue
+
+            addresses = [concrete + [address[position], name] for concrete in addresses
+                         for name in (CHILDREN if self.model is None
+                                      else self._children(tuple(concrete)).get(address[position], ()))]
+
+        return addresses
+
+    def _record_change(self, operations):
+        """Adds a successful write to the change history, if the model keeps one"""
+
+        history = self.model.get(CONFIGURATION_CHANGES, {}).get("max-history")
+        if not history:
+            return
+
+        # Every change gets its own operation-date, which callers compare as strings
+        self._last_change = max(self._last_change + 1, int(time.time() * 1000))
+        date = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(self._last_change // 1000))
+
+        self.changes.insert(0, {
+            "operation-date": f'{date}.{self._last_change % 1000:03d}Z',
+            "outcome": "success",
+            "operations": [{"operation": step["operation"],
+                            "address": [{step_address[position]: step_address[position + 1]}
+                                        for position in range(0, len(step_address), 2)]}
+                           for step in operations for step_address in [step.get("address") or []]],
+        })
+        del self.changes[history:]
+
+    def upload(self, operation, content):
+        """Returns the (status, body) answer of an operation sent to /management-upload with the content of a file"""
+
+        with self._lock:
+            self.uploads += 1
+
+        if operation.get("operation") == "full-replace-deployment":
+            if operation.get("name") not in self.deployments:
+                return 500, _failed(f"WFLYSRV0020: No deployment with name {operation.get('name')} found")
+
+            self.deployments[operation["name"]] = hashlib.sha1(content).digest()
+            self._enable(operation["name"], operation.get("enabled", True))
+            return 200, {"outcome": "success", "result": None}
+
+        return self._deployment({**operation, "content": hashlib.sha1(content).digest()},
+                                (operation.get("address") or [None, None])[1])
+
+    def _deployment(self, operation, name):
+        operation_name = operation.get("operation")
+
+        if operation_name == "add":
+            if name in self.deployments:
+                return 500, _failed(f"WFLYCTL0212: Duplicate resource [(\"deployment\" => \"{name}\")]")
+
+            if not isinstance(operation.get("content"), bytes):
+                return 500, _failed("WFLYSRV0097: No content was attached to the operation")
+
+            self.deployments[name] = operation["content"]
+            self._enable(name, operation.get("enabled", True))
+            return 200, {"outcome": "success", "result": None}
+
+        if name not in self.deployments:
+            return 500, _failed(f"WFLYCTL0216: Management resource '[(\"deployment\" => \"{name}\")]' not found")
+
+        if operation_name == "remove":
+            del self.deployments[name]
+            self.disabled.discard(name)
+            return 200, {"outcome": "success", "result": None}
+
+        if operation_name in ("deploy", "undeploy"):
+            self._enable(name, operation_name == "deploy")
+            return 200, {"outcome": "success", "result": None}
+
+        if operation_name == "read-resource":
+            content_hash = base64.b64encode(self.deployments[name]).decode()
+            return 200, {"outcome": "success", "result": {"name": name, "runtime-name": name,
+                                                          "enabled": name not in self.disabled,
+                                                          "content": [{"hash": {"BYTES_VALUE": content_hash}}]}}
+
+        return 200, {"outcome": "success", "result": None}
+
+    def _enable(self, name, enabled):
+        if enabled:
+            self.disabled.discard(name)
+        else:
+            self.disabled.add(name)
+
+    def resource_body(self, recursive, dmr=False):
+        """Returns the encoded JSON, or Base64 DMR, of a generated read-resource result, built once per shape"""
+
+        with self._lock:
+            body = self._bodies.get((recursive, dmr))
+
+            if body is None:
+                resource = _resource(self.payload_size, recursive)
+                body = jboss_dmr.to_base64(resource) if dmr else json.dumps(resource).encode()
+                self._bodies[(recursive, dmr)] = body
+
+        return body
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # Headers and body are written separately, which Nagle's algorithm would delay by a delayed ACK every time
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if not self._authenticated():
+            return
+
+        url = urlsplit(self.path)
+        parameters = dict(parse_qsl(url.query))
+        operation = GET_OPERATIONS.get(parameters.pop("operation", ""))
+
+        if not url.path.startswith("/management") or operation is None:
+            return self._send(500, _failed("WFLYDMHTTP0009: Invalid operation for HTTP GET"))
+
+        path = [unquote(element) for element in url.path[len("/management"):].split('/') if element]
+        parameters.pop("json.pretty", None)
+
+        standin = self.server.standin
+
+        # The most common read is answered with the pre-serialized result, as a real server streams it
+        if (operation == "read-resource" and standin.model is None and "missing" not in path
+                and path[:1] != ["deployment"]):
+            with standin.serving():
+                recursive = parameters.get("recursive", "false").lower() == "true" and not path
+                body = standin.resource_body(recursive, self._dmr())
+
+            return self._send_bytes(200, body, self._content_type())
+
+        status, body = standin.execute({"operation": operation, "address": path, **parameters})
+
+        if status == 500 and "WFLYCTL0216" in body.get("failure-description", ""):
+            status = standin.not_found_status
+
+        # HTTP GET answers with the bare result on success
+        self._send(status, body["result"] if status == 200 else body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length)
+
+        if not self._authenticated():
+            return
+
+        if urlsplit(self.path).path == "/management-upload":
+            return self._upload(raw)
+
+        try:
+            if self.headers.get("Content-Type", "").startswith(jboss_dmr.CONTENT_TYPE):
+                operation = jboss_dmr.from_base64(raw)
+            else:
+                operation = json.loads(raw or b'{}')
+        except ValueError:
+            return self._send(500, _failed("WFLYCTL0419: Invalid JSON or DMR"))
+
+        status, body = self.server.standin.execute(operation)
+        self._send(status, body)
+
+    def _upload(self, raw):
+        """Answers a multipart/form-data upload of an operation part and a file part"""
+
+        boundary = RE_BOUNDARY.search(self.headers.get("Content-Type", ""))
+        if boundary is None:
+            return self._send(500, _failed("WFLYDMHTTP0011: Invalid content type for the upload"))
+
+        parts = {}
+        for part in raw.split(b'--' + boundary.group(1).encode())[1:-1]:
+            headers, _, content = part[2:-2].partition(b'\r\n\r\n')
+            name = re.search(rb'name="([^"]*)"', headers)
+            parts[name.group(1).decode() if name else ""] = content
+
+        try:
+            operation = json.loads(parts["operation"])
+            content = parts["file"]
+        except (KeyError, ValueError):
+            return self._send(500, _failed("WFLYDMHTTP0012: The upload needs an operation and a file part"))
+
+        self._send(*self.server.standin.upload(operation, content))
+
+    def _authenticated(self):
+        """Returns True if the request answers the digest challenge, otherwise sends a new challenge"""
+
+        standin = self.server.standin
+        header = self.headers.get("Authorization", "")
+
+        if header.startswith("Digest "):
+            fields = {name: quoted or plain for name, quoted, plain in RE_DIGEST_FIELD.findall(header[7:])}
+
+            try:
+                ha1 = _md5(f'{fields["username"]}:{REALM}:{standin.password}')
+                ha2 = _md5(f'{self.command}:{fields["uri"]}')
+                expected = _md5(f'{ha1}:{fields["nonce"]}:{fields["nc"]}:{fields["cnonce"]}:{fields["qop"]}:{ha2}')
+
+                if (fields["username"] == standin.user and fields["nonce"] == standin.nonce
+                        and fields["response"] == expected):
+                    return True
+
+            except KeyError:
+                pass
+
+        challenge = f'Digest realm="{REALM}", nonce="{standin.nonce}", opaque="00000000", algorithm=MD5, qop="auth"'
+        self._send_bytes(401, b'', headers={"WWW-Authenticate": challenge})
+
+        return False
+
+    def _dmr(self):
+        return self.headers.get("Accept", "") == jboss_dmr.CONTENT_TYPE
+
+    def _content_type(self):
+        return jboss_dmr.CONTENT_TYPE if self._dmr() else "application/json; charset=utf-8"
+
+    def _send(self, status, body):
+        data = jboss_dmr.to_base64(body) if self._dmr() else json.dumps(body).encode()
+        self._send_bytes(status, data, self._content_type())
+
+    def _send_bytes(self, status, data, content_type="application/json; charset=utf-8", headers=None):
+        headers = dict(headers or {})
+
+        if self.server.standin.gzip and data and "gzip" in self.headers.get("Accept-Encoding", ""):
+            data = gzip.compress(data, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _resource(payload_size, recursive):
+    """Returns a generated resource whose JSON is roughly payload_size bytes"""
+
+    attribute_count = max(1, payload_size // 48)
+    resource = {f'attribute-{position}': f'value-{position:032d}' for position in range(attribute_count)}
+
+    if recursive:
+        # Child resources shaped like JBOSS lays them out, { type: { name: { attributes } } }
+        children = max(1, payload_size // (CHILD_ATTRIBUTES * 48))
+        resource["child"] = {
+            f'child-{position}': {f'attribute-{attribute}': position * attribute
+                                  for attribute in range(CHILD_ATTRIBUTES)}
+            for position in range(children)
+        }
+
+    return resource
+
+
+def _writes(operation):
+    """Returns the operations of an operation, or of the steps of a composite operation, that change the model"""
+
+    steps = (operation.get("steps") or []) if operation.get("operation") == "composite" else [operation]
+
+    return [step for step in steps if step.get("operation") in WRITE_OPERATIONS]
+
+
+def _flag(operation, name):
+    """Returns a boolean argument of an operation, sent as a JSON boolean by POST and as text by GET"""
+
+    return str(operation.get(name, False)).lower() == "true"
+
+
+def _failed(description):
+    return {"outcome": "failed", "failure-description": description, "rolled-back": True}
+
+
+def _md5(text):
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the JBOSS HTTP management endpoint")
+    parser.add_argument("--port", type=int, default=9990, help="Port to listen on (default: 9990)")
+    parser.add_argument("--user", default="admin", help="Digest auth user (default: admin)")
+    parser.add_argument("--password", default="admin", help="Digest auth password (default: admin)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds every operation takes (default: 0)")
+    parser.add_argument("--payload-size", type=int, default=1024,
+                        help="Approximate read-resource result size in bytes (default: 1024)")
+    parser.add_argument("--gzip", action="store_true", help="Compress responses for clients accepting gzip")
+    args = parser.parse_args()
+
+    server = StandInServer(args.port, args.user, args.password, args.latency, args.payload_size, args.gzip)
+    print(f'Serving {server.url}:{server.port}/management as {args.user}/{args.password}')
+
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+from .convert import (
+    Error, NoOperationFound, TooManyOperations, UnknownCommand, LRUCache, command_cache, request_type_cache,
+    jboss_command_to_http_request, jboss_commands_to_composite_request, unpack_composite_response,
+    get_operation_and_args, get_path_to_resource, get_request_type, parse_address, parse_operation, format_address,
+    cached_jboss_command_to_http_request, cached_get_request_type, configure_cache, cache_stats, copy_api_call,
+    operation_name, GET_OPERATIONS, READ_ONLY_OPERATIONS, WILDCARD, format_cli_address, split_command,
+    is_wildcard_command
+)
+from .script import ScriptError, compile_script, load_plan
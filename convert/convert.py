@@ -1,10 +1,71 @@
+import copy
 import re
-import sys
 import logging
-
-RECOVERABLE_ERROR = 1
-
-logging.basicConfig(format='%(asctime)s-%(levelname)s-%(message)s', level=logging.INFO)
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote
+
+try:
+    from . import timing
+except ImportError:
+    # Imported as a top level module, E.g by the tests run from inside the convert directory
+    import timing
+
+# Number of converted commands kept by the cached_* functions
+DEFAULT_CACHE_SIZE = 1024
+
+# Characters allowed as is in a resource path element of an HTTP GET URL. Anything else, such as the / inside a
+# JNDI name, is percent encoded so it stays a single path element
+GET_PATH_SAFE_CHARACTERS = "!$&'()*+,;=:@"
+
+# Precompiled tokens for the single pass command parser. An unquoted value runs until the next delimiter of the
+# context it appears in, except inside an expression such as ${jboss.bind.address:127.0.0.1}
+_RE_WHITESPACE = re.compile(r'\s*')
+_RE_QUOTED = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_RE_ESCAPED = re.compile(r'\\(.)')
+_RE_GET_PATH_UNSAFE = re.compile(r"[^\w.~!$&'()*+,;=:@-]")
+_RE_OPERATION = re.compile(r'\s*([\w.-]+)\s*')
+_RE_ARGUMENT_NAME = re.compile(r'\s*([^\s=,()]+)\s*')
+_RE_ADDRESS_KEY = re.compile(r'(?:\\.|[^=/:\\])*')
+_RE_ADDRESS_VALUE = re.compile(r'(?:\$\{[^}]*\}|\\.|[^/:\\])*')
+_RE_ARGUMENT_VALUE = re.compile(r'(?:\$\{[^}]*\}|\\.|[^,)\\])*')
+_RE_LIST_VALUE = re.compile(r'(?:\$\{[^}]*\}|\\.|[^,\]\\])*')
+_RE_OBJECT_KEY = re.compile(r'(?:\\.|[^=,}\\])*')
+_RE_OBJECT_VALUE = re.compile(r'(?:\$\{[^}]*\}|\\.|[^,}\\])*')
+_RE_PROPERTY_KEY = re.compile(r'(?:\\.|[^=,)\\])*')
+
+# Resource path keys and values that have to be quoted in a CLI command
+_RE_CLI_UNSAFE = re.compile(r'[\s/:=,()\[\]{}"\\$]')
+
+# The common shape of command, where no value needs quoting, escaping or nesting, is matched in one go.
+# E.g /subsystem=undertow/server=default-server:read-attribute(name=default-host)
+_RE_SIMPLE_COMMAND = re.compile(
+    r'(?P<path>/|(?:/[\w.*-]+=[\w.*-]+)+)?'
+    r':(?P<operation>[\w.-]+)'
+    r'(?:\((?P<args>[\w.-]+=[\w.*-]*(?:,[\w.-]+=[\w.*-]*)*)?\))?'
+)
+
+# Resource path value matching every resource of its type, E.g /host=*/server=*
+WILDCARD = '*'
+
+# Operations sent with HTTP POST that never change the management model, besides the read-* operations
+READ_ONLY_OPERATIONS = {
+    "whoami", "query", "resolve-expression", "resolve-internet-address", "product-info", "list-snapshots"
+}
+
+# Suported operations for HTTP GET method requests
+GET_OPERATIONS = [
+    "read-attribute",  # as attribute
+    "read-resource",  # as resource
+    "read-resource-description",  # as resource-description
+    "list-snapshots",  # as snapshots
+    # "read-operation-description",  # as operation=operation-description
+    "read-operation-names"  # as operation-names
+]
+
+# CLI operation of each HTTP GET operation name, E.g resource -> read-resource
+_GET_OPERATION_NAMES = {operation.split('-', 1)[1]: operation for operation in GET_OPERATIONS}
 
 
 class Error(Exception):
@@ -17,9 +78,8 @@ class NoOperationFound(Error):
 
     def __init__(self, expression):
         self.expression = expression
-        print(f'Error: Unable to find operation in command: ({expression}) - '
-              'Operations should be prepended with a single colon. Eg. (:reload)')
-        sys.exit(RECOVERABLE_ERROR)
+        super().__init__(f'Unable to find operation in command: ({expression}) - '
+                         'Operations should be prepended with a single colon. Eg. (:reload)')
 
 
 class TooManyOperations(Error):
@@ -27,9 +87,18 @@ class TooManyOperations(Error):
 
     def __init__(self, expression):
         self.expression = expression
-        logging.error(f'Too many operations found in ({expression}) - '
-                      'Only a single operation should be defined. E.g (:read-resource)')
-        sys.exit(RECOVERABLE_ERROR)
+        super().__init__(f'Too many operations found in ({expression}) - '
+                         'Only a single operation should be defined. E.g (:read-resource)')
+
+
+class UnknownCommand(Error):
+    """Raised when a CLI command cannot be parsed"""
+
+    def __init__(self, expression):
+        self.expression = expression
+        super().__init__(f'Unknown command ({expression}) - '
+                         'Commands should be an optional resource path followed by a single operation. '
+                         'E.g (/subsystem=undertow:read-resource)')
 
 
 def jboss_command_to_http_request(cli_call, request_type):
@@ -38,6 +107,10 @@ def jboss_command_to_http_request(cli_call, request_type):
     Parses the CLI command and the HTTP request method we are using and formats them into a variable more suitable
     for JBOSS API requests with the formatting used for the HTTP request type
 
+    The command is parsed in a single pass. Values may be quoted, E.g binding="java:global/a", and arguments may be
+    nested DMR lists and objects, E.g value=[a,b] or value={min=1,max=5}. Nested values are converted to lists and
+    dictionaries for HTTP POST and sent as written for HTTP GET, which only supports string parameters
+
     Parameters
     ----------
     cli_call : str
@@ -47,75 +120,175 @@ def jboss_command_to_http_request(cli_call, request_type):
 
     Returns
     -------
-    list:
-        A list with 1 or 2 elements.
-        If the request HTTP method is GET, it will be 2 elements
-        [0] A dictionary of the operation, [1] A string for the resource path
-        If the request HTTP methos is POST, it will be a single element
-        [0] A single element of type dict with the full operation and resource path
+    dict:
+        The operation, its arguments and the resource path under the address key when the command has one.
+        If the request HTTP method is GET the address is a string for the URL, E.g /subsystem/undertow
+        If the request HTTP method is POST the address is a list, E.g ["subsystem", "undertow"]
     """
 
-    logging.debug(f'Full CLI call: {cli_call}')
-    logging.debug(f'Using HTTP Request: {request_type}')
+    if not timing.active:
+        return _jboss_command_to_http_request(cli_call, request_type)
 
-    operation_no_args, path, args = None, None, None
+    start = time.perf_counter()
+    api_call = _jboss_command_to_http_request(cli_call, request_type)
+    timing.record("parse", operation_name(request_type, api_call["operation"]), time.perf_counter() - start)
 
-    if cli_call.count(':') < 1:
-        raise NoOperationFound(cli_call)
+    return api_call
 
-    elif cli_call.count(':') > 1:
-        raise TooManyOperations(cli_call)
 
-    elif cli_call.startswith(':'):
-        # We received an operation command without a resource path, parse the operation and arguments
-        logging.debug(f'Executing standalone operation')
+def _jboss_command_to_http_request(cli_call, request_type):
+    """Parses a CLI command for jboss_command_to_http_request"""
 
-        # Remove the precedeing : from the command. E.g :read-attribute becomes read-attribute
-        cli_call = cli_call.split(':', 1)[1]
-        operation_no_args, args = get_operation_and_args(cli_call, request_type)
+    command = cli_call.strip()
+    path = None
 
-    elif cli_call.startswith('/') and cli_call.count(':') == 1:
-        # We received a CLI command that has both a resource path and operation
-        logging.debug(f'We have a path and an operation defined')
+    simple = _RE_SIMPLE_COMMAND.fullmatch(command)
+    if simple is not None:
+        return _simple_command_to_http_request(simple, request_type)
 
+    if command.startswith('/'):
         # The path should always precede the operation in JBOSS CLI if both are defined
-        isolated_operation = cli_call.split(':')[1]
-        isolated_path = cli_call.split(':')[0]
+        elements, position = parse_address(command, 0)
+        path = format_address(elements, request_type)
+
+    elif command.startswith(':'):
+        # We received an operation command without a resource path
+        position = 0
 
-        operation_no_args, args = get_operation_and_args(isolated_operation, request_type)
-        path = get_path_to_resource(isolated_path, request_type)
+    elif ':' not in command:
+        raise NoOperationFound(cli_call)
 
     else:
-        sys.exit('Unknown command {cli_call}')
+        raise UnknownCommand(cli_call)
+
+    if position == len(command):
+        raise NoOperationFound(cli_call)
+
+    elif command[position] != ':':
+        raise UnknownCommand(cli_call)
+
+    # Skip the : preceding the operation. E.g :read-attribute becomes read-attribute
+    operation_no_args, args, position = parse_operation(command, position + 1, request_type)
+
+    if position < len(command):
+        if command[position] == ':':
+            raise TooManyOperations(cli_call)
+
+        raise UnknownCommand(cli_call)
 
     if request_type == "GET":
         # Split off the first portion of the CLI operation as the URL path does not contain it
         # E.g: read-resource -> resource, list-snapshots -> snapshots
         operation_no_args = operation_no_args.split('-', 1)[1]
 
-    logging.debug(f'Path: {path}')
-    logging.debug(f'Operation: {operation_no_args}')
-    logging.debug(f'Arguments: {args}')
-
     # Start to create the full API call we will be using
     api_call = {"operation": operation_no_args}
 
     # Append our arguments to our api call
     if args is not None:
-        api_call = {**api_call, **args}
+        api_call.update(args)
 
     # Append our path to our API call
     # The path will be a list of seperated elements when using HTTP POST and a string containing the partial
     # URI that we will append to the URL for HTTP GET methods. We extract the value if necessary when making
     # final URL during the HTTP request
     if path is not None:
-        api_call = {**api_call, "address": path}
+        api_call["address"] = path
 
-    logging.debug(f'API call being returned: {api_call}')
+    logging.debug('API call being returned: %s', api_call)
 
     return api_call
 
 
+def _simple_command_to_http_request(match, request_type):
+    """Returns the API call for a command matched by _RE_SIMPLE_COMMAND, which needs no further parsing"""
+
+    operation_no_args, path, args = match.group('operation', 'path', 'args')
+
+    if request_type == "GET":
+        operation_no_args = operation_no_args.split('-', 1)[1]
+
+    api_call = {"operation": operation_no_args}
+
+    if args is not None:
+        for argument in args.split(','):
+            name, value = argument.split('=')
+            api_call[name] = value
+
+    if path == '/':
+        api_call["address"] = '/' if request_type == "GET" else []
+
+    elif path is not None:
+        # Path elements cannot contain characters that need encoding, so swapping the = is all GET needs
+        path = path.replace('=', '/')
+        api_call["address"] = path if request_type == "GET" else path[1:].split('/')
+
+    logging.debug('API call being returned: %s', api_call)
+
+    return api_call
+
+
+def jboss_commands_to_composite_request(cli_calls):
+    """Returns a single JBOSS composite operation that runs every CLI command as one of its steps
+
+    JBOSS executes the steps of a composite operation in order inside a single HTTP POST and rolls all of them back
+    if one fails, so many write-attribute/add commands cost one round trip instead of one each
+
+    Parameters
+    ----------
+    cli_calls : list
+        The JBOSS CLI commands to be executed, one per step
+
+    Returns
+    -------
+    dict:
+        The composite operation for an HTTP POST request
+        E.g { operation: composite, address: [], steps: [{ operation: add, address: [...] }, ...] }
+    """
+
+    # Composite operations are only supported through HTTP POST, so every step uses the list form of the address
+    steps = [jboss_command_to_http_request(cli_call, "POST") for cli_call in cli_calls]
+
+    logging.debug(f'Composite operation with {len(steps)} steps')
+
+    return {"operation": "composite", "address": [], "steps": steps}
+
+
+def unpack_composite_response(cli_calls, results):
+    """Returns the result of every step of a composite operation paired with the CLI command that created it
+
+    Parameters
+    ----------
+    cli_calls : list
+        The JBOSS CLI commands passed to jboss_commands_to_composite_request
+    results : dict
+        The { outcome: [outcome], result: [return] } structure JBOSS returned for the composite operation
+
+    Returns
+    -------
+    list:
+        A (cli_call, step_results) tuple for each command, in the same order as cli_calls. step_results is the
+        { outcome: [outcome], result: [return] } structure of step-N. If JBOSS did not report a step, for example
+        when the composite operation failed before running it, the step gets the failure of the composite operation
+    """
+
+    steps = results.get("result") or {}
+
+    unpacked = []
+    for step_number, cli_call in enumerate(cli_calls, 1):
+        step_results = steps.get(f'step-{step_number}')
+
+        if step_results is None:
+            step_results = {"outcome": results.get("outcome", "failed")}
+
+            if "failure-description" in results:
+                step_results["failure-description"] = results["failure-description"]
+
+        unpacked.append((cli_call, step_results))
+
+    return unpacked
+
+
 def get_operation_and_args(isolated_operation, request_type):
     """Returns the seperated operation and arguments from the JBOSS CLI command
 
@@ -133,44 +306,15 @@ def get_operation_and_args(isolated_operation, request_type):
     -------
     operation_no_args: str
         The operation portion of the command without the arguments or parenthesis
-    args: str
-        The argument portion of the command without the parenthesis
+    args: dict
+        The arguments of the operation, or None if there are none
 
     """
 
-    # Regex for empty parameters inside operation parenthesis (designated as empty parameters)
-    re_empty_args = re.compile(r'\(\)')
-    # Regex for finding everything before the parenthesis (designated as operation with parameters)
-    re_no_args = re.compile(r'^[^\(]+')
-    # Regex to get only what is inside the parenthesis
-    re_args = re.compile(r'\(([^)]+)\)')
-    args = None
+    operation_no_args, args, position = parse_operation(isolated_operation, 0, request_type)
 
-    if '(' not in isolated_operation:
-        # There are no parameters being passed to the operation
-        operation_no_args = isolated_operation
-
-    elif re_empty_args.search(isolated_operation):
-        # Found operation with empty parameters. E.g read-resource()
-        # Grab the operation before the paraenthesis. E.g read-resource() becomes read-resource
-        operation_no_args = re_no_args.search(isolated_operation)
-        operation_no_args = operation_no_args.group(0)
-
-    else:
-        # We have parenthesis and arguments to the operation. E.g read-resource(name=default)
-        operation_no_args = re_no_args.search(isolated_operation)
-        operation_no_args = operation_no_args.group(0)
-        # Grab everything inside the parenthesis
-        arguments = re_args.search(isolated_operation)
-        arguments = arguments.group(1)
-
-        # Convert arguments string into key value pairs into dictionary
-        # This only works if they are properly defined in the arguments
-        # E.g name=system,value=default which becomes { name:system, value:default}
-        args = dict(item.split("=") for item in arguments.split(','))
-
-    logging.debug(f'Found operation: {operation_no_args}')
-    logging.debug(f'Found arguments: {args}')
+    if position < len(isolated_operation):
+        raise UnknownCommand(isolated_operation)
 
     return operation_no_args, args
 
@@ -197,20 +341,594 @@ def get_path_to_resource(isolated_path, request_type):
 
     """
 
-    # Take a resource path such as /subsystem=undertow/server=default-server
-    # and turn it into path = [http://url] /subsystem/undertow/server/default-server suitable URL for HTTP GET
+    isolated_path = isolated_path.strip()
+    if not isolated_path.startswith('/'):
+        isolated_path = '/' + isolated_path
+
+    elements, position = parse_address(isolated_path, 0)
+
+    if position < len(isolated_path):
+        raise UnknownCommand(isolated_path)
+
+    return format_address(elements, request_type)
+
+
+def format_address(elements, request_type):
+    """Returns the resource path elements in the format used by the HTTP request type
+
+    Take a resource path such as /subsystem=undertow/server=default-server and turn it into
+    /subsystem/undertow/server/default-server to add to the URL for HTTP GET, or
+    ["subsystem", "undertow", "server", "default-server"] for HTTP POST
+
+    Parameters
+    ----------
+    elements : list
+        (key, value) tuples as returned by parse_address
+    request_type: str
+        Specifies what type of HTTP operation we are doing: [GET, POST]
+
+    """
+
     if request_type == "GET":
-        path = isolated_path.replace('=', '/')
+        if not elements:
+            return '/'
 
-    else:
-        # Split the path into a list of its independent segments suitable for HTTP POST request
-        # Ex: /subsystem=undertow/server=default-server becomes ["subsystem","undertow","server","default-server"]
-        path = re.split(r'/|=', isolated_path)
+        path = []
+        for key, value in elements:
+            path.append(_url_path_element(key))
+            if value is not None:
+                path.append(_url_path_element(value))
 
-        # Remove the empty string from beginning of path because splitting the fist / gives an empty string
-        path = list(filter(None, path))
+        return '/' + '/'.join(path)
 
-    logging.debug(f'Original full path: {isolated_path}')
-    logging.debug(f'Modified return path: {path}')
+    path = []
+    for key, value in elements:
+        path.append(key)
+        if value is not None:
+            path.append(value)
 
     return path
+
+
+def format_cli_address(elements):
+    """Returns resource path elements as the resource path of a CLI command, quoting keys and values where needed
+
+    E.g [("subsystem", "naming"), ("binding", "java:global/a")] becomes /subsystem=naming/binding="java:global/a"
+
+    Parameters
+    ----------
+    elements : list
+        (key, value) tuples as returned by parse_address
+
+    """
+
+    path = []
+    for key, value in elements:
+        path.append('/' + _cli_path_element(key))
+        if value is not None:
+            path.append('=' + _cli_path_element(value))
+
+    return ''.join(path) or '/'
+
+
+def split_command(cli_command):
+    """Returns the resource path elements of a CLI command and the operation that follows them
+
+    E.g /subsystem=undertow:read-resource(recursive=true) becomes
+    ([("subsystem", "undertow")], ":read-resource(recursive=true)")
+
+    """
+
+    command = cli_command.strip()
+
+    if not command.startswith('/'):
+        return [], command
+
+    elements, position = parse_address(command, 0)
+
+    return elements, command[position:]
+
+
+def is_wildcard_command(cli_command):
+    """Returns True if the resource path of a CLI command has a wildcard value, E.g /host=*/server=*:read-resource"""
+
+    if WILDCARD not in cli_command:
+        return False
+
+    try:
+        elements, _ = split_command(cli_command)
+    except Error:
+        return False
+
+    return any(value == WILDCARD for _, value in elements)
+
+
+def _cli_path_element(element):
+    """Returns a resource path key or value quoted for use in a CLI command if required"""
+
+    if element != WILDCARD and _RE_CLI_UNSAFE.search(element):
+        return '"' + element.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+    return element
+
+
+def _url_path_element(element):
+    """Returns a resource path key or value percent encoded for use in an HTTP GET URL if required"""
+
+    if _RE_GET_PATH_UNSAFE.search(element):
+        return quote(element, safe=GET_PATH_SAFE_CHARACTERS)
+
+    return element
+
+
+def parse_address(command, position):
+    """Returns the resource path of a CLI command and the position where it ends
+
+    Parameters
+    ----------
+    command : str
+        The JBOSS CLI command
+    position : int
+        Where the resource path starts in the command
+
+    Returns
+    -------
+    elements: list
+        A (key, value) tuple for each element of the path. The value is None if the element has no value
+    position: int
+        The position of the first character after the path, normally the : preceding the operation
+
+    """
+
+    elements = []
+    length = len(command)
+
+    while position < length and command[position] == '/':
+        match = _RE_ADDRESS_KEY.match(command, position + 1)
+        key = _unescape(match.group(0).strip())
+        position = match.end()
+        value = None
+
+        if position < length and command[position] == '=':
+            position = _skip_whitespace(command, position + 1)
+
+            if command.startswith('"', position):
+                match = _RE_QUOTED.match(command, position)
+                if match is None:
+                    raise UnknownCommand(command)
+                value = _unescape(match.group(1))
+            else:
+                match = _RE_ADDRESS_VALUE.match(command, position)
+                value = _unescape(match.group(0).strip())
+
+            position = _skip_whitespace(command, match.end())
+
+        # A trailing or doubled / does not add an element. E.g the root resource /
+        if key:
+            elements.append((key, value))
+
+    return elements, position
+
+
+def parse_operation(command, position, request_type):
+    """Returns the operation of a CLI command, its arguments and the position where it ends
+
+    Parameters
+    ----------
+    command : str
+        The JBOSS CLI command
+    position : int
+        Where the operation name starts in the command, after the :
+    request_type: str
+        HTTP method being used: [GET, POST]
+
+    Returns
+    -------
+    operation_no_args: str
+        The operation portion of the command without the arguments or parenthesis
+    args: dict
+        The arguments of the operation, or None if there are none. E.g name=system,value=default becomes
+        { name: system, value: default }
+    position: int
+        The position of the first character after the operation, which is the end of a valid command
+
+    """
+
+    match = _RE_OPERATION.match(command, position)
+
+    if match is None:
+        if command.startswith(':', _skip_whitespace(command, position)):
+            raise TooManyOperations(command)
+
+        raise NoOperationFound(command)
+
+    operation_no_args = match.group(1)
+    position = match.end()
+    args = None
+
+    if position < len(command) and command[position] == '(':
+        args, position = _parse_arguments(command, position + 1, request_type)
+        position = _skip_whitespace(command, position)
+
+    return operation_no_args, args, position
+
+
+def _parse_arguments(command, position, request_type):
+    """Returns the arguments inside the operation parenthesis and the position after the closing parenthesis"""
+
+    position = _skip_whitespace(command, position)
+
+    # Found operation with empty parameters. E.g read-resource()
+    if command.startswith(')', position):
+        return None, position + 1
+
+    args = {}
+
+    while True:
+        match = _RE_ARGUMENT_NAME.match(command, position)
+        if match is None:
+            raise UnknownCommand(command)
+
+        name = match.group(1)
+        position = match.end()
+
+        if position < len(command) and command[position] == '=':
+            start = position + 1
+            value, position = _parse_value(command, start, _RE_ARGUMENT_VALUE)
+
+            if request_type == "GET" and not isinstance(value, str):
+                # HTTP GET parameters can only be strings, so nested values are sent as written
+                value = command[start:position].strip()
+
+        else:
+            # An argument without a value is a flag. E.g read-resource(recursive)
+            value = "true"
+
+        args[name] = value
+
+        position = _skip_whitespace(command, position)
+        delimiter = command[position:position + 1]
+        position += 1
+
+        if delimiter == ')':
+            return args, position
+
+        elif delimiter != ',':
+            raise UnknownCommand(command)
+
+
+def _parse_value(command, position, unquoted):
+    """Returns the argument value starting at position and the position after it
+
+    Parameters
+    ----------
+    command : str
+        The JBOSS CLI command
+    position : int
+        Where the value starts in the command
+    unquoted : re.Pattern
+        Pattern matching an unquoted value in the context the value appears in
+
+    Returns
+    -------
+    value: str, list or dict
+        Strings for simple values, lists for [a,b] and dictionaries for {a=b} objects or (a=>b) properties
+    position: int
+        The position of the first character after the value
+
+    """
+
+    position = _skip_whitespace(command, position)
+    character = command[position:position + 1]
+
+    if character == '"':
+        match = _RE_QUOTED.match(command, position)
+        if match is None:
+            raise UnknownCommand(command)
+
+        return _unescape(match.group(1)), match.end()
+
+    elif character == '[':
+        values = []
+        position = _skip_whitespace(command, position + 1)
+
+        if command.startswith(']', position):
+            return values, position + 1
+
+        while True:
+            value, position = _parse_value(command, position, _RE_LIST_VALUE)
+            values.append(value)
+
+            position = _skip_whitespace(command, position)
+            delimiter = command[position:position + 1]
+            position += 1
+
+            if delimiter == ']':
+                return values, position
+
+            elif delimiter != ',':
+                raise UnknownCommand(command)
+
+    elif character == '{':
+        return _parse_object(command, position + 1, '}', _RE_OBJECT_KEY, _RE_OBJECT_VALUE)
+
+    elif character == '(':
+        return _parse_object(command, position + 1, ')', _RE_PROPERTY_KEY, _RE_ARGUMENT_VALUE)
+
+    match = unquoted.match(command, position)
+
+    return _unescape(match.group(0).strip()), match.end()
+
+
+def _parse_object(command, position, closing, unquoted_key, unquoted_value):
+    """Returns the DMR object or property starting after its opening bracket and the position after it
+
+    Keys and values may be separated with = or the DMR =>. E.g {min=1,max=5} or ("name" => "value")
+    """
+
+    values = {}
+    position = _skip_whitespace(command, position)
+
+    if command.startswith(closing, position):
+        return values, position + 1
+
+    while True:
+        key, position = _parse_value(command, position, unquoted_key)
+        position = _skip_whitespace(command, position)
+
+        if command.startswith('=>', position):
+            position += 2
+        elif command.startswith('=', position):
+            position += 1
+        else:
+            raise UnknownCommand(command)
+
+        if not isinstance(key, str):
+            raise UnknownCommand(command)
+
+        values[key], position = _parse_value(command, position, unquoted_value)
+
+        position = _skip_whitespace(command, position)
+        delimiter = command[position:position + 1]
+        position += 1
+
+        if delimiter == closing:
+            return values, position
+
+        elif delimiter != ',':
+            raise UnknownCommand(command)
+
+
+def _skip_whitespace(command, position):
+    """Returns the position of the next character in the command that is not whitespace"""
+
+    return _RE_WHITESPACE.match(command, position).end()
+
+
+def _unescape(value):
+    """Returns the value with backslash escapes removed. E.g java\\:global becomes java:global"""
+
+    if '\\' in value:
+        return _RE_ESCAPED.sub(r'\1', value)
+
+    return value
+
+
+def operation_name(request_type, operation):
+    """Returns the CLI name of the operation of an API call, E.g resource sent with HTTP GET is read-resource"""
+
+    if request_type == "GET":
+        return _GET_OPERATION_NAMES.get(operation, operation)
+
+    return operation
+
+
+def get_request_type(cli_command):
+    """Determines the type of HTTP method to use based off of CLI command
+
+    Wildfly 10+/JBOSS 7.x (and possibly earlier) supports these command operations as HTTP GET requests:
+        read-attribute as attribute,
+        read-resource as resource,
+        read-resource-description as resource-description,
+        list-snapshots as snapshots,
+        # BUG: read-operation-description does not become -> operation-description,
+        read-operation-names as operation-names
+
+    Parameters
+    ----------
+    cli_command: str
+        The JBOSS CLI command we are calling
+
+    Returns
+    -------
+    request_type: str
+        The HTTP request method we are going to use [GET, POST]
+
+    """
+
+    start = time.perf_counter() if timing.active else None
+
+    # Default to HTTP POST because we all JBOSS operations support a POST request
+    request_type = "POST"
+
+    # If our CLI command is using one of the read-only HTTP GET operations supported by JBoss/Wildfly, use HTTP GET
+    for operation in GET_OPERATIONS:
+        if operation in cli_command:
+            request_type = "GET"
+
+    # The URL of an HTTP GET request cannot address many resources at once
+    if request_type == "GET" and is_wildcard_command(cli_command):
+        request_type = "POST"
+
+    if start is not None:
+        elapsed = time.perf_counter() - start
+        operation = _command_operation(cli_command)
+
+        if operation is not None:
+            timing.record("request-type", operation, elapsed)
+
+    return request_type
+
+
+def _command_operation(cli_command):
+    """Returns the CLI name of the operation of a command, without parsing its arguments, None if it has none"""
+
+    try:
+        _, operation = split_command(cli_command)
+    except Error:
+        return None
+
+    match = _RE_OPERATION.match(operation.lstrip().lstrip(':'))
+
+    return match.group(1) if match else None
+
+
+class LRUCache:
+    """Thread safe, bounded, least recently used cache that counts its hits and misses
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of entries kept. 0 disables caching
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """Returns the value cached for key, or default if there is none"""
+
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return value
+
+    def put(self, key, value):
+        """Caches value for key, evicting the least recently used entries when the cache is full"""
+
+        with self._lock:
+            if self.maxsize <= 0:
+                return
+
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Removes and returns the value cached for key, or default if there is none"""
+
+        with self._lock:
+            return self._entries.pop(key, default)
+
+    def keys(self):
+        """Returns a snapshot of the cached keys, least recently used first"""
+
+        with self._lock:
+            return list(self._entries)
+
+    def resize(self, maxsize):
+        """Changes the maximum number of entries, evicting the least recently used entries if needed"""
+
+        with self._lock:
+            self.maxsize = maxsize
+
+            while len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Removes every entry and resets the counters"""
+
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Returns the hits, misses, size and maxsize of the cache"""
+
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+
+# Caches used by cached_jboss_command_to_http_request and cached_get_request_type
+command_cache = LRUCache()
+request_type_cache = LRUCache()
+
+
+def cached_jboss_command_to_http_request(cli_call, request_type):
+    """Memoized jboss_command_to_http_request
+
+    Monitoring and batch runs convert the same few command strings over and over. Converted commands are kept in
+    command_cache keyed by (cli_call, request_type), and every call returns its own copy, so callers such as the
+    HTTP GET request that pops the address are free to modify the result
+
+    Parameters
+    ----------
+    cli_call : str
+        The JBOSS CLI command to be executed
+    request_type : str
+        The HTTP request type: [GET, POST]
+
+    Returns
+    -------
+    dict:
+        The same structure as jboss_command_to_http_request
+    """
+
+    key = (cli_call, request_type)
+    api_call = command_cache.get(key)
+
+    if api_call is None:
+        api_call = jboss_command_to_http_request(cli_call, request_type)
+        command_cache.put(key, api_call)
+
+    return copy_api_call(api_call)
+
+
+def copy_api_call(api_call):
+    """Returns a copy of an API call that can be modified without changing the original"""
+
+    # Strings are immutable, only the address list and nested DMR values need copying
+    return {name: value if isinstance(value, str) else copy.deepcopy(value) for name, value in api_call.items()}
+
+
+def cached_get_request_type(cli_command):
+    """Memoized get_request_type, cached in request_type_cache"""
+
+    request_type = request_type_cache.get(cli_command)
+
+    if request_type is None:
+        request_type = get_request_type(cli_command)
+        request_type_cache.put(cli_command, request_type)
+
+    return request_type
+
+
+def configure_cache(maxsize):
+    """Sets the maximum number of entries kept by the command and request type caches. 0 disables them"""
+
+    command_cache.resize(maxsize)
+    request_type_cache.resize(maxsize)
+
+
+def cache_stats():
+    """Returns the hit and miss counters of the command and request type caches"""
+
+    return {"commands": command_cache.stats(), "request_types": request_type_cache.stats()}
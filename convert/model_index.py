@@ -0,0 +1,347 @@
+"""
+model_index.py
+
+Local index of the JBOSS management model
+
+The index is built once per server version from :read-resource-description(recursive=true,operations=true) and
+stored on disk as compact JSON. It is a path trie of the resources, where every node holds the attribute types,
+the names of the configuration attributes and the operations of that resource. Operation signatures are shared between
+nodes, since nearly every resource has the same global operations.
+
+With an index, commands are checked offline before anything is sent to the server: unknown resources, operations,
+arguments and attributes are rejected, argument values are converted to the types the model declares and the HTTP
+method is chosen from the parsed operation instead of a substring match.
+"""
+
+import json
+import os
+import re
+
+from .convert import (
+    Error, GET_OPERATIONS, WILDCARD, LRUCache, cached_jboss_command_to_http_request, copy_api_call
+)
+
+# Operations whose name argument refers to an attribute of the resource
+ATTRIBUTE_OPERATIONS = {"read-attribute", "write-attribute", "undefine-attribute"}
+
+# DMR types converted from the strings produced by the command parser
+INTEGER_TYPES = {"INT", "LONG"}
+DECIMAL_TYPES = {"BIG_DECIMAL", "BIG_INTEGER"}
+
+
+class ModelIndexError(Error):
+    """Raised when a model index cannot be built or loaded"""
+    pass
+
+
+class ModelValidationError(Error):
+    """Raised when a CLI command does not match the management model"""
+
+    def __init__(self, expression, message):
+        self.expression = expression
+        super().__init__(f'{message} in ({expression})')
+
+
+class ModelIndex:
+    """Management model of a JBOSS server version
+
+    Parameters
+    ----------
+    version : str
+        Version of the server the index was built from, as returned by model_version
+    operations : list
+        Operation signatures shared by the resources, each { p: {argument: type}, q: [required], r: read_only }
+    root : dict
+        Trie node of the root resource, { a: {attribute: type}, s: [configuration attributes],
+        o: {operation: signature}, c: {type: {name: node}} }
+    """
+
+    def __init__(self, version, operations, root):
+        self.version = version
+        self.operations = operations
+        self.root = root
+
+        self._compiled = LRUCache()
+
+    @classmethod
+    def from_description(cls, description, version):
+        """Returns the index of the result of :read-resource-description(recursive=true,operations=true)"""
+
+        operations, signature_ids = [], {}
+        root = _index_resource(description, operations, signature_ids)
+
+        return cls(version, operations, root)
+
+    @classmethod
+    def load(cls, path):
+        """Returns the index saved at path"""
+
+        try:
+            with open(path) as index_file:
+                index = json.load(index_file)
+
+            return cls(index["version"], index["operations"], index["root"])
+
+        except (OSError, ValueError, KeyError) as err:
+            raise ModelIndexError(f'Unable to load model index {path}: {err}')
+
+    def save(self, path):
+        """Saves the index at path as compact JSON"""
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'w') as index_file:
+            json.dump({"version": self.version, "operations": self.operations, "root": self.root}, index_file,
+                      separators=(',', ':'))
+
+        os.replace(temporary, path)
+
+    def compile(self, cli_command):
+        """Returns the validated HTTP request type and API call of a CLI command
+
+        Parameters
+        ----------
+        cli_command : str
+            The JBOSS CLI command to be executed
+
+        Returns
+        -------
+        request_type : str
+            GET if the operation is a read only operation JBOSS supports with HTTP GET, otherwise POST
+        api_call : dict
+            The same structure as convert.jboss_command_to_http_request for the request type, with HTTP POST
+            argument values converted to the types declared in the model
+
+        Raises
+        ------
+        ModelValidationError
+            When the resource, operation, an argument or an attribute does not exist, a required argument is missing
+            or a value cannot be converted to its type
+        """
+
+        compiled = self._compiled.get(cli_command)
+
+        if compiled is None:
+            compiled = self._compile(cli_command)
+            self._compiled.put(cli_command, compiled)
+
+        return compiled[0], copy_api_call(compiled[1])
+
+    def resource(self, address, cli_command=''):
+        """Returns the trie node of an address in the HTTP POST list form
+
+        Returns None if the model does not describe the resource in detail, such as resources under a proxy to
+        another process, in which case nothing below it can be validated
+        """
+
+        if len(address) % 2:
+            raise ModelValidationError(cli_command, f'Resource path element {address[-1]} has no value')
+
+        node = self.root
+
+        for position in range(0, len(address), 2):
+            child_type, name = address[position], address[position + 1]
+
+            children = node.get("c", {}).get(child_type)
+            if children is None:
+                raise ModelValidationError(cli_command, f'Unknown resource type {child_type}')
+
+            if name in children:
+                node = children[name]
+            elif "*" in children:
+                node = children["*"]
+            elif name == "*":
+                return None
+            else:
+                raise ModelValidationError(cli_command, f'Unknown resource {child_type}={name}')
+
+            if node is None:
+                return None
+
+        return node
+
+    def configuration_attribute(self, address, name):
+        """Returns True if the model describes an attribute as configuration, whose value only changes by writes
+
+        Runtime attributes, E.g server-state or pool statistics, and attributes the model does not describe return
+        False, as do all attributes of an index built before storage was indexed
+        """
+
+        try:
+            node = self.resource(address)
+
+        except ModelValidationError:
+            return False
+
+        return node is not None and name in node.get("s", ())
+
+    def _compile(self, cli_command):
+        api_call = cached_jboss_command_to_http_request(cli_command, "POST")
+        operation = api_call["operation"]
+
+        node = self.resource(api_call.get("address", []), cli_command)
+        read_only = operation in GET_OPERATIONS
+
+        if node is not None:
+            signature_id = node.get("o", {}).get(operation)
+            if signature_id is None:
+                raise ModelValidationError(cli_command, f'Unknown operation {operation}')
+
+            signature = self.operations[signature_id]
+            read_only = read_only and signature.get("r", False)
+
+            _validate_arguments(cli_command, api_call, signature, node)
+
+        # The URL of an HTTP GET request cannot address many resources at once
+        if read_only and WILDCARD not in api_call.get("address", [])[1::2]:
+            return "GET", cached_jboss_command_to_http_request(cli_command, "GET")
+
+        return "POST", api_call
+
+
+def model_version(root_attributes):
+    """Returns the version key of a server from the attributes of its root resource
+
+    Parameters
+    ----------
+    root_attributes : dict
+        The result of :read-resource(attributes-only=true) on the server
+
+    Returns
+    -------
+    str:
+        The product name and version and the management API version, safe to use as a file name.
+        E.g WildFly_Full-18.0.1.Final-10.0.0
+    """
+
+    management_version = '.'.join(str(root_attributes.get(f'management-{part}-version', 0))
+                                  for part in ("major", "minor", "micro"))
+    product = f'{root_attributes.get("product-name")}-{root_attributes.get("product-version")}-{management_version}'
+
+    return re.sub(r'[^\w.-]', '_', product)
+
+
+def index_path(directory, version):
+    """Returns where the index of a server version is saved in directory"""
+
+    return os.path.join(directory, f'{version}.json')
+
+
+def _index_resource(description, operations, signature_ids):
+    """Returns the trie node of a resource description and the nodes of all of its children"""
+
+    if not description:
+        return None
+
+    node = {}
+
+    attributes = {name: _type(attribute) for name, attribute in (description.get("attributes") or {}).items()}
+    if attributes:
+        node["a"] = attributes
+
+    configuration = sorted(name for name, attribute in (description.get("attributes") or {}).items()
+                           if (attribute or {}).get("storage") == "configuration")
+    if configuration:
+        node["s"] = configuration
+
+    resource_operations = {}
+    for name, operation in (description.get("operations") or {}).items():
+        request_properties = operation.get("request-properties") or {}
+        signature = {
+            "p": {argument: _type(details) for argument, details in request_properties.items()},
+            "q": sorted(argument for argument, details in request_properties.items()
+                        if details.get("required") and not details.get("nillable", False)),
+            "r": bool(operation.get("read-only", False))
+        }
+
+        # Identical signatures are stored once and referenced by position
+        key = json.dumps(signature, sort_keys=True)
+        if key not in signature_ids:
+            signature_ids[key] = len(operations)
+            operations.append(signature)
+
+        resource_operations[name] = signature_ids[key]
+
+    if resource_operations:
+        node["o"] = resource_operations
+
+    children = {}
+    for child_type, child in (description.get("children") or {}).items():
+        children[child_type] = {
+            name: _index_resource(child_description, operations, signature_ids)
+            for name, child_description in (child.get("model-description") or {}).items()
+        }
+
+    if children:
+        node["c"] = children
+
+    return node
+
+
+def _type(details):
+    """Returns the DMR type name of an attribute or argument description. E.g INT"""
+
+    dmr_type = (details or {}).get("type")
+
+    if isinstance(dmr_type, dict):
+        return dmr_type.get("TYPE_MODEL_VALUE", "UNDEFINED")
+
+    return dmr_type or "UNDEFINED"
+
+
+def _validate_arguments(cli_command, api_call, signature, node):
+    """Checks the arguments of an API call against the operation signature and converts their values in place"""
+
+    arguments = signature.get("p", {})
+
+    for name, value in api_call.items():
+        if name in ("operation", "address"):
+            continue
+
+        if name not in arguments:
+            raise ModelValidationError(cli_command, f'Unknown argument {name} for operation {api_call["operation"]}')
+
+        api_call[name] = _coerce(cli_command, name, value, arguments[name])
+
+    missing = [name for name in signature.get("q", []) if name not in api_call]
+    if missing:
+        raise ModelValidationError(cli_command, f'Missing required arguments {", ".join(missing)}')
+
+    if api_call["operation"] in ATTRIBUTE_OPERATIONS and "name" in api_call:
+        attributes = node.get("a", {})
+        attribute = api_call["name"]
+
+        if attribute not in attributes:
+            raise ModelValidationError(cli_command, f'Unknown attribute {attribute}')
+
+        if api_call["operation"] == "write-attribute" and "value" in api_call:
+            api_call["value"] = _coerce(cli_command, attribute, api_call["value"], attributes[attribute])
+
+
+def _coerce(cli_command, name, value, dmr_type):
+    """Returns a string value converted to its DMR type, expressions such as ${a:b} are left as they are"""
+
+    if not isinstance(value, str) or value.startswith('${'):
+        return value
+
+    try:
+        if dmr_type == "BOOLEAN":
+            if value.lower() not in ("true", "false"):
+                raise ValueError(value)
+            return value.lower() == "true"
+
+        if dmr_type in INTEGER_TYPES:
+            return int(value)
+
+        if dmr_type == "DOUBLE":
+            return float(value)
+
+        if dmr_type in DECIMAL_TYPES:
+            # Kept as a string so no precision is lost, but it has to be a number
+            float(value)
+
+    except ValueError:
+        raise ModelValidationError(cli_command, f'{name} expects a {dmr_type} value, not {value}')
+
+    return value
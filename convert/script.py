@@ -0,0 +1,271 @@
+"""
+script.py
+
+Compiles jboss-cli .cli scripts into request plans that run without the CLI
+
+A plan is the list of HTTP requests a script makes, converted ahead of time:
+    batch ... run-batch blocks become one composite operation, which JBOSS rolls back as a whole if a step fails
+    consecutive read only commands outside of a batch are grouped into one composite operation, since they do not
+    depend on each other
+    any other command is a request of its own, sent with HTTP GET or POST as get_request_type decides
+    echo lines are kept, to be printed when the plan runs
+
+set NAME=VALUE defines a variable, substituted for $NAME in the lines that follow, and unset NAME removes it.
+Expressions such as ${jboss.bind.address:127.0.0.1} are resolved by the server and left as they are. Comments, blank
+lines, connect and discard-batch are handled while compiling. Anything else jboss-cli understands, such as cd, if or
+deploy, is rejected with its line number.
+
+Plans are plain JSON, so they are cached on disk keyed by the SHA-256 of the script: running the same script again
+loads its plan without parsing a single command.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+from .convert import (
+    Error, READ_ONLY_OPERATIONS, jboss_command_to_http_request, jboss_commands_to_composite_request, get_request_type
+)
+
+# Changing the plan format or how scripts are compiled must change this, so cached plans are compiled again
+PLAN_VERSION = 1
+
+DEFAULT_PLAN_DIR = os.path.join(os.path.expanduser("~"), ".jboss_api", "plans")
+
+COMMAND_STEP = "command"
+READS_STEP = "reads"
+BATCH_STEP = "batch"
+ECHO_STEP = "echo"
+
+_RE_VARIABLE = re.compile(r'\$([A-Za-z_]\w*)')
+_RE_SET = re.compile(r'set\s+([A-Za-z_]\w*)\s*=(.*)')
+
+
+class ScriptError(Error):
+    """Raised when a line of a .cli script cannot be compiled"""
+
+    def __init__(self, line_number, expression, message):
+        self.line_number = line_number
+        self.expression = expression
+        super().__init__(f'line {line_number}: {message} ({expression})')
+
+
+def compile_script(text):
+    """Returns the request plan of a .cli script
+
+    Parameters
+    ----------
+    text : str
+        Content of the script
+
+    Returns
+    -------
+    dict:
+        { version, steps }, each step being one of
+        { type: command, line, command, request_type, api_call }
+        { type: reads or batch, lines, commands, api_call }, api_call being a composite operation with a step per
+        command
+        { type: echo, line, text }
+
+    Raises
+    ------
+    ScriptError
+        When a line is not a command that can be compiled
+
+    """
+
+    steps = []
+    variables = {}
+    reads = []
+    batch = None
+
+    def flush_reads():
+        if len(reads) == 1:
+            steps.append(_command_step(*reads[0]))
+
+        elif reads:
+            steps.append(_composite_step(READS_STEP, reads))
+
+        reads.clear()
+
+    for line_number, line in _lines(text):
+        word = line.split(None, 1)[0]
+
+        if word == "set":
+            match = _RE_SET.fullmatch(line)
+            if match is None:
+                raise ScriptError(line_number, line, "Expected set NAME=VALUE")
+
+            variables[match.group(1)] = _substitute(line_number, match.group(2).strip(), variables)
+
+        elif word == "unset":
+            for name in line.split()[1:]:
+                variables.pop(name, None)
+
+        elif word == "connect":
+            # Requests go to the server jboss_api.py is configured for
+            continue
+
+        elif word == "echo":
+            flush_reads()
+            steps.append({"type": ECHO_STEP, "line": line_number,
+                          "text": _substitute(line_number, line[len("echo"):].strip(), variables)})
+
+        elif word == "batch":
+            if batch is not None:
+                raise ScriptError(line_number, line, f'The batch started on line {batch[0]} is still open')
+
+            flush_reads()
+            batch = (line_number, [])
+
+        elif word == "run-batch":
+            if batch is None:
+                raise ScriptError(line_number, line, "No batch to run")
+
+            if batch[1]:
+                steps.append(_composite_step(BATCH_STEP, batch[1]))
+
+            batch = None
+
+        elif word == "discard-batch":
+            if batch is None:
+                raise ScriptError(line_number, line, "No batch to discard")
+
+            batch = None
+
+        elif line.startswith(('/', ':', './')):
+            cli_command = _substitute(line_number, line[1:] if line.startswith('./') else line, variables)
+            _compile_command(line_number, cli_command)
+
+            if batch is not None:
+                batch[1].append((line_number, cli_command))
+
+            elif _is_read_only(cli_command):
+                reads.append((line_number, cli_command))
+
+            else:
+                flush_reads()
+                steps.append(_command_step(line_number, cli_command))
+
+        else:
+            raise ScriptError(line_number, line, f'Unsupported jboss-cli command {word}')
+
+    if batch is not None:
+        raise ScriptError(batch[0], "batch", "The batch is never run, run-batch is missing")
+
+    flush_reads()
+
+    return {"version": PLAN_VERSION, "steps": steps}
+
+
+def load_plan(text, directory=DEFAULT_PLAN_DIR):
+    """Returns the request plan of a .cli script, from the plan cache in directory when it was compiled before
+
+    Parameters
+    ----------
+    text : str
+        Content of the script
+    directory : str
+        Directory of the cached plans, None compiles the script without caching its plan
+
+    """
+
+    if directory is None:
+        return compile_script(text)
+
+    path = plan_path(text, directory)
+
+    try:
+        with open(path) as plan_file:
+            plan = json.load(plan_file)
+
+        if plan.get("version") == PLAN_VERSION:
+            return plan
+
+    except (OSError, ValueError):
+        pass
+
+    plan = compile_script(text)
+    os.makedirs(directory, exist_ok=True)
+
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'w') as plan_file:
+        json.dump(plan, plan_file, separators=(',', ':'))
+
+    os.replace(temporary, path)
+
+    return plan
+
+
+def plan_path(text, directory):
+    """Returns the path of the cached plan of a script, named by the SHA-256 of its content"""
+
+    return os.path.join(directory, f'{hashlib.sha256(text.encode()).hexdigest()}-{PLAN_VERSION}.json')
+
+
+def _lines(text):
+    """Yields the (line number, line) of every line that is not blank or a comment, joining continued lines"""
+
+    continued, start = "", None
+
+    for line_number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+
+        if not continued and (not line or line.startswith('#')):
+            continue
+
+        if line.endswith('\\'):
+            continued, start = continued + line[:-1], start or line_number
+            continue
+
+        yield start or line_number, continued + line
+        continued, start = "", None
+
+    if continued:
+        yield start, continued
+
+
+def _substitute(line_number, text, variables):
+    """Returns text with every $NAME replaced by the value of variable NAME"""
+
+    def value(match):
+        if match.group(1) not in variables:
+            raise ScriptError(line_number, text, f'Variable {match.group(1)} is not set')
+
+        return variables[match.group(1)]
+
+    return _RE_VARIABLE.sub(value, text)
+
+
+def _compile_command(line_number, cli_command):
+    """Returns the request type and API call of a command, raising ScriptError with the line number on failure"""
+
+    try:
+        request_type = get_request_type(cli_command)
+        return request_type, jboss_command_to_http_request(cli_command, request_type)
+
+    except ScriptError:
+        raise
+
+    except Error as err:
+        raise ScriptError(line_number, cli_command, str(err))
+
+
+def _is_read_only(cli_command):
+    operation = jboss_command_to_http_request(cli_command, "POST")["operation"]
+
+    return operation.startswith("read-") or operation in READ_ONLY_OPERATIONS
+
+
+def _command_step(line_number, cli_command):
+    request_type, api_call = _compile_command(line_number, cli_command)
+
+    return {"type": COMMAND_STEP, "line": line_number, "command": cli_command, "request_type": request_type,
+            "api_call": api_call}
+
+
+def _composite_step(step_type, commands):
+    return {"type": step_type, "lines": [line_number for line_number, _ in commands],
+            "commands": [cli_command for _, cli_command in commands],
+            "api_call": jboss_commands_to_composite_request([cli_command for _, cli_command in commands])}
@@ -1,5 +1,7 @@
 import unittest
-from convert import jboss_command_to_http_request
+from convert import jboss_command_to_http_request, jboss_commands_to_composite_request, unpack_composite_response
+from convert import LRUCache, cached_jboss_command_to_http_request, command_cache
+from convert import TooManyOperations, UnknownCommand
 
 
 class TestJBOSSCommandToHTTPGETRequestOperationOnlyTestCase(unittest.TestCase):
@@ -211,5 +213,193 @@ class TestJBOSSCommandToHTTPPOSTRequestTestCase(unittest.TestCase):
         self.assertEqual(result, desired_operation)
 
 
+class TestJBOSSCommandToHTTPRequestValuesTestCase(unittest.TestCase):
+    """Test case for quoted and nested DMR values in convert.jboss_command_to_http_request"""
+
+    def test_quoted_path_value_http_post(self):
+        """See if a quoted path value containing : and / stays a single path element using HTTP POST"""
+
+        test_data = '/subsystem=naming/binding="java:global/ExampleDS":add(binding-type=simple,value="a,b")'
+        desired_operation = {
+            "operation": "add", "binding-type": "simple", "value": "a,b",
+            "address": ["subsystem", "naming", "binding", "java:global/ExampleDS"]
+        }
+        result = jboss_command_to_http_request(test_data, "POST")
+        self.assertEqual(result, desired_operation)
+
+    def test_escaped_path_value_http_get(self):
+        """See if an escaped path value is percent encoded as a single URL path element using HTTP GET"""
+
+        test_data = '/subsystem=naming/binding=java\\:global\\/ExampleDS:read-resource'
+        desired_operation = {"operation": "resource", "address": "/subsystem/naming/binding/java:global%2FExampleDS"}
+        result = jboss_command_to_http_request(test_data, "GET")
+        self.assertEqual(result, desired_operation)
+
+    def test_expression_value_http_post(self):
+        """See if an expression containing : and { } is kept as a single value using HTTP POST"""
+
+        test_data = '/interface=public:write-attribute(name=inet-address,value=${jboss.bind.address:127.0.0.1})'
+        desired_operation = {
+            "operation": "write-attribute", "name": "inet-address", "value": "${jboss.bind.address:127.0.0.1}",
+            "address": ["interface", "public"]
+        }
+        result = jboss_command_to_http_request(test_data, "POST")
+        self.assertEqual(result, desired_operation)
+
+    def test_nested_list_and_object_values_http_post(self):
+        """See if nested DMR lists, objects and properties are converted using HTTP POST"""
+
+        test_data = '/subsystem=logging/logger=org.jboss:add(handlers=[FILE,"CONSOLE"],filter={match="a,b"},' \
+                    'property=("name" => "value"))'
+        desired_operation = {
+            "operation": "add", "handlers": ["FILE", "CONSOLE"], "filter": {"match": "a,b"},
+            "property": {"name": "value"}, "address": ["subsystem", "logging", "logger", "org.jboss"]
+        }
+        result = jboss_command_to_http_request(test_data, "POST")
+        self.assertEqual(result, desired_operation)
+
+    def test_nested_list_value_http_get(self):
+        """See if nested DMR values are sent as written using HTTP GET"""
+
+        test_data = ':read-attribute(name=[a, b])'
+        desired_operation = {"operation": "attribute", "name": "[a, b]"}
+        result = jboss_command_to_http_request(test_data, "GET")
+        self.assertEqual(result, desired_operation)
+
+    def test_whitespace_and_flag_arguments_http_post(self):
+        """See if whitespace is ignored and an argument without a value becomes true using HTTP POST"""
+
+        test_data = ' /subsystem=undertow : read-resource( recursive , include-runtime = true ) '
+        desired_operation = {
+            "operation": "read-resource", "recursive": "true", "include-runtime": "true",
+            "address": ["subsystem", "undertow"]
+        }
+        result = jboss_command_to_http_request(test_data, "POST")
+        self.assertEqual(result, desired_operation)
+
+    def test_root_path_http_post(self):
+        """See if the root resource path returns an empty address using HTTP POST"""
+
+        test_data = '/:read-resource'
+        desired_operation = {"operation": "read-resource", "address": []}
+        result = jboss_command_to_http_request(test_data, "POST")
+        self.assertEqual(result, desired_operation)
+
+    def test_too_many_operations_raises(self):
+        """See if an unquoted second operation is rejected"""
+
+        with self.assertRaises(TooManyOperations):
+            jboss_command_to_http_request('/subsystem=undertow:read-resource:whoami', "POST")
+
+    def test_unterminated_arguments_raises(self):
+        """See if arguments without a closing parenthesis are rejected"""
+
+        with self.assertRaises(UnknownCommand):
+            jboss_command_to_http_request(':read-resource(recursive=true', "POST")
+
+
+class TestJBOSSCommandsToCompositeRequestTestCase(unittest.TestCase):
+    """Test case for convert.jboss_commands_to_composite_request and convert.unpack_composite_response"""
+
+    test_data = [
+        '/subsystem=undertow:write-attribute(name=statistics-enabled,value=true)',
+        '/core-service=management/service=configuration-changes:add(max-history=200)',
+        ':read-resource'
+    ]
+
+    def test_commands_become_composite_steps(self):
+        """See if every command becomes a step of a composite operation using HTTP POST addresses"""
+
+        desired_operation = {
+            "operation": "composite", "address": [], "steps": [
+                {
+                    "operation": "write-attribute", "name": "statistics-enabled", "value": "true",
+                    "address": ["subsystem", "undertow"]
+                },
+                {
+                    "operation": "add", "max-history": "200",
+                    "address": ["core-service", "management", "service", "configuration-changes"]
+                },
+                {"operation": "read-resource"}
+            ]
+        }
+        result = jboss_commands_to_composite_request(self.test_data)
+        self.assertEqual(result, desired_operation)
+
+    def test_unpack_maps_steps_to_commands(self):
+        """See if each step-N result is paired with the command that created it"""
+
+        response = {
+            "outcome": "success",
+            "result": {
+                "step-1": {"outcome": "success"},
+                "step-2": {"outcome": "success"},
+                "step-3": {"outcome": "success", "result": {"name": "standalone"}}
+            }
+        }
+        result = unpack_composite_response(self.test_data, response)
+        self.assertEqual(result, [
+            (self.test_data[0], {"outcome": "success"}),
+            (self.test_data[1], {"outcome": "success"}),
+            (self.test_data[2], {"outcome": "success", "result": {"name": "standalone"}})
+        ])
+
+    def test_unpack_missing_steps_get_composite_failure(self):
+        """See if steps JBOSS did not report inherit the failure of the composite operation"""
+
+        response = {
+            "outcome": "failed",
+            "failure-description": "WFLYCTL0062: Composite operation failed and was rolled back.",
+            "result": {"step-1": {"outcome": "failed", "failure-description": "WFLYCTL0201: Unknown attribute"}}
+        }
+        result = unpack_composite_response(self.test_data[:2], response)
+        self.assertEqual(result[0][1], response["result"]["step-1"])
+        self.assertEqual(result[1][1], {
+            "outcome": "failed", "failure-description": "WFLYCTL0062: Composite operation failed and was rolled back."
+        })
+
+
+class TestCachedJBOSSCommandToHTTPRequestTestCase(unittest.TestCase):
+    """Test case for convert.cached_jboss_command_to_http_request and convert.LRUCache"""
+
+    def setUp(self):
+        command_cache.clear()
+
+    def test_repeated_command_is_a_cache_hit(self):
+        """See if converting the same command twice only parses it once"""
+
+        test_data = '/subsystem=undertow:read-resource'
+        first = cached_jboss_command_to_http_request(test_data, "GET")
+        second = cached_jboss_command_to_http_request(test_data, "GET")
+        self.assertEqual(first, second)
+        self.assertEqual(command_cache.stats()["hits"], 1)
+        self.assertEqual(command_cache.stats()["misses"], 1)
+
+    def test_modifying_result_does_not_change_cache(self):
+        """See if popping the address or changing nested values leaves the cached command intact"""
+
+        test_data = '/subsystem=logging/logger=org.jboss:add(handlers=[FILE])'
+        result = cached_jboss_command_to_http_request(test_data, "POST")
+        result.pop("address")
+        result["handlers"].append("CONSOLE")
+
+        desired_operation = {
+            "operation": "add", "handlers": ["FILE"], "address": ["subsystem", "logging", "logger", "org.jboss"]
+        }
+        self.assertEqual(cached_jboss_command_to_http_request(test_data, "POST"), desired_operation)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """See if a full cache evicts the entry used the longest time ago"""
+
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,144 @@
+import os
+import shutil
+import tempfile
+import unittest
+from convert.model_index import ModelIndex, ModelValidationError, model_version
+
+GLOBAL_OPERATIONS = {
+    "read-resource": {
+        "read-only": True,
+        "request-properties": {
+            "recursive": {"type": {"TYPE_MODEL_VALUE": "BOOLEAN"}, "required": False},
+            "include-runtime": {"type": {"TYPE_MODEL_VALUE": "BOOLEAN"}, "required": False}
+        }
+    },
+    "read-attribute": {
+        "read-only": True,
+        "request-properties": {"name": {"type": {"TYPE_MODEL_VALUE": "STRING"}, "required": True}}
+    },
+    "write-attribute": {
+        "read-only": False,
+        "request-properties": {
+            "name": {"type": {"TYPE_MODEL_VALUE": "STRING"}, "required": True},
+            "value": {"type": {"TYPE_MODEL_VALUE": "UNDEFINED"}, "required": False}
+        }
+    }
+}
+
+DESCRIPTION = {
+    "attributes": {
+        "name": {"type": {"TYPE_MODEL_VALUE": "STRING"}, "storage": "configuration"},
+        "server-state": {"type": {"TYPE_MODEL_VALUE": "STRING"}, "storage": "runtime"}
+    },
+    "operations": {**GLOBAL_OPERATIONS, "reload": {"read-only": False, "request-properties": {}}},
+    "children": {
+        "subsystem": {
+            "model-description": {
+                "datasources": {
+                    "operations": GLOBAL_OPERATIONS,
+                    "children": {
+                        "data-source": {
+                            "model-description": {
+                                "*": {
+                                    "attributes": {
+                                        "max-pool-size": {"type": {"TYPE_MODEL_VALUE": "INT"}},
+                                        "enabled": {"type": {"TYPE_MODEL_VALUE": "BOOLEAN"}}
+                                    },
+                                    "operations": GLOBAL_OPERATIONS
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+
+
+class TestModelIndexTestCase(unittest.TestCase):
+    """Test case for convert.model_index.ModelIndex"""
+
+    def setUp(self):
+        self.index = ModelIndex.from_description(DESCRIPTION, "WildFly_Full-18.0.1.Final-10.0.0")
+
+    def test_read_operation_uses_http_get(self):
+        """See if a read only operation supported by HTTP GET is compiled for HTTP GET"""
+
+        result = self.index.compile('/subsystem=datasources/data-source=ExampleDS:read-resource(recursive=true)')
+        self.assertEqual(result, ("GET", {
+            "operation": "resource", "recursive": "true", "address": "/subsystem/datasources/data-source/ExampleDS"
+        }))
+
+    def test_operation_name_in_value_does_not_use_http_get(self):
+        """See if the HTTP method comes from the operation, not from text anywhere in the command"""
+
+        request_type, _ = self.index.compile(':write-attribute(name=name,value=read-resource)')
+        self.assertEqual(request_type, "POST")
+
+    def test_write_attribute_value_is_coerced(self):
+        """See if a write-attribute value is converted to the type of the attribute"""
+
+        result = self.index.compile(
+            '/subsystem=datasources/data-source=ExampleDS:write-attribute(name=max-pool-size,value=50)')
+        self.assertEqual(result, ("POST", {
+            "operation": "write-attribute", "name": "max-pool-size", "value": 50,
+            "address": ["subsystem", "datasources", "data-source", "ExampleDS"]
+        }))
+
+    def test_invalid_commands_are_rejected(self):
+        """See if unknown resources, operations, arguments and attributes and bad values are rejected"""
+
+        invalid = [
+            '/subsystem=datasource:read-resource',
+            '/subsystem=datasources/xa-data-source=ExampleDS:read-resource',
+            '/subsystem=datasources:reload',
+            ':read-resource(recursve=true)',
+            ':read-attribute',
+            '/subsystem=datasources/data-source=ExampleDS:read-attribute(name=max-pool)',
+            '/subsystem=datasources/data-source=ExampleDS:write-attribute(name=enabled,value=yes)'
+        ]
+        for cli_command in invalid:
+            with self.assertRaises(ModelValidationError, msg=cli_command):
+                self.index.compile(cli_command)
+
+    def test_saved_index_is_the_same(self):
+        """See if an index saved to disk compiles commands the same way"""
+
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "index.json")
+            self.index.save(path)
+            loaded = ModelIndex.load(path)
+        finally:
+            shutil.rmtree(directory)
+
+        cli_command = '/subsystem=datasources/data-source=ExampleDS:write-attribute(name=enabled,value=true)'
+        self.assertEqual(loaded.compile(cli_command), self.index.compile(cli_command))
+        self.assertEqual(loaded.version, self.index.version)
+
+    def test_shared_operation_signatures_are_stored_once(self):
+        """See if resources with the same operations share their signatures"""
+
+        self.assertEqual(len(self.index.operations), 4)
+
+    def test_configuration_attributes(self):
+        """See if only attributes the model stores as configuration are reported as configuration"""
+
+        self.assertTrue(self.index.configuration_attribute([], "name"))
+        self.assertFalse(self.index.configuration_attribute([], "server-state"))
+        self.assertFalse(self.index.configuration_attribute([], "unknown"))
+        self.assertFalse(self.index.configuration_attribute(["subsystem", "unknown"], "name"))
+
+    def test_model_version(self):
+        """See if the version key is built from the product and management versions"""
+
+        root = {
+            "product-name": "WildFly Full", "product-version": "18.0.1.Final",
+            "management-major-version": 10, "management-minor-version": 0, "management-micro-version": 0
+        }
+        self.assertEqual(model_version(root), "WildFly_Full-18.0.1.Final-10.0.0")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import unittest
+from convert.script import ScriptError, compile_script, load_plan, plan_path
+
+SCRIPT = """
+# Configure undertow
+connect localhost:9990
+set server=default-server
+echo Configuring $server
+/subsystem=undertow:read-resource
+./subsystem=undertow/server=$server:read-attribute(name=default-host)
+:whoami
+
+batch
+/subsystem=undertow/server=$server:write-attribute(name=default-host,value=other-host)
+/subsystem=undertow:write-attribute(name=statistics-enabled,\\
+    value=${wildfly.statistics-enabled:false})
+run-batch
+
+batch
+:reload
+discard-batch
+:reload
+:read-attribute(name=server-state)
+"""
+
+
+class TestScriptTestCase(unittest.TestCase):
+    """Test case for compiling .cli scripts into request plans"""
+
+    def test_compile_script(self):
+        """See if batches and consecutive reads become composite operations, with the variables substituted"""
+
+        steps = compile_script(SCRIPT)["steps"]
+
+        self.assertEqual([step["type"] for step in steps], ["echo", "reads", "batch", "command", "command"])
+        self.assertEqual(steps[0]["text"], "Configuring default-server")
+
+        self.assertEqual(steps[1]["lines"], [6, 7, 8])
+        self.assertEqual(steps[1]["commands"][1],
+                         '/subsystem=undertow/server=default-server:read-attribute(name=default-host)')
+        self.assertEqual(steps[1]["api_call"]["operation"], "composite")
+        self.assertEqual(len(steps[1]["api_call"]["steps"]), 3)
+
+        self.assertEqual(steps[2]["lines"], [11, 12])
+        self.assertEqual(steps[2]["api_call"]["steps"][1], {
+            "operation": "write-attribute", "name": "statistics-enabled",
+            "value": "${wildfly.statistics-enabled:false}", "address": ["subsystem", "undertow"]
+        })
+
+        self.assertEqual(steps[3], {"type": "command", "line": 19, "command": ":reload", "request_type": "POST",
+                                    "api_call": {"operation": "reload"}})
+        self.assertEqual(steps[4]["request_type"], "GET")
+
+    def test_invalid_scripts(self):
+        """See if lines that cannot be compiled are reported with their line number"""
+
+        for script, line_number in ((":whoami\ncd /subsystem=undertow", 2),
+                                    ("\n/subsystem=undertow:read-attribute(name=$missing)", 2),
+                                    ("batch\n:reload", 1),
+                                    ("run-batch", 1),
+                                    (":whoami\n:read-resource(", 2)):
+            with self.assertRaises(ScriptError) as context:
+                compile_script(script)
+
+            self.assertEqual(context.exception.line_number, line_number)
+
+    def test_plan_cache(self):
+        """See if a plan is compiled once and loaded from the cache while the script is unchanged"""
+
+        directory = tempfile.mkdtemp()
+
+        try:
+            plan = load_plan(SCRIPT, directory)
+            path = plan_path(SCRIPT, directory)
+            self.assertTrue(os.path.exists(path))
+
+            # A cached plan is used as it is, without compiling the script again
+            with open(path, 'w') as plan_file:
+                plan_file.write('{"version": 1, "steps": []}')
+
+            self.assertEqual(load_plan(SCRIPT, directory), {"version": 1, "steps": []})
+            self.assertEqual(load_plan(SCRIPT + ":reload\n", directory)["steps"][:-1], plan["steps"])
+
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import unittest
+from convert import jboss_command_to_http_request, get_request_type, timing
+
+
+class TestTimingTestCase(unittest.TestCase):
+    """Test case for the timing instrumentation"""
+
+    def setUp(self):
+        timing.reset()
+
+    def tearDown(self):
+        timing.disable()
+        timing.reset()
+
+    def test_disabled_records_nothing(self):
+        """See if nothing is recorded until timing is enabled"""
+
+        jboss_command_to_http_request(':read-resource', "GET")
+        self.assertEqual(timing.histograms(), {})
+
+    def test_parse_is_timed_per_operation(self):
+        """See if parsing and choosing the request type are recorded under the CLI operation name"""
+
+        timing.enable()
+        jboss_command_to_http_request('/subsystem=undertow:read-resource(recursive=true)', "GET")
+        jboss_command_to_http_request(':whoami', "POST")
+        get_request_type(':read-resource')
+        get_request_type('/subsystem=undertow:write-attribute(name=statistics-enabled,value=true)')
+
+        histograms = timing.histograms()
+        self.assertEqual(histograms[("parse", "read-resource")]["count"], 1)
+        self.assertEqual(histograms[("parse", "whoami")]["count"], 1)
+        self.assertEqual(histograms[("request-type", "read-resource")]["count"], 1)
+        self.assertEqual(histograms[("request-type", "write-attribute")]["count"], 1)
+
+    def test_hooks(self):
+        """See if hooks are called at the start and end of timed phases, even with histograms disabled"""
+
+        calls = []
+
+        def hook(phase, operation, seconds):
+            calls.append((phase, operation, seconds))
+
+        timing.add_hook(hook)
+        try:
+            with timing.timer("decode", "read-resource"):
+                pass
+        finally:
+            timing.remove_hook(hook)
+
+        self.assertFalse(timing.active)
+
+        self.assertEqual(calls[0], ("decode", "read-resource", None))
+        self.assertEqual(calls[1][:2], ("decode", "read-resource"))
+        self.assertGreaterEqual(calls[1][2], 0)
+        self.assertEqual(timing.histograms(), {})
+
+    def test_histogram(self):
+        """See if percentiles are estimated within their bucket"""
+
+        histogram = timing.Histogram()
+        self.assertIsNone(histogram.percentile(50))
+
+        for milliseconds in range(1, 101):
+            histogram.record(milliseconds / 1000)
+
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.minimum, 0.001)
+        self.assertAlmostEqual(histogram.maximum, 0.1)
+        self.assertTrue(0.05 <= histogram.percentile(50) <= 0.1)
+        self.assertEqual(histogram.percentile(100), 0.1)
+
+    def test_dump(self):
+        """See if the dump is JSON grouped by phase and operation"""
+
+        timing.enable()
+        timing.record("server", "read-resource", 0.25)
+
+        dump = json.loads(timing.dump())
+        self.assertEqual(dump["server"]["read-resource"]["count"], 1)
+        self.assertEqual(dump["server"]["read-resource"]["max"], 0.25)
+        self.assertIn("server", timing.summary())
+
+
+if __name__ == '__main__':
+    unittest.main()
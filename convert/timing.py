@@ -0,0 +1,247 @@
+"""
+timing.py
+
+High resolution latency instrumentation of JBOSS CLI command execution
+
+Each phase of running a command is timed with time.perf_counter and recorded in a histogram per phase and
+operation:
+    parse: converting the CLI command to an API call, convert.jboss_command_to_http_request
+    request-type: choosing between HTTP GET and POST, convert.get_request_type
+    connect: opening a new TCP (and TLS) connection to JBOSS
+    auth-challenge: the round trip answered with a 401 digest challenge, when the nonce had to be renewed
+    server: from sending the request until the response headers arrived, mostly JBOSS processing the operation
+    transfer: receiving the response body
+    decode: decoding the JSON response
+    request: the whole command, end to end
+
+Recording is off until enable() is called or a hook is added, and then costs a few microseconds per phase.
+
+Hooks are callables attached with add_hook, E.g to drive a profiler. They are called as hook(phase, operation, None)
+when a timed phase starts and as hook(phase, operation, seconds) when it ends. Phases measured after the fact, such
+as connect and server, only produce the second call.
+"""
+
+from bisect import bisect_left
+import json
+import threading
+import time
+
+# Upper bounds of the histogram buckets in seconds: 1us, 2us, 4us ... about 9 minutes
+BUCKET_BOUNDS = tuple(2 ** exponent / 1000000 for exponent in range(30))
+
+PERCENTILES = (50, 90, 99)
+
+# True while anything is recorded, checked by instrumented code before it reads the clock
+active = False
+
+_enabled = False
+_hooks = []
+_histograms = {}
+_lock = threading.Lock()
+
+
+class Histogram:
+    """Latency histogram with exponentially sized buckets
+
+    Percentiles are estimated as the upper bound of the bucket they fall in, so they are within a factor of two of
+    the real value while recording stays constant time and memory
+    """
+
+    __slots__ = ("counts", "count", "total", "minimum", "maximum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def record(self, seconds):
+        """Adds a measurement in seconds"""
+
+        self.counts[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+        if self.minimum is None or seconds < self.minimum:
+            self.minimum = seconds
+
+        if self.maximum is None or seconds > self.maximum:
+            self.maximum = seconds
+
+    def percentile(self, percent):
+        """Returns the estimated percentile in seconds, None when nothing was recorded"""
+
+        if not self.count:
+            return None
+
+        rank = self.count * percent / 100
+        seen = 0
+
+        for position, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+
+            if seen >= rank and bucket_count:
+                bound = BUCKET_BOUNDS[position] if position < len(BUCKET_BOUNDS) else self.maximum
+                return min(bound, self.maximum)
+
+        return self.maximum
+
+    def to_dict(self):
+        """Returns the histogram as a JSON serializable dictionary, durations in seconds"""
+
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.minimum,
+            "max": self.maximum,
+            "mean": self.total / self.count if self.count else None,
+            **{f'p{percent}': self.percentile(percent) for percent in PERCENTILES},
+            "buckets": {str(BUCKET_BOUNDS[position] if position < len(BUCKET_BOUNDS) else "inf"): bucket_count
+                        for position, bucket_count in enumerate(self.counts) if bucket_count}
+        }
+
+
+class timer:
+    """Context manager timing a phase of an operation
+
+    E.g
+        with timing.timer("parse", "read-resource"):
+            ...
+
+    """
+
+    __slots__ = ("phase", "operation", "start")
+
+    def __init__(self, phase, operation=''):
+        self.phase = phase
+        self.operation = operation
+
+    def __enter__(self):
+        if _hooks:
+            _call_hooks(self.phase, self.operation, None)
+
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.phase, self.operation, time.perf_counter() - self.start)
+
+
+def record(phase, operation, seconds):
+    """Records a measured duration of a phase of an operation
+
+    Parameters
+    ----------
+    phase: str
+        The phase that was measured, E.g server
+    operation: str
+        The JBOSS operation the phase belongs to, E.g read-resource
+    seconds: float
+        How long the phase took
+
+    """
+
+    if not active:
+        return
+
+    if _enabled:
+        key = (phase, operation)
+
+        with _lock:
+            histogram = _histograms.get(key)
+
+            if histogram is None:
+                histogram = _histograms[key] = Histogram()
+
+            histogram.record(seconds)
+
+    if _hooks:
+        _call_hooks(phase, operation, seconds)
+
+
+def enable():
+    """Starts recording histograms"""
+
+    global _enabled
+
+    _enabled = True
+    _update_active()
+
+
+def disable():
+    """Stops recording histograms, hooks are still called"""
+
+    global _enabled
+
+    _enabled = False
+    _update_active()
+
+
+def add_hook(hook):
+    """Attaches a hook(phase, operation, seconds) callable, see the module documentation"""
+
+    with _lock:
+        _hooks.append(hook)
+
+    _update_active()
+
+
+def remove_hook(hook):
+    """Detaches a hook added with add_hook"""
+
+    with _lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+    _update_active()
+
+
+def reset():
+    """Drops every recorded histogram"""
+
+    with _lock:
+        _histograms.clear()
+
+
+def histograms():
+    """Returns a copy of the histograms, keyed by (phase, operation)"""
+
+    with _lock:
+        return {key: histogram.to_dict() for key, histogram in _histograms.items()}
+
+
+def dump():
+    """Returns the histograms as JSON, { phase: { operation: histogram } }, durations in seconds"""
+
+    phases = {}
+
+    for (phase, operation), histogram in sorted(histograms().items()):
+        phases.setdefault(phase, {})[operation] = histogram
+
+    return json.dumps(phases, indent=2)
+
+
+def summary():
+    """Returns a table of the count, mean and percentiles of every phase and operation in milliseconds"""
+
+    rows = [f'{"phase":<16}{"operation":<32}{"count":>8}{"mean":>10}' +
+            ''.join(f'{f"p{percent}":>10}' for percent in PERCENTILES) + f'{"max":>10}']
+
+    for (phase, operation), histogram in sorted(histograms().items()):
+        values = [histogram["mean"]] + [histogram[f'p{percent}'] for percent in PERCENTILES] + [histogram["max"]]
+        rows.append(f'{phase:<16}{operation or "-":<32}{histogram["count"]:>8}' +
+                    ''.join(f'{value * 1000:>10.3f}' for value in values))
+
+    return '\n'.join(rows)
+
+
+def _call_hooks(phase, operation, seconds):
+    for hook in list(_hooks):
+        hook(phase, operation, seconds)
+
+
+def _update_active():
+    global active
+
+    active = _enabled or bool(_hooks)
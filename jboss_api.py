@@ -10,12 +10,61 @@ JBOSS_URL: URL to JBOSS server
 JBOSS_PORT: Port JBOSS server is listening on
 API_AUTH_USER: JBOSS user with appropraite permissions to make API calls
 API_AUTH_PWD: Password for JBOSS API_AUTH_USER
-USE_PRETTY_JSON: Results returned in pretty JSON
+USE_PRETTY_JSON: Results of a single command are printed as indented JSON unless --format is given
+RESPONSE_CACHE_TTL: Seconds the results of read only commands are cached, 0 disables the cache
+RESPONSE_CACHE_DIR: Directory where cached results are kept between runs, None keeps them in memory only
+MODEL_INDEX: Model index file used to validate commands before they are sent, None sends them unchecked
+CONNECT_TIMEOUT: Seconds to wait for a connection to JBOSS
+READ_TIMEOUT: Seconds to wait between bytes of a JBOSS response
+RETRIES: Times a read only command is retried after a connection error or timeout
+PLAN_DIR: Directory where the compiled plans of --script files are cached, None compiles them on every run
+TRANSPORT: How operations and results are encoded on the wire, json or dmr (application/dmr-encoded)
+COMPRESS: Ask JBOSS for gzip compressed responses
+
+Usage:
+    ./jboss_api.py 'jboss cli command'
+    ./jboss_api.py --batch commands.txt --max-in-flight 8
+    ./jboss_api.py --batch commands.txt --read-timeout 10 --deadline 300
+    ./jboss_api.py --batch commands.txt --timings --timings-dump timings.json
+    ./jboss_api.py --batch commands.txt --format csv --output results.csv
+    ./jboss_api.py --batch commands.txt --composite
+    ./jboss_api.py --transport dmr ':read-resource(recursive=true)'
+    ./jboss_api.py --dry-run 'jboss cli command'
+    ./jboss_api.py --script configure.cli
+    ./jboss_api.py '/host=*/server=*/subsystem=datasources/data-source=*:read-resource(include-runtime=true)'
+    ./jboss_api.py --stream ':read-resource(recursive=true,include-runtime=true)'
+    ./jboss_api.py --inventory hosts.txt ':read-attribute(name=server-state)'
+    ./jboss_api.py --deploy app.ear --inventory hosts.txt
+    ./jboss_api.py --snapshot ~/.jboss_api/snapshots --inventory hosts.txt
+    ./jboss_api.py --reconcile desired.yml --check
+    ./jboss_api.py --metrics metrics.txt --metrics-format prometheus --output /var/lib/node_exporter/jboss.prom
+    ./jboss_api.py --build-model-index ~/.jboss_api/models
+    ./jboss_api.py --daemon --response-cache-ttl 5
+    ./jboss_api.py --model-index ~/.jboss_api/models/WildFly_Full-18.0.1.Final-10.0.0.json 'jboss cli command'
+    cat commands.txt | ./jboss_api.py --batch -
 """
 
 import convert.convert as convert
+from convert import timing
+from convert.model_index import ModelIndex, index_path
+from convert.script import BATCH_STEP, DEFAULT_PLAN_DIR, ECHO_STEP, READS_STEP, load_plan
+from jboss_resilience import (
+    DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, DEFAULT_RETRIES, CircuitOpenError, DeadlineExceeded
+)
+from jboss_metrics import DEFAULT_HISTORY, DEFAULT_INTERVAL, MetricsPoller, load_metrics, prometheus_text
+from jboss_fleet import DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_PER_HOST, fleet_results, load_inventory
+from jboss_output import FORMATS, get_writer, open_output
+from jboss_wildcard import DEFAULT_MAX_IN_FLIGHT, wildcard_results
+from jboss_dmr import DEFAULT_TRANSPORT, TRANSPORTS
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import argparse
 import logging
+import os
 import sys
+import threading
+import time
+from urllib.parse import urlsplit
 
 RECOVERABLE_ERROR = 1
 
@@ -25,153 +74,1327 @@ JBOSS_PORT = '9990'
 API_AUTH_USER = ''
 API_AUTH_PWD = ''
 USE_PRETTY_JSON = False
+RESPONSE_CACHE_TTL = 0
+RESPONSE_CACHE_DIR = None
+MODEL_INDEX = None
+CONNECT_TIMEOUT = DEFAULT_CONNECT_TIMEOUT
+READ_TIMEOUT = DEFAULT_READ_TIMEOUT
+RETRIES = DEFAULT_RETRIES
+PLAN_DIR = DEFAULT_PLAN_DIR
+TRANSPORT = DEFAULT_TRANSPORT
+COMPRESS = True
 
-logging.basicConfig(format='%(asctime)s-%(levelname)s-%(message)s', level=logging.INFO)
-
-try:
-    import requests
-    from requests.auth import HTTPDigestAuth
-    from requests.exceptions import HTTPError
+# requests and everything built on it are imported by get_client, the first time JBOSS is called, so commands that
+# never call JBOSS such as --dry-run start without the HTTP stack. See benchmarks/bench_startup.py
 
-except ModuleNotFoundError:
-    logging.error("Python [requests] module is required.")
-    sys.exit(RECOVERABLE_ERROR)
+# Shared client so every call made by this process reuses the same keep-alive sessions and digest nonce
+_client = None
+_client_config = None
+_client_lock = threading.Lock()
 
 
-def call_jboss_api(cli_command):
+def call_jboss_api(cli_command, output=sys.stdout, output_format=None, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                   deadline=None):
     """Makes a REST API call to the JBOSS maangement console
 
     Parameters
     ----------
     cli_command: str
         The JBOSS CLI command that we want to run
+    output: file
+        Where to write the results
+    output_format: str
+        One of jboss_output.FORMATS. Defaults to pretty if USE_PRETTY_JSON is set, otherwise compact json
+    max_in_flight: int
+        Maximum number of HTTP requests running at the same time for a command with wildcards
+    deadline: float
+        Seconds a command with wildcards may take
 
     """
 
-    header = {'content-type': 'application/json'}
+    status, error = run_command(cli_command, output, output_format, max_in_flight, deadline)
+
+    if error is not None:
+        logging.error(error["message"])
+
+    if status:
+        sys.exit(status)
+
+
+def run_command(cli_command, output=sys.stdout, output_format=None, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                deadline=None):
+    """Runs a single JBOSS CLI command and writes its results, returning errors instead of exiting
+
+    Used by call_jboss_api and by the daemon, which has to keep running whatever a command does. A command with
+    wildcards in its resource path is run by call_jboss_api_wildcard, one result per matched resource
+
+    Parameters
+    ----------
+    cli_command: str
+        The JBOSS CLI command that we want to run
+    output: file
+        Where to write the results
+    output_format: str
+        One of jboss_output.FORMATS. Defaults to pretty if USE_PRETTY_JSON is set, otherwise compact json, and to
+        ndjson for a command with wildcards
+    max_in_flight: int
+        Maximum number of HTTP requests running at the same time for a command with wildcards
+    deadline: float
+        Seconds a command with wildcards may take
+
+    Returns
+    -------
+    status: int
+        The exit status of jboss_api.py for the command, 0 or RECOVERABLE_ERROR
+    error: dict
+        None, or {"type": exception class name, "message": logged error message} when the command failed
 
-    # Determine if we are using HTTP GET or POST method
-    request_type = get_request_type(cli_command)
+    """
 
-    # Convert the JBOSS cli command to the appropriate API call
-    api_call = convert.jboss_command_to_http_request(cli_command, request_type)
+    wildcard = convert.is_wildcard_command(cli_command)
 
-    # BUG: Use pretty JSON only works on POST methods, because of the way I have to reformat the JSON
-    # when using GET method requests. This will not matter if I end up using this as an Ansible module
-    # since I will just be returning the json data to the module
-    if USE_PRETTY_JSON is True:
-        api_call = {**api_call, "json.pretty": 1}
+    if output_format is None:
+        output_format = "ndjson" if wildcard else "pretty" if USE_PRETTY_JSON else "json"
 
-    response = None
+    http = _http()
 
     try:
-        if request_type == "GET":
-            # HACK: JBOSS REST API returns different data structure when using HTTP GET
-            # It completely removes the { outcome: [outcome], results: [return] } and instead just returns [return]
-            # This makes the output inconsistent and possibly breaking for scripting when used in combination
-            # with HTTP POST requests. Therefore I am adding the return into the same data structure that POST
-            # or a GET (500) failure returns
-
-            # data structure returned from convert module sets the address for an HTTP GET method to a string
-            # with the correct path to be added to the URL.
-            api_path = ""
-            if api_call.get("address"):
-                api_path = api_call.pop("address")
-
-            logging.debug(f'address after pop: {api_path}')
-            logging.debug(f'path in pop: {api_path}')
-
-            response = requests.get(
-                url(JBOSS_URL, api_path),
-                auth=HTTPDigestAuth(API_AUTH_USER, API_AUTH_PWD),
-                params=api_call,
-                headers=header
-            )
-
-            if response.status_code == 200:
-                # HTTP GET response code 200 indicates returns json structure inconsistent with HTTP GET 500,
-                # as well as HTTP POST 200,500. Normalizing the data structure in that event
-                results = {"outcome": "success", "result": response.json()}
-
-            # Response code 500 will output the correct data structure, only 200 returns inconsistently
-            elif response.status_code == 500:
-                results = response.json
-
-        elif request_type == "POST":
-
-            response = requests.post(
-                url(JBOSS_URL),
-                auth=HTTPDigestAuth(API_AUTH_USER, API_AUTH_PWD),
-                json=api_call,
-                headers=header
-            )
-
-            results = response.json()
-
-        response.raise_for_status()
-
-        logging.debug(response.status_code)
-        print(results)
-
-    except HTTPError as err:
+        if wildcard:
+            failures = call_jboss_api_wildcard(cli_command, output, max_in_flight, output_format, deadline)
+            return (RECOVERABLE_ERROR if failures else 0), None
+
+        response, results = request_jboss_api(cli_command)
+
+        # There is no response when the results came from the response cache
+        if response is not None:
+            response.raise_for_status()
+            logging.debug(response.status_code)
+
+        with get_writer(output_format, output) as writer:
+            writer.write(results)
+
+    except http.HTTPError as err:
         if err.response.status_code == 401:
-            logging.error("Unauthorized Connection. Possible incorrect username/password")
-            sys.exit(RECOVERABLE_ERROR)
-        else:
-            logging.error(f'HTTP Error occured: {err.response.text}')
+            return RECOVERABLE_ERROR, _error(err, _failure_description(err))
+
+        return 0, _error(err, f'HTTP Error occured: {err.response.text}')
+    except (http.Timeout, http.ConnectionError, CircuitOpenError, DeadlineExceeded, convert.Error) as err:
+        return RECOVERABLE_ERROR, _error(err, _failure_description(err))
     except Exception as err:
-        logging.error(f'Other error occured: {err}')
+        return 0, _error(err, f'Other error occured: {err}')
+
+    return 0, None
+
+
+def request_jboss_api(cli_command, deadline=None):
+    """Makes a REST API call to the JBOSS management console and returns the normalized results
+
+    Unlike call_jboss_api nothing is printed and no errors are handled, so callers running many commands
+    can decide what to do with each result themselves. Calls share the pooled sessions of get_client()
+
+    Parameters
+    ----------
+    cli_command: str
+        The JBOSS CLI command that we want to run
+    deadline: float
+        time.monotonic() value by which the command has to complete
+
+    Returns
+    -------
+    response: requests.Response
+        The raw HTTP response
+    results: dict
+        The response normalized to the { outcome: [outcome], result: [return] } structure
+
+    """
+
+    return get_client().request(cli_command, deadline=deadline)
+
+
+def get_client(pool_maxsize=1):
+    """Returns the shared JBossClient for the configured JBOSS server
+
+    The client is rebuilt if the user configurable variables change or more pooled connections are needed
+
+    Parameters
+    ----------
+    pool_maxsize: int
+        Minimum number of keep-alive connections the client should keep open
+
+    """
+
+    global _client, _client_config
+
+    _http()
+    from jboss_cache import ResponseCache
+    from jboss_client import DEFAULT_POOL_MAXSIZE, JBossClient
+
+    config = (JBOSS_URL, JBOSS_PORT, API_AUTH_USER, API_AUTH_PWD, RESPONSE_CACHE_TTL, RESPONSE_CACHE_DIR, MODEL_INDEX,
+              CONNECT_TIMEOUT, READ_TIMEOUT, RETRIES, TRANSPORT, COMPRESS)
+
+    with _client_lock:
+        if _client is None or _client_config != config or _client.pool_maxsize < pool_maxsize:
+            if _client is not None:
+                _client.close()
+
+            response_cache = None
+            if RESPONSE_CACHE_TTL > 0:
+                response_cache = ResponseCache(RESPONSE_CACHE_TTL, directory=RESPONSE_CACHE_DIR)
+
+            model_index = None
+            if MODEL_INDEX is not None:
+                model_index = ModelIndex.load(MODEL_INDEX)
+
+            # Results are formatted locally by jboss_output, so JBOSS is never asked for pretty JSON
+            _client = JBossClient(JBOSS_URL, JBOSS_PORT, API_AUTH_USER, API_AUTH_PWD,
+                                  pool_maxsize=max(pool_maxsize, DEFAULT_POOL_MAXSIZE),
+                                  response_cache=response_cache, model_index=model_index,
+                                  connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, retries=RETRIES,
+                                  transport=TRANSPORT, compress=COMPRESS)
+            _client_config = config
+
+    return _client
+
+
+def call_jboss_api_batch(commands, output=sys.stdout, max_in_flight=1, output_format="ndjson", deadline=None):
+    """Runs many JBOSS CLI commands in a single process and writes one result per command
+
+    Commands are read lazily from any iterable of lines (an open file or sys.stdin) so very long runbooks are never
+    held in memory. Up to max_in_flight commands are sent concurrently, but results are always written in the same
+    order as the input. Blank lines and lines starting with # are skipped.
+
+    Each output line is the normalized { outcome, result } structure with the input line number and command added,
+    E.g {"line": 1, "command": ":read-attribute(name=server-state)", "outcome": "success", "result": "running"}
+
+    Parameters
+    ----------
+    commands: iterable
+        Lines containing one JBOSS CLI command each
+    output: file
+        Where to write the results
+    max_in_flight: int
+        Maximum number of HTTP requests running at the same time
+    output_format: str
+        One of jboss_output.FORMATS
+    deadline: float
+        Seconds the whole batch may take. Commands that cannot complete in time fail without being sent
+
+    Returns
+    -------
+    int:
+        The number of commands that did not return a successful outcome
+
+    """
+
+    deadline = None if deadline is None else time.monotonic() + deadline
+    max_in_flight = max(1, max_in_flight)
+    failures = 0
+
+    # Make sure every concurrent request can keep its own connection alive
+    get_client(pool_maxsize=max_in_flight)
+    in_flight = deque()
+    writer = get_writer(output_format, output)
+
+    def write_oldest():
+        nonlocal failures
+
+        result = in_flight.popleft().result()
+        if result.get("outcome") != "success":
+            failures += 1
+
+        writer.write(result)
+
+    with writer, ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for line_number, cli_command in read_commands(commands):
+            # Wait on the oldest command before queueing more, which keeps output ordered and memory bounded
+            if len(in_flight) >= max_in_flight:
+                write_oldest()
+
+            in_flight.append(executor.submit(_batch_result, line_number, cli_command, deadline))
+
+        while in_flight:
+            write_oldest()
+
+    return failures
+
+
+def call_jboss_api_composite(commands, output=sys.stdout, output_format="ndjson", deadline=None):
+    """Runs many JBOSS CLI commands as a single composite operation and writes one result per command
+
+    All of the commands are sent in one HTTP POST, and JBOSS rolls every one of them back if any of them fail.
+    The output has the same format as call_jboss_api_batch
+
+    Parameters
+    ----------
+    commands: iterable
+        Lines containing one JBOSS CLI command each
+    output: file
+        Where to write the results
+    output_format: str
+        One of jboss_output.FORMATS
+    deadline: float
+        Seconds the composite operation may take
+
+    Returns
+    -------
+    int:
+        The number of commands that did not return a successful outcome
+
+    """
+
+    deadline = None if deadline is None else time.monotonic() + deadline
+    line_numbers, cli_commands = [], []
+    for line_number, cli_command in read_commands(commands):
+        line_numbers.append(line_number)
+        cli_commands.append(cli_command)
+
+    if not cli_commands:
+        return 0
+
+    http = _http()
+
+    try:
+        steps = get_client().execute_composite(cli_commands, deadline=deadline)
+
+    except (http.HTTPError, http.ConnectionError, http.Timeout, CircuitOpenError, DeadlineExceeded) as err:
+        err = _failure_description(err)
+        steps = [(cli_command, {"outcome": "failed", "failure-description": str(err)}) for cli_command in cli_commands]
+
+    failures = 0
+    with get_writer(output_format, output) as writer:
+        for line_number, (cli_command, step_results) in zip(line_numbers, steps):
+            if step_results.get("outcome") != "success":
+                failures += 1
+
+            writer.write({"line": line_number, "command": cli_command, **step_results})
+
+    return failures
+
+
+def call_jboss_api_script(script, output=sys.stdout, output_format="ndjson", deadline=None):
+    """Runs a jboss-cli .cli script and writes one result per command
+
+    The script is compiled into a request plan, or its plan is loaded from PLAN_DIR when the same script was run
+    before, see convert.script. Batches and groups of consecutive reads are sent as single composite operations.
+    Like jboss-cli, the script stops at the first command that fails. The output has the same format as
+    call_jboss_api_batch, and echo lines are logged
+
+    Parameters
+    ----------
+    script: str
+        Content of the .cli script
+    output: file
+        Where to write the results
+    output_format: str
+        One of jboss_output.FORMATS
+    deadline: float
+        Seconds the whole script may take
+
+    Returns
+    -------
+    int:
+        The number of commands that did not return a successful outcome
+
+    """
+
+    plan = load_plan(script, PLAN_DIR)
+
+    http = _http()
+    client = get_client()
+    deadline = None if deadline is None else time.monotonic() + deadline
+
+    def send(request_type, api_call):
+        try:
+            return client.execute_api_call(request_type, api_call, deadline=deadline)
+
+        except (http.HTTPError, http.ConnectionError, http.Timeout, CircuitOpenError, DeadlineExceeded) as err:
+            return {"outcome": "failed", "failure-description": _failure_description(err)}
+
+    with get_writer(output_format, output) as writer:
+        for step in plan["steps"]:
+            if step["type"] == ECHO_STEP:
+                logging.info(step["text"])
+                continue
+
+            if step["type"] in (READS_STEP, BATCH_STEP):
+                results = send("POST", step["api_call"])
+                steps = convert.unpack_composite_response(step["commands"], results)
+
+                # One failed read fails the whole composite operation, so the reads are sent again one at a time, up
+                # to the one that failed
+                if step["type"] == READS_STEP and results.get("outcome") != "success":
+                    steps = []
 
+                    for cli_command, api_call in zip(step["commands"], step["api_call"]["steps"]):
+                        steps.append((cli_command, send("POST", api_call)))
 
-def get_request_type(cli_command):
-    """Determines the type of HTTP method to use based off of CLI command
+                        if steps[-1][1].get("outcome") != "success":
+                            break
 
-    Wildfly 10+/JBOSS 7.x (and possibly earlier) supports these command operations as HTTP GET requests:
-        read-attribute as attribute,
-        read-resource as resource,
-        read-resource-description as resource-description,
-        list-snapshots as snapshots,
-        # BUG: read-operation-description does not become -> operation-description,
-        read-operation-names as operation-names
+                records = [{"line": line_number, "command": cli_command, **step_results}
+                           for line_number, (cli_command, step_results) in zip(step["lines"], steps)]
+
+            else:
+                records = [{"line": step["line"], "command": step["command"],
+                            **send(step["request_type"], step["api_call"])}]
+
+            failed = [record for record in records if record.get("outcome") != "success"]
+
+            for record in records:
+                writer.write(record)
+
+            if failed:
+                logging.error(f'Stopped at line {failed[0]["line"]}: {failed[0].get("failure-description")}')
+                return len(failed)
+
+    return 0
+
+
+def call_jboss_api_dry_run(commands, output=sys.stdout, output_format="ndjson", composite=False):
+    """Writes the HTTP request type and API call of every JBOSS CLI command, without calling JBOSS
+
+    Only the command parser is used, and the model index when MODEL_INDEX is set, so neither requests nor a
+    connection to JBOSS are needed. Each output line is {"line", "command", "request_type", "api_call"}, or the
+    failed outcome of a command that cannot be converted
 
     Parameters
     ----------
+    commands: iterable
+        Lines containing one JBOSS CLI command each
+    output: file
+        Where to write the API calls
+    output_format: str
+        One of jboss_output.FORMATS
+    composite: bool
+        Write the single composite operation --composite would send instead
+
+    Returns
+    -------
+    int:
+        The number of commands that could not be converted
+
+    """
+
+    model_index = None if MODEL_INDEX is None else ModelIndex.load(MODEL_INDEX)
+    failures = 0
+
+    with get_writer(output_format, output) as writer:
+        if composite:
+            api_call = convert.jboss_commands_to_composite_request([command for _, command in read_commands(commands)])
+            writer.write({"request_type": "POST", "api_call": api_call})
+            return 0
+
+        for line_number, cli_command in read_commands(commands):
+            record = {"line": line_number, "command": cli_command}
+
+            try:
+                if model_index is not None:
+                    request_type, api_call = model_index.compile(cli_command)
+                else:
+                    request_type = convert.get_request_type(cli_command)
+                    api_call = convert.jboss_command_to_http_request(cli_command, request_type)
+
+                record = {**record, "request_type": request_type, "api_call": api_call}
+
+            except convert.Error as err:
+                failures += 1
+                record = {**record, "outcome": "failed", "failure-description": str(err)}
+
+            writer.write(record)
+
+    return failures
+
+
+def call_jboss_api_fleet(inventory, cli_command, output=sys.stdout, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                         max_per_host=DEFAULT_MAX_PER_HOST, output_format="ndjson", deadline=None):
+    """Runs a JBOSS CLI command on every host of an inventory and writes one result per host
+
+    Results are written as soon as each host answers, so slow hosts do not hold up the output of fast ones.
+    Each output line has the host and elapsed_ms (wall time of the HTTP call in milliseconds) keys added to the
+    normalized { outcome, result } structure
+
+    Parameters
+    ----------
+    inventory: iterable
+        Lines of the inventory file, see jboss_fleet
     cli_command: str
-        The JBOSS CLI command we are calling
+        The JBOSS CLI command that we want to run
+    output: file
+        Where to write the results
+    max_concurrency: int
+        Maximum number of HTTP requests running at the same time across the whole fleet
+    max_per_host: int
+        Maximum number of HTTP requests running at the same time against a single host
+    output_format: str
+        One of jboss_output.FORMATS
+    deadline: float
+        Seconds the whole fleet run may take, hosts that have not answered by then fail
 
     Returns
     -------
-    request_type: str
-        The HTTP request method we are going to use [GET, POST]
+    int:
+        The number of hosts that did not return a successful outcome
 
     """
 
-    # Default to HTTP POST because we all JBOSS operations support a POST request
-    request_type = "POST"
+    import asyncio
+
+    hosts = load_inventory(inventory, API_AUTH_USER, API_AUTH_PWD)
+
+    async def write_results():
+        failures = 0
+
+        with get_writer(output_format, output) as writer:
+            async for results in fleet_results(hosts, [cli_command], max_concurrency, max_per_host, deadline,
+                                               client_options=_client_options()):
+                if results.get("outcome") != "success":
+                    failures += 1
+
+                writer.write(results)
+                writer.flush()
+
+        return failures
+
+    start = time.perf_counter()
+    failures = asyncio.run(write_results())
+
+    logging.info(f'{len(hosts)} hosts, {failures} failed, {time.perf_counter() - start:.3f}s')
+
+    return failures
+
+
+def call_jboss_api_wildcard(cli_command, output=sys.stdout, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                            output_format="ndjson", deadline=None):
+    """Runs a JBOSS CLI command with wildcards in its resource path and writes one result per matched resource
+
+    Each output line is the normalized { outcome, result } structure with the concrete address added, E.g
+    {"address": "/host=master/server=server-one", "outcome": "success", "result": {...}}. See jboss_wildcard
+
+    Parameters
+    ----------
+    cli_command: str
+        The JBOSS CLI command that we want to run, E.g /host=*/server=*:read-attribute(name=server-state)
+    output: file
+        Where to write the results
+    max_in_flight: int
+        Maximum number of HTTP requests running at the same time when the wildcards are expanded by walking the model
+    output_format: str
+        One of jboss_output.FORMATS
+    deadline: float
+        Seconds the whole expansion may take
+
+    Returns
+    -------
+    int:
+        The number of results that did not return a successful outcome
+
+    """
+
+    deadline = None if deadline is None else time.monotonic() + deadline
+    failures = 0
+
+    with get_writer(output_format, output) as writer:
+        for address, results in wildcard_results(get_client(pool_maxsize=max_in_flight), cli_command, max_in_flight,
+                                                 deadline):
+            if results.get("outcome") != "success":
+                failures += 1
+
+            writer.write({"address": address, **results})
+            writer.flush()
+
+    return failures
+
+
+def call_jboss_api_deploy(archive, output=sys.stdout, name=None, enabled=True, force=False, inventory=None,
+                          max_concurrency=DEFAULT_MAX_CONCURRENCY, output_format="ndjson", deadline=None):
+    """Deploys an archive to the JBOSS server, or to every host of an inventory, and writes one result per host
+
+    The archive is streamed to each host and not uploaded at all where the deployment already has the same content.
+    Each output line is the normalized { outcome, result } structure with the deployment, action (skipped, added or
+    replaced) and sha1 keys added, and the host key for an inventory. See jboss_deploy
+
+    Parameters
+    ----------
+    archive: str
+        Path of the archive to deploy, E.g app.ear
+    output: file
+        Where to write the results
+    name: str
+        Name of the deployment, defaults to the file name of the archive
+    enabled: bool
+        Deploy the content once it is uploaded
+    force: bool
+        Upload the archive even where the deployed content has the same hash
+    inventory: iterable
+        Lines of an inventory file, see jboss_fleet. None deploys to the configured JBOSS server
+    max_concurrency: int
+        Maximum number of hosts deployed to at the same time
+    output_format: str
+        One of jboss_output.FORMATS
+    deadline: float
+        Seconds the whole deployment may take
+
+    Returns
+    -------
+    int:
+        The number of hosts that did not return a successful outcome
+
+    """
+
+    from jboss_deploy import deploy, file_sha1
+
+    http = _http()
+    deadline = None if deadline is None else time.monotonic() + deadline
+
+    def deploy_to(client, sha1=None, host=None):
+        record = {} if host is None else {"host": host}
+
+        try:
+            return {**record, **deploy(client, archive, name, enabled=enabled, sha1=sha1, force=force,
+                                       deadline=deadline)}
+
+        except (http.HTTPError, http.ConnectionError, http.Timeout, CircuitOpenError, DeadlineExceeded) as err:
+            return {**record, "outcome": "failed", "failure-description": _failure_description(err)}
+
+    def write_results(records):
+        failures = 0
+
+        with get_writer(output_format, output) as writer:
+            for results in records:
+                if results.get("outcome") != "success":
+                    failures += 1
+
+                writer.write(results)
+                writer.flush()
+
+        return failures
+
+    if inventory is None:
+        # A single host only needs the hash when the archive is already deployed, which deploy works out
+        return write_results([deploy_to(get_client())])
+
+    # Hashed once for the whole fleet rather than once per host
+    sha1 = None if force else file_sha1(archive)
+
+    return write_results(_host_results(inventory, lambda client, host: deploy_to(client, sha1, host),
+                                       max_concurrency))
+
+
+def call_jboss_api_snapshot(directory, output=sys.stdout, full=False, inventory=None,
+                            max_concurrency=DEFAULT_MAX_CONCURRENCY, output_format="ndjson", deadline=None):
+    """Snapshots the configuration of the JBOSS server, or of every host of an inventory, and writes the drift
+
+    Each host has its snapshot in directory. A new snapshot is compared with the previous one, and one line is
+    written per added, removed or changed resource, E.g {"address": "/subsystem=undertow", "change": "changed",
+    "attributes": ["statistics-enabled"]}, with the host key for an inventory. The first snapshot of a host writes
+    nothing. See jboss_snapshot
+
+    Parameters
+    ----------
+    directory: str
+        Directory of the snapshots
+    output: file
+        Where to write the differences
+    full: bool
+        Read the whole model even when the change history of a server shows which subtrees changed
+    inventory: iterable
+        Lines of an inventory file, see jboss_fleet. None snapshots the configured JBOSS server
+    max_concurrency: int
+        Maximum number of hosts read at the same time
+    output_format: str
+        One of jboss_output.FORMATS
+    deadline: float
+        Seconds the whole snapshot may take
+
+    Returns
+    -------
+    int:
+        The number of hosts that could not be snapshotted
+
+    """
+
+    from jboss_snapshot import Snapshot, diff, take_snapshot
+
+    http = _http()
+    deadline = None if deadline is None else time.monotonic() + deadline
+
+    def snapshot_host(client, host=None):
+        record = {} if host is None else {"host": host}
+        path = os.path.join(directory, f'{urlsplit(client.url).hostname}_{client.port}.json')
+
+        try:
+            previous = Snapshot.load(path)
+            snapshot, subtrees = take_snapshot(client, previous, full, deadline=deadline)
+
+        except (http.HTTPError, http.ConnectionError, http.Timeout, CircuitOpenError, DeadlineExceeded) as err:
+            return [{**record, "outcome": "failed", "failure-description": _failure_description(err)}]
+
+        except Exception as err:
+            return [{**record, "outcome": "failed", "failure-description": str(err)}]
+
+        changes = [] if previous is None else [{**record, **change} for change in diff(previous, snapshot)]
+        snapshot.save(path)
+
+        read = "the whole model" if subtrees is None else f'{len(subtrees)} changed subtrees'
+        logging.info(f'{client.url}:{client.port}: read {read}, {len(changes)} differences')
+
+        return changes
+
+    if inventory is None:
+        results = [snapshot_host(get_client())]
+    else:
+        results = _host_results(inventory, snapshot_host, max_concurrency)
+
+    failures = 0
+
+    with get_writer(output_format, output) as writer:
+        for records in results:
+            for record in records:
+                if record.get("outcome") == "failed":
+                    failures += 1
+
+                writer.write(record)
+
+            writer.flush()
+
+    return failures
+
+
+def call_jboss_api_reconcile(desired, output=sys.stdout, check=False, inventory=None,
+                             max_concurrency=DEFAULT_MAX_CONCURRENCY, output_format="ndjson", deadline=None):
+    """Brings the JBOSS server, or every host of an inventory, to a desired configuration and writes what changed
+
+    One line is written per attribute written, E.g {"address": "/subsystem=undertow", "attribute":
+    "statistics-enabled", "from": false, "to": true, "outcome": "success"}, then a {"summary": {...}} line with the
+    writes and round trips made and avoided. Lines have the host key for an inventory. See jboss_reconcile
+
+    Parameters
+    ----------
+    desired: dict
+        { address: { attribute: value } } as returned by jboss_reconcile.load_desired
+    output: file
+        Where to write the changes
+    check: bool
+        Only write what would change, without changing the configuration
+    inventory: iterable
+        Lines of an inventory file, see jboss_fleet. None reconciles the configured JBOSS server
+    max_concurrency: int
+        Maximum number of hosts reconciled at the same time
+    output_format: str
+        One of jboss_output.FORMATS
+    deadline: float
+        Seconds the whole reconcile may take
+
+    Returns
+    -------
+    int:
+        The number of hosts that could not be reconciled
+
+    """
+
+    from jboss_reconcile import reconcile
+
+    http = _http()
+    deadline = None if deadline is None else time.monotonic() + deadline
+
+    def reconcile_host(client, host=None):
+        record = {} if host is None else {"host": host}
+
+        try:
+            changes, summary = reconcile(client, desired, check, deadline=deadline)
+
+        except (http.HTTPError, http.ConnectionError, http.Timeout, CircuitOpenError, DeadlineExceeded) as err:
+            return [{**record, "outcome": "failed", "failure-description": _failure_description(err)}]
+
+        except convert.Error as err:
+            return [{**record, "outcome": "failed", "failure-description": str(err)}]
+
+        logging.info(f'{client.url}:{client.port}: {summary["writes"]} writes, {summary["unchanged"]} attributes '
+                     f'unchanged, {summary["round-trips-avoided"]} round trips avoided')
+
+        return [{**record, **change} for change in changes] + [{**record, "summary": summary}]
+
+    if inventory is None:
+        results = [reconcile_host(get_client())]
+    else:
+        results = _host_results(inventory, reconcile_host, max_concurrency)
+
+    failures = 0
+
+    with get_writer(output_format, output) as writer:
+        for records in results:
+            # A failed write fails the whole composite operation, so each host counts once
+            if any(record.get("outcome") == "failed" for record in records):
+                failures += 1
+
+            for record in records:
+                writer.write(record)
+
+            writer.flush()
+
+    return failures
+
+
+def call_jboss_api_stream(cli_command, output=sys.stdout, output_format="ndjson"):
+    """Executes a read command and writes its result as records while the response arrives
+
+    Each record is one {"address", "attribute", "value"} structure, so results of any size are written with
+    bounded memory. Intended for recursive reads, E.g ':read-resource(recursive=true,include-runtime=true)'
+
+    Parameters
+    ----------
+    cli_command: str
+        The JBOSS CLI command that we want to run
+    output: file
+        Where to write the records
+    output_format: str
+        One of jboss_output.FORMATS, json holds every record in memory so ndjson, csv or tsv are a better fit
+
+    Returns
+    -------
+    int:
+        The number of records written
+
+    """
+
+    http = _http()
+    from jboss_client import OperationFailed
+
+    writer = get_writer(output_format, output)
+
+    try:
+        for address, attribute, value in get_client().stream_records(cli_command):
+            writer.write({"address": address, "attribute": attribute, "value": value})
+
+    except http.HTTPError as err:
+        if err.response.status_code == 401:
+            logging.error("Unauthorized Connection. Possible incorrect username/password")
+            sys.exit(RECOVERABLE_ERROR)
+
+        logging.error(err)
+        sys.exit(RECOVERABLE_ERROR)
+
+    except OperationFailed as err:
+        logging.error(err)
+        sys.exit(RECOVERABLE_ERROR)
+
+    finally:
+        writer.close()
+
+    return writer.records
+
+
+def call_jboss_api_metrics(metrics, inventory=None, output=sys.stdout, output_format="ndjson", path=None,
+                           history=DEFAULT_HISTORY, polls=None):
+    """Polls metrics until interrupted and writes the samples of every poll
+
+    Parameters
+    ----------
+    metrics: list
+        Metrics as returned by jboss_metrics.load_metrics
+    inventory: iterable
+        Lines of an inventory file, see jboss_fleet. None polls the configured JBOSS server
+    output: file
+        Where to write the samples
+    output_format: str
+        prometheus writes the latest sample of every series after each poll, any of jboss_output.FORMATS writes
+        each sample as it is read
+    path: str
+        File the prometheus output is written to. It is replaced atomically after each poll, for the node_exporter
+        textfile collector. None writes to output
+    history: int
+        Number of samples kept per series
+    polls: int
+        Stop after this many polls, polling forever when None
+
+    """
+
+    if inventory is None:
+        clients = [get_client()]
+    else:
+        from jboss_client import JBossClient
+
+        clients = [JBossClient(host["url"], host["port"], host["user"], host["password"], pool_maxsize=2,
+                               **_client_options())
+                   for host in load_inventory(inventory, API_AUTH_USER, API_AUTH_PWD)]
+
+    writer = None if output_format == "prometheus" else get_writer(output_format, output)
+
+    with MetricsPoller(clients, metrics, history) as poller:
+        def write_samples(samples):
+            if writer is not None:
+                for sample in samples:
+                    writer.write(sample._asdict())
+
+                writer.flush()
+                return
+
+            text = prometheus_text(poller.latest())
+
+            if path is None:
+                output.write(text + "\n")
+                output.flush()
+                return
+
+            temporary = f'{path}.{os.getpid()}.tmp'
+            with open(temporary, 'w') as prometheus_file:
+                prometheus_file.write(text)
+
+            os.replace(temporary, path)
+
+        try:
+            poller.run(write_samples, polls=polls)
+
+        except KeyboardInterrupt:
+            pass
+
+        finally:
+            if writer is not None:
+                writer.close()
+
+            if poller.missed:
+                logging.warning(f'{poller.missed} polls were skipped because the previous ones were still running')
+
+            if inventory is not None:
+                for client in clients:
+                    client.close()
+
+
+def read_commands(lines):
+    """Yields the line number and JBOSS CLI command of every line that is not blank or a # comment"""
+
+    for line_number, line in enumerate(lines, 1):
+        cli_command = line.strip()
+
+        if cli_command and not cli_command.startswith('#'):
+            yield line_number, cli_command
+
+
+def _batch_result(line_number, cli_command, deadline=None):
+    """Returns the result record written by call_jboss_api_batch for a single command"""
+
+    record = {"line": line_number, "command": cli_command}
+    http = _http()
+
+    try:
+        response, results = request_jboss_api(cli_command, deadline)
+
+        if results is None:
+            response.raise_for_status()
+
+        record = {**record, **results}
+
+    except (http.HTTPError, http.ConnectionError, http.Timeout, CircuitOpenError, DeadlineExceeded) as err:
+        record = {**record, "outcome": "failed", "failure-description": _failure_description(err)}
+
+    except Exception as err:
+        record = {**record, "outcome": "failed", "failure-description": str(err)}
+
+    return record
+
+
+def _host_results(inventory, function, max_concurrency):
+    """Yields function(client, host) for every host of an inventory, in order, running max_concurrency at a time"""
+
+    from jboss_client import JBossClient
+
+    clients = [JBossClient(host["url"], host["port"], host["user"], host["password"], pool_maxsize=1,
+                           **_client_options())
+               for host in load_inventory(inventory, API_AUTH_USER, API_AUTH_PWD)]
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(clients)))) as executor:
+            yield from executor.map(lambda client: function(client, f'{client.url}:{client.port}'), clients)
+
+    finally:
+        for client in clients:
+            client.close()
+
+
+def _client_options():
+    """Returns the configured JBossClient arguments, for the clients of the hosts of an inventory"""
+
+    return {"connect_timeout": CONNECT_TIMEOUT, "read_timeout": READ_TIMEOUT, "retries": RETRIES,
+            "transport": TRANSPORT, "compress": COMPRESS}
+
+
+def _http():
+    """Returns requests.exceptions, importing requests the first time JBOSS is called"""
+
+    try:
+        import requests.exceptions
+
+    except ModuleNotFoundError:
+        logging.error("Python [requests] module is required.")
+        sys.exit(RECOVERABLE_ERROR)
+
+    return requests.exceptions
+
+
+def _error(err, message):
+    """Returns the structured error returned by run_command"""
+
+    return {"type": type(err).__name__, "message": message}
+
+
+def _failure_description(err):
+    """Returns the failure-description written for an error raised while calling JBOSS"""
+
+    http = _http()
+
+    if isinstance(err, http.HTTPError) and err.response.status_code == 401:
+        return "Unauthorized Connection. Possible incorrect username/password"
+
+    if isinstance(err, http.Timeout):
+        return f'Timed out waiting for JBOSS: {err}'
+
+    if isinstance(err, http.ConnectionError):
+        return f'Unable to connect to JBOSS: {err}'
+
+    return str(err)
+
+
+def parse_args(argv=None):
+    """Returns the parsed command line arguments"""
+
+    parser = argparse.ArgumentParser(description="Convert JBOSS CLI commands to JBOSS API calls and execute them")
+    parser.add_argument("command", nargs="?", help="JBOSS CLI command to execute. E.g ':read-resource'")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="Execute the JBOSS CLI commands in FILE, one per line, and print one result per command. "
+                             "Use - to read from stdin")
+    parser.add_argument("--max-in-flight", type=int, metavar="N",
+                        help=f'Number of batch requests sent concurrently (default: 1), or of requests walking the '
+                             f'model for a command with wildcards such as /host=*/server=* '
+                             f'(default: {DEFAULT_MAX_IN_FLIGHT})')
+    parser.add_argument("--composite", action="store_true",
+                        help="Send every batch command in a single composite operation. "
+                             "JBOSS rolls all of them back if one fails")
+
+    parser.add_argument("--script", metavar="FILE",
+                        help="Run the jboss-cli script FILE, with batch/run-batch blocks, set variables and comments")
+    parser.add_argument("--plan-dir", default=PLAN_DIR, metavar="DIR",
+                        help=f'Directory where compiled --script plans are cached (default: {PLAN_DIR})')
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Print the HTTP request type and API call of each command instead of calling JBOSS")
+
+    parser.add_argument("--stream", action="store_true",
+                        help="Parse the result while it arrives and print one record per attribute. "
+                             "For very large recursive reads")
+
+    parser.add_argument("--format", choices=FORMATS, metavar="FORMAT",
+                        help=f'Output format: {", ".join(FORMATS)} (default: json for a single command, '
+                             f'ndjson otherwise)')
+    parser.add_argument("--output", metavar="FILE", help="Write results to FILE instead of stdout")
+
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="Poll the metrics listed in FILE until interrupted, see jboss_metrics")
+    parser.add_argument("--metrics-format", choices=("prometheus",) + FORMATS, default="ndjson", metavar="FORMAT",
+                        help="prometheus or any --format output (default: ndjson)")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, metavar="SECONDS",
+                        help=f'Seconds between polls of metrics without their own interval '
+                             f'(default: {DEFAULT_INTERVAL})')
+    parser.add_argument("--history", type=int, default=DEFAULT_HISTORY, metavar="N",
+                        help=f'Number of samples kept per metric series (default: {DEFAULT_HISTORY})')
+    parser.add_argument("--polls", type=int, metavar="N", help="Stop polling metrics after N polls")
+
+    parser.add_argument("--connect-timeout", type=float, default=CONNECT_TIMEOUT, metavar="SECONDS",
+                        help=f'Seconds to wait for a connection to JBOSS (default: {CONNECT_TIMEOUT})')
+    parser.add_argument("--read-timeout", type=float, default=READ_TIMEOUT, metavar="SECONDS",
+                        help=f'Seconds to wait between bytes of a JBOSS response (default: {READ_TIMEOUT})')
+    parser.add_argument("--retries", type=int, default=RETRIES, metavar="N",
+                        help=f'Times read only commands are retried after a connection error or timeout '
+                             f'(default: {RETRIES}). Commands that change the model are never retried')
+    parser.add_argument("--deadline", type=float, metavar="SECONDS",
+                        help="Seconds a whole batch or fleet run may take, commands still pending then fail")
+    parser.add_argument("--transport", choices=TRANSPORTS, default=TRANSPORT,
+                        help=f'Encoding of operations and results on the wire, dmr being application/dmr-encoded '
+                             f'(default: {TRANSPORT})')
+    parser.add_argument("--no-compress", dest="compress", action="store_false", default=COMPRESS,
+                        help="Do not ask JBOSS for gzip compressed responses")
+
+    parser.add_argument("--timings", action="store_true",
+                        help="Log the latency of every phase, such as parse, connect, auth-challenge, server and "
+                             "decode, per operation at the end of the run")
+    parser.add_argument("--timings-dump", metavar="FILE",
+                        help="Write the latency histograms of every phase and operation to FILE as JSON")
+
+    parser.add_argument("--cache-size", type=int, default=convert.DEFAULT_CACHE_SIZE, metavar="N",
+                        help=f'Number of converted commands kept in memory, 0 to disable '
+                             f'(default: {convert.DEFAULT_CACHE_SIZE})')
+    parser.add_argument("--response-cache-ttl", type=float, default=RESPONSE_CACHE_TTL, metavar="SECONDS",
+                        help="Cache the results of read only commands for SECONDS (default: disabled)")
+    parser.add_argument("--response-cache-dir", default=RESPONSE_CACHE_DIR, metavar="DIR",
+                        help="Keep cached results in DIR so they are shared between runs")
+    parser.add_argument("--model-index", default=MODEL_INDEX, metavar="FILE",
+                        help="Validate commands against the model index in FILE before sending them")
+    parser.add_argument("--build-model-index", metavar="DIR",
+                        help="Build the model index of the server in DIR, unless it exists for the server version, "
+                             "and print its path")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep running and execute the JBOSS CLI commands sent by jboss_daemon.py over a Unix "
+                             "socket, with warm connections and caches")
+    parser.add_argument("--socket", metavar="PATH",
+                        help="Unix socket of --daemon (default: JBOSS_API_SOCKET or ~/.jboss_api/daemon.sock)")
+    parser.add_argument("--deploy", metavar="ARCHIVE",
+                        help="Upload and deploy ARCHIVE, unless it is already deployed with the same content")
+    parser.add_argument("--deployment-name", metavar="NAME",
+                        help="Name of the --deploy deployment (default: the file name of the archive)")
+    parser.add_argument("--disabled", action="store_true",
+                        help="Upload the --deploy archive without deploying it")
+    parser.add_argument("--force", action="store_true",
+                        help="Upload the --deploy archive even when the deployed content has the same hash")
+    parser.add_argument("--snapshot", metavar="DIR",
+                        help="Snapshot the configuration into DIR and print what changed since the previous snapshot, "
+                             "reading only the changed subtrees when the server keeps a configuration change history")
+    parser.add_argument("--full", action="store_true",
+                        help="Read the whole configuration for --snapshot, whatever the change history shows")
+    parser.add_argument("--reconcile", metavar="FILE",
+                        help="Write the attributes of the JSON or YAML FILE, mapping CLI addresses to attributes, "
+                             "that differ from the current configuration as one composite operation and print what "
+                             "changed")
+    parser.add_argument("--check", action="store_true",
+                        help="Print what --reconcile would change without changing anything")
+    parser.add_argument("--inventory", metavar="FILE",
+                        help="Execute the JBOSS CLI command, --deploy, --snapshot or --reconcile on every host listed "
+                             "in FILE and print one result per host")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY, metavar="N",
+                        help=f'Number of fleet requests sent concurrently (default: {DEFAULT_MAX_CONCURRENCY})')
+    parser.add_argument("--max-per-host", type=int, default=DEFAULT_MAX_PER_HOST, metavar="N",
+                        help=f'Number of fleet requests sent concurrently to one host '
+                             f'(default: {DEFAULT_MAX_PER_HOST})')
+
+    args = parser.parse_args(argv)
+
+    if args.build_model_index is not None or args.daemon:
+        return args
+
+    if args.script is not None:
+        if args.command is not None or args.batch is not None or args.metrics is not None or args.inventory:
+            parser.error("--script cannot be combined with a JBOSS CLI command, --batch, --metrics or --inventory")
+
+        if args.stream or args.deploy is not None or args.snapshot is not None or args.reconcile is not None:
+            parser.error("--script cannot be combined with --stream, --deploy, --snapshot or --reconcile")
+
+        return args
+
+    modes = (("--deploy", args.deploy), ("--snapshot", args.snapshot), ("--reconcile", args.reconcile))
+
+    for option, value in modes:
+        if value is None:
+            continue
+
+        if args.command is not None or args.batch is not None or args.metrics is not None:
+            parser.error(f'{option} cannot be combined with a JBOSS CLI command, --batch or --metrics')
+
+        if args.dry_run or args.stream or sum(value is not None for _, value in modes) > 1:
+            parser.error(f'{option} cannot be combined with --dry-run, --stream, --deploy, --snapshot or --reconcile')
+
+        return args
+
+    if args.check:
+        parser.error("--check requires --reconcile")
+
+    if args.metrics is not None:
+        if args.command is not None or args.batch is not None:
+            parser.error("--metrics cannot be combined with a JBOSS CLI command or --batch")
+
+        if args.dry_run:
+            parser.error("--dry-run cannot be combined with --metrics")
+
+        return args
+
+    if (args.command is None) == (args.batch is None):
+        parser.error("either a JBOSS CLI command or --batch is required")
+
+    if args.composite and args.batch is None:
+        parser.error("--composite requires --batch")
+
+    if args.stream and (args.command is None or args.inventory is not None):
+        parser.error("--stream runs a single JBOSS CLI command and cannot be combined with --batch or --inventory")
+
+    if args.inventory is not None and args.batch is not None:
+        parser.error("--inventory runs a single JBOSS CLI command and cannot be combined with --batch")
+
+    return args
+
+
+def main(argv=None):
+    global RESPONSE_CACHE_TTL, RESPONSE_CACHE_DIR, MODEL_INDEX, CONNECT_TIMEOUT, READ_TIMEOUT, RETRIES, PLAN_DIR, \
+        TRANSPORT, COMPRESS
+
+    logging.basicConfig(format='%(asctime)s-%(levelname)s-%(message)s', level=logging.INFO)
+
+    args = parse_args(argv)
+
+    convert.configure_cache(args.cache_size)
+
+    if args.timings or args.timings_dump is not None:
+        timing.enable()
+
+    RESPONSE_CACHE_TTL = args.response_cache_ttl
+    RESPONSE_CACHE_DIR = args.response_cache_dir
+    MODEL_INDEX = args.model_index
+    CONNECT_TIMEOUT = args.connect_timeout
+    READ_TIMEOUT = args.read_timeout
+    RETRIES = args.retries
+    PLAN_DIR = args.plan_dir
+    TRANSPORT = args.transport
+    COMPRESS = args.compress
+
+    if args.build_model_index is not None:
+        index = get_client().fetch_model_index(args.build_model_index)
+        print(index_path(args.build_model_index, index.version))
+        return
+
+    if args.daemon:
+        from jboss_daemon import DEFAULT_SOCKET, serve
+
+        logging.info(f'Listening on {args.socket or DEFAULT_SOCKET}')
+        serve(run_command, args.socket or DEFAULT_SOCKET)
+        return
+
+    # Prometheus output is replaced atomically after every poll instead of being appended to
+    output = open_output(None if args.metrics is not None and args.metrics_format == "prometheus" else args.output)
+
+    try:
+        failures = run(args, output)
+
+    except convert.Error as err:
+        logging.error(err)
+        failures = 1
+
+    finally:
+        if output is sys.stdout:
+            output.flush()
+        else:
+            output.close()
+
+        write_timings(args)
+
+    if failures:
+        sys.exit(RECOVERABLE_ERROR)
+
+
+def write_timings(args):
+    """Logs the timing summary and writes the timing dump, as requested on the command line"""
+
+    if args.timings:
+        logging.info(f'timings (ms):\n{timing.summary()}')
+
+    if args.timings_dump is not None:
+        with open(args.timings_dump, 'w') as dump_file:
+            dump_file.write(timing.dump())
+
+
+def run(args, output):
+    """Runs the mode selected by the command line arguments and returns the number of failed commands"""
+
+    output_format = args.format or "ndjson"
+
+    if args.script is not None:
+        with open(args.script) as script_file:
+            script = script_file.read()
+
+        if not args.dry_run:
+            return call_jboss_api_script(script, output, output_format, args.deadline)
+
+        # The plan is the request type and API call of every command, as --dry-run prints for --batch
+        with get_writer(output_format, output) as writer:
+            for step in load_plan(script, PLAN_DIR)["steps"]:
+                writer.write(step)
+
+        return 0
+
+    if args.dry_run:
+        if args.batch is None:
+            single_format = args.format or ("pretty" if USE_PRETTY_JSON else "json")
+            return call_jboss_api_dry_run([args.command], output, single_format)
+
+        if args.batch == "-":
+            return call_jboss_api_dry_run(sys.stdin, output, output_format, args.composite)
+
+        with open(args.batch) as commands:
+            return call_jboss_api_dry_run(commands, output, output_format, args.composite)
+
+    if args.metrics is not None:
+        with open(args.metrics) as metrics_file:
+            metrics = load_metrics(metrics_file, args.interval)
+
+        inventory = None
+        if args.inventory is not None:
+            with open(args.inventory) as inventory_file:
+                inventory = inventory_file.readlines()
+
+        call_jboss_api_metrics(metrics, inventory, output, args.metrics_format, args.output, args.history, args.polls)
+        return 0
+
+    if args.deploy is not None:
+        if args.inventory is None:
+            return call_jboss_api_deploy(args.deploy, output, args.deployment_name, not args.disabled, args.force,
+                                         output_format=output_format, deadline=args.deadline)
+
+        with open(args.inventory) as inventory:
+            return call_jboss_api_deploy(args.deploy, output, args.deployment_name, not args.disabled, args.force,
+                                         inventory, args.max_concurrency, output_format, args.deadline)
+
+    if args.snapshot is not None:
+        if args.inventory is None:
+            return call_jboss_api_snapshot(args.snapshot, output, args.full, output_format=output_format,
+                                           deadline=args.deadline)
+
+        with open(args.inventory) as inventory:
+            return call_jboss_api_snapshot(args.snapshot, output, args.full, inventory, args.max_concurrency,
+                                           output_format, args.deadline)
+
+    if args.reconcile is not None:
+        from jboss_reconcile import load_desired
+
+        desired = load_desired(args.reconcile)
+
+        if args.inventory is None:
+            return call_jboss_api_reconcile(desired, output, args.check, output_format=output_format,
+                                            deadline=args.deadline)
+
+        with open(args.inventory) as inventory:
+            return call_jboss_api_reconcile(desired, output, args.check, inventory, args.max_concurrency,
+                                            output_format, args.deadline)
+
+    if args.inventory is not None:
+        with open(args.inventory) as inventory:
+            return call_jboss_api_fleet(inventory, args.command, output, max_concurrency=args.max_concurrency,
+                                        max_per_host=args.max_per_host, output_format=output_format,
+                                        deadline=args.deadline)
+
+    if args.stream:
+        call_jboss_api_stream(args.command, output, output_format)
+        return 0
+
+    if args.batch is None:
+        call_jboss_api(args.command, output, args.format, args.max_in_flight or DEFAULT_MAX_IN_FLIGHT, args.deadline)
+        return 0
+
+    def run_batch(commands):
+        if args.composite:
+            return call_jboss_api_composite(commands, output, output_format, args.deadline)
 
-    # Suported operations for HTTP GET method requests
-    supported_get_ops = [
-        "read-attribute",  # as attribute
-        "read-resource",  # as resource
-        "read-resource-description",  # as resource-description
-        "list-snapshots",  # as snapshots
-        # "read-operation-description",  # as operation=operation-description
-        "read-operation-names"  # as operation-names
-    ]
+        return call_jboss_api_batch(commands, output, args.max_in_flight or 1, output_format, args.deadline)
 
-    # If our CLI command is using one of the read-only HTTP GET operations supported by JBoss/Wildfly, use HTTP GET
-    for operation in supported_get_ops:
-        if operation in cli_command:
-            request_type = "GET"
+    if args.batch == "-":
+        failures = run_batch(sys.stdin)
+    else:
+        with open(args.batch) as commands:
+            failures = run_batch(commands)
 
-    return request_type
+    for host, stats in get_client().stats().items():
+        logging.info(f'{host}: {stats}')
 
+    logging.info(f'command cache: {convert.cache_stats()}')
 
-def url(url, api_path=""):
-    """Return a structured URL for API calls"""
+    if get_client().response_cache is not None:
+        logging.info(f'response cache: {get_client().response_cache.stats()}')
 
-    return url + ":" + JBOSS_PORT + "/management" + api_path
+    return failures
 
 
 if __name__ == '__main__':
-    call_jboss_api(sys.argv[1])
+    main()
@@ -0,0 +1,310 @@
+"""
+jboss_cache.py
+
+Read-through cache of JBOSS management API responses
+
+Read only operations such as read-resource-description, read-operation-names or read-resource on static
+configuration return the same answer for hours. A ResponseCache keeps successful results of the operations sent with
+HTTP GET for a configurable time to live, in an in-memory LRU tier and an optional on-disk tier shared between runs.
+Runtime values change between calls and are never cached: reads with include-runtime=true, and read-attribute unless
+the model index describes the attribute as configuration.
+
+Entries are keyed by host, address, operation and arguments, normalized through the convert module so that
+different spellings of the same command (whitespace, empty parenthesis, argument order) share an entry.
+
+Any write operation on an address, such as write-attribute, add, remove or :reload, invalidates the cached entries
+of that address and every address under it. Entries of the parent addresses are dropped as well, since a recursive
+read of a parent includes the changed resource.
+"""
+
+import convert.convert as convert
+from urllib.parse import quote
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+DEFAULT_TTL = 300
+
+# Operations sent with HTTP POST that never change the management model
+READ_ONLY_OPERATIONS = convert.READ_ONLY_OPERATIONS
+
+# Name of the on-disk entries, which can never clash with a percent encoded address directory
+ENTRY_PREFIX = '='
+
+
+class ResponseCache:
+    """Caches successful results of read only JBOSS CLI commands
+
+    Parameters
+    ----------
+    ttl: float
+        Seconds a result stays valid
+    maxsize: int
+        Maximum number of results kept in memory
+    directory: str
+        Directory for the on-disk tier. None keeps results in memory only
+    operation_ttls: dict
+        Seconds a result stays valid for specific operations, E.g { "read-resource-description": 86400 }
+
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, maxsize=convert.DEFAULT_CACHE_SIZE, directory=None, operation_ttls=None):
+        self.ttl = ttl
+        self.directory = directory
+        self.operation_ttls = operation_ttls or {}
+
+        self._memory = convert.LRUCache(maxsize)
+        self._counters = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "invalidations": 0}
+        self._lock = threading.Lock()
+
+    def get(self, host, cli_command):
+        """Returns the cached results of a command on a host, or None if there are none or they expired
+
+        Parameters
+        ----------
+        host: str
+            The management URL of the JBOSS server
+        cli_command: str
+            The JBOSS CLI command
+
+        Returns
+        -------
+        dict:
+            A fresh copy of the { outcome, result } structure, callers may modify it
+
+        """
+
+        key = cache_key(host, cli_command)
+        entry = self._memory.get(key)
+        tier = "memory_hits"
+
+        if entry is None and self.directory is not None:
+            entry = self._read_disk(key)
+            tier = "disk_hits"
+
+            if entry is not None:
+                self._memory.put(key, entry)
+
+        if entry is not None and entry[0] < time.time():
+            self._memory.pop(key)
+            entry = None
+
+        if entry is None:
+            self._count("misses")
+            return None
+
+        self._count("hits")
+        self._count(tier)
+
+        # Entries are kept serialized so every hit hands out its own copy
+        return json.loads(entry[1])
+
+    def put(self, host, cli_command, results, model_index=None):
+        """Caches the results of a command on a host if they are cacheable
+
+        Only successful results of the operations sent with HTTP GET are cached, and never those of reads that
+        include runtime values, which change between calls
+
+        Parameters
+        ----------
+        host: str
+            The management URL of the JBOSS server
+        cli_command: str
+            The JBOSS CLI command
+        results: dict
+            The normalized { outcome, result } structure of the command
+        model_index: convert.model_index.ModelIndex
+            Tells configuration attributes from runtime ones. Without it no read-attribute result is cached
+
+        """
+
+        if results is None or results.get("outcome") != "success":
+            return
+
+        if convert.cached_get_request_type(cli_command) != "GET":
+            return
+
+        api_call = convert.cached_jboss_command_to_http_request(cli_command, "POST")
+
+        if str(api_call.get("include-runtime", "false")).lower() == "true":
+            return
+
+        # read-attribute is sent with HTTP GET for runtime attributes too, E.g server-state or ActiveCount
+        if api_call["operation"] == "read-attribute" and (
+                model_index is None
+                or not model_index.configuration_attribute(api_call.get("address", []), api_call.get("name"))):
+            return
+
+        ttl = self.operation_ttls.get(api_call["operation"], self.ttl)
+        if ttl <= 0:
+            return
+
+        key = cache_key(host, cli_command)
+        entry = (time.time() + ttl, json.dumps(results))
+
+        self._memory.put(key, entry)
+
+        if self.directory is not None:
+            self._write_disk(key, entry)
+
+    def observe(self, host, cli_command):
+        """Invalidates the entries a command changes if it is a write operation
+
+        Parameters
+        ----------
+        host: str
+            The management URL of the JBOSS server the command was sent to
+        cli_command: str
+            The JBOSS CLI command that was sent
+
+        """
+
+        if convert.cached_get_request_type(cli_command) == "GET":
+            return
+
+        api_call = convert.cached_jboss_command_to_http_request(cli_command, "POST")
+        operation = api_call["operation"]
+
+        if operation.startswith("read-") or operation in READ_ONLY_OPERATIONS:
+            return
+
+        self.invalidate(host, api_call.get("address", []))
+
+    def invalidate(self, host, address):
+        """Drops the entries of an address, every address under it and its parent addresses
+
+        Parameters
+        ----------
+        host: str
+            The management URL of the JBOSS server
+        address: list
+            The address in the list form used for HTTP POST, E.g ["subsystem", "undertow"]. An empty list
+            invalidates the whole host
+
+        """
+
+        address = tuple(address)
+        self._count("invalidations")
+        logging.debug(f'Invalidating {host} {list(address)}')
+
+        for key in self._memory.keys():
+            if key[0] == host and _related(key[1], address):
+                self._memory.pop(key)
+
+        if self.directory is None:
+            return
+
+        # Everything under the address is a subtree of directories, the parents only need their own entries removed
+        path = self._disk_path(host, address)
+        shutil.rmtree(path, ignore_errors=True)
+
+        for depth in range(len(address)):
+            parent = self._disk_path(host, address[:depth])
+
+            try:
+                names = os.listdir(parent)
+            except FileNotFoundError:
+                continue
+
+            for name in names:
+                if name.startswith(ENTRY_PREFIX):
+                    _remove(os.path.join(parent, name))
+
+    def clear(self):
+        """Removes every entry from both tiers"""
+
+        self._memory.clear()
+
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def stats(self):
+        """Returns the hit, miss and invalidation counters and the memory tier size"""
+
+        with self._lock:
+            return {**self._counters, "size": len(self._memory)}
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _disk_path(self, host, address):
+        """Returns the directory holding the on-disk entries of an address"""
+
+        return os.path.join(self.directory, _path_element(host), *(_path_element(element) for element in address))
+
+    def _entry_path(self, key):
+        digest = hashlib.sha1(json.dumps(key[2:]).encode()).hexdigest()
+
+        return os.path.join(self._disk_path(key[0], key[1]), f'{ENTRY_PREFIX}{digest}.json')
+
+    def _read_disk(self, key):
+        path = self._entry_path(key)
+
+        try:
+            with open(path) as entry_file:
+                entry = json.load(entry_file)
+
+        except (OSError, ValueError):
+            return None
+
+        if entry["expires"] < time.time():
+            _remove(path)
+            return None
+
+        return entry["expires"], entry["results"]
+
+    def _write_disk(self, key, entry):
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporary, 'w') as entry_file:
+            json.dump({"expires": entry[0], "results": entry[1]}, entry_file)
+
+        os.replace(temporary, path)
+
+
+def cache_key(host, cli_command):
+    """Returns the normalized cache key of a command on a host
+
+    Returns
+    -------
+    tuple:
+        (host, address, operation, arguments) where address is a tuple in the HTTP POST list form and arguments
+        the JSON encoded arguments sorted by name
+
+    """
+
+    api_call = convert.cached_jboss_command_to_http_request(cli_command, "POST")
+
+    address = tuple(api_call.pop("address", ()))
+    operation = api_call.pop("operation")
+
+    return host, address, operation, json.dumps(api_call, sort_keys=True)
+
+
+def _related(cached_address, address):
+    """Returns True if cached_address is the address, under it or one of its parents"""
+
+    length = min(len(cached_address), len(address))
+
+    return cached_address[:length] == address[:length]
+
+
+def _path_element(element):
+    """Returns an address element or host encoded as a single, safe directory name"""
+
+    return quote(element, safe='').replace('.', '%2E')
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
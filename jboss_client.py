@@ -0,0 +1,945 @@
+"""
+jboss_client.py
+
+Reusable client for the JBOSS HTTP management API
+
+A JBossClient keeps one requests.Session per JBOSS host/port. Each session holds its own keep-alive connection pool
+and a single HTTPDigestAuth instance, so the digest nonce from the first 401 challenge is reused for the requests
+that follow instead of repeating the challenge/response round trip on every call.
+"""
+
+import convert.convert as convert
+from convert import timing
+from convert.model_index import ModelIndex, ModelIndexError, index_path, model_version
+import copy
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPDigestAuth
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from jboss_cache import READ_ONLY_OPERATIONS
+import jboss_dmr
+from jboss_dmr import DEFAULT_TRANSPORT, TRANSPORTS
+from jboss_resilience import (
+    DEFAULT_BACKOFF, DEFAULT_CONNECT_TIMEOUT, DEFAULT_FAILURE_THRESHOLD, DEFAULT_READ_TIMEOUT, DEFAULT_RESET_TIMEOUT,
+    DEFAULT_RETRIES, RETRY_STATUS_CODES, CircuitBreaker, backoff_delay, timeouts
+)
+from jboss_stream import (
+    DEFAULT_CHUNK_SIZE, decode_chunks, json_events, model_child_types, resource_records, unwrap_result
+)
+
+DEFAULT_POOL_MAXSIZE = 10
+
+# Operation being sent by the current thread and the seconds spent opening connections for it, for the timing module
+_timed = threading.local()
+
+
+class OperationFailed(Exception):
+    """Raised when JBOSS reports that an operation failed
+
+    Parameters
+    ----------
+    cli_command: str
+        The JBOSS CLI command that failed
+    results: dict
+        The { outcome, failure-description } structure returned by JBOSS
+
+    """
+
+    def __init__(self, cli_command, results):
+        self.cli_command = cli_command
+        self.results = results
+        super().__init__(f'{cli_command} failed: {results.get("failure-description")}')
+
+
+class SingleFlight:
+    """Lets concurrent callers asking for the same key share a single call
+
+    The first caller of a key runs the function, callers arriving while it runs wait for it and receive the same
+    value or exception instead of running the function again
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function):
+        """Returns the value of function and whether it was shared with a call already in flight
+
+        Parameters
+        ----------
+        key: hashable
+            Calls with equal keys are shared
+        function: callable
+            Called without arguments by the first caller of the key
+
+        Returns
+        -------
+        value: object
+            What function returned
+        shared: bool
+            True if the value came from another caller's call
+
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+
+            if call.error is not None:
+                raise call.error
+
+            return call.value, True
+
+        try:
+            call.value = function()
+
+        except BaseException as err:
+            call.error = err
+            raise
+
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+            call.done.set()
+
+        return call.value, False
+
+
+class _Call:
+    """A call in flight in a SingleFlight"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _timed.connect += time.perf_counter() - start
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _timed.connect += time.perf_counter() - start
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections measure how long they take to open"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool,
+                                                   "https": _TimedHTTPSConnectionPool}
+
+
+class JBossClient:
+    """Executes JBOSS CLI commands against one or more JBOSS management interfaces
+
+    Parameters
+    ----------
+    url: str
+        Default URL to JBOSS server. E.g http://localhost
+    port: str
+        Default port the JBOSS server is listening on
+    user: str
+        JBOSS user with appropriate permissions to make API calls
+    password: str
+        Password for the JBOSS user
+    pretty_json: bool
+        Ask JBOSS to return pretty JSON
+    pool_maxsize: int
+        Number of keep-alive connections kept open per host/port
+    response_cache: jboss_cache.ResponseCache
+        Cache for the results of read only commands. None sends every command to JBOSS
+    model_index: convert.model_index.ModelIndex
+        Management model used to validate commands and choose the HTTP method before they are sent
+    single_flight: bool
+        Share one HTTP call between concurrent identical read only requests
+    connect_timeout: float
+        Seconds to wait for a connection to JBOSS
+    read_timeout: float
+        Seconds to wait between bytes of a response
+    retries: int
+        Times a read only request is retried after a connection error, timeout or 502/503/504 answer
+    backoff: float
+        Upper bound of the first jittered retry delay in seconds, doubled for every following retry
+    failure_threshold: int
+        Consecutive failures after which calls to a host fail immediately, 0 never stops calling a host
+    reset_timeout: float
+        Seconds before a host that was failing is called again
+    transport: str
+        One of TRANSPORTS. dmr sends operations and receives results as application/dmr-encoded, except for
+        streamed reads which are parsed as JSON while they arrive
+    compress: bool
+        Ask JBOSS for gzip compressed responses, which are decompressed while they are read
+
+    """
+
+    def __init__(self, url='http://localhost', port='9990', user='', password='', pretty_json=False,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, response_cache=None, model_index=None, single_flight=True,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT, retries=DEFAULT_RETRIES,
+                 backoff=DEFAULT_BACKOFF, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout=DEFAULT_RESET_TIMEOUT, transport=DEFAULT_TRANSPORT, compress=True):
+        if transport not in TRANSPORTS:
+            raise ValueError(f'Unknown transport {transport}, expected one of {", ".join(TRANSPORTS)}')
+
+        self.url = url
+        self.port = str(port)
+        self.user = user
+        self.password = password
+        self.pretty_json = pretty_json
+        self.pool_maxsize = pool_maxsize
+        self.response_cache = response_cache
+        self.model_index = model_index
+        self.single_flight = SingleFlight() if single_flight else None
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.transport = transport
+        self.compress = compress
+
+        # The jboss_tree.ResourceTree behind root, created on first use
+        self.tree = None
+
+        self._sessions = {}
+        self._breakers = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def root(self):
+        """The root jboss_tree.Resource of the default server, whose children and attributes are read on first access
+
+        Set tree to a jboss_tree.ResourceTree of this client beforehand to change its time to live or size
+        """
+
+        with self._lock:
+            if self.tree is None:
+                from jboss_tree import ResourceTree
+
+                self.tree = ResourceTree(self)
+
+        return self.tree.root
+
+    def close(self):
+        """Closes every pooled session and its connections"""
+
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+
+            self._sessions.clear()
+
+    def execute(self, cli_command, url=None, port=None, deadline=None):
+        """Executes a JBOSS CLI command and returns the normalized results
+
+        Parameters
+        ----------
+        cli_command: str
+            The JBOSS CLI command that we want to run
+        url: str
+            URL to the JBOSS server, defaults to the client URL
+        port: str
+            Port of the JBOSS server, defaults to the client port
+        deadline: float
+            time.monotonic() value by which the command has to complete, None waits as long as the timeouts allow
+
+        Returns
+        -------
+        dict:
+            The { outcome: [outcome], result: [return] } structure returned by JBOSS
+
+        Raises
+        ------
+        requests.exceptions.HTTPError
+            When JBOSS did not answer with a management result, E.g a 401 for a bad username/password
+        requests.exceptions.RequestException
+            When JBOSS could not be reached or did not answer in time, after any retries
+        jboss_resilience.CircuitOpenError
+            When the host has been failing and is not called
+        jboss_resilience.DeadlineExceeded
+            When the deadline passed before the command could be sent
+
+        """
+
+        response, results = self.request(cli_command, url, port, deadline)
+
+        if results is None:
+            response.raise_for_status()
+
+        return results
+
+    def request(self, cli_command, url=None, port=None, deadline=None):
+        """Executes a JBOSS CLI command and returns both the HTTP response and the normalized results
+
+        Parameters
+        ----------
+        cli_command: str
+            The JBOSS CLI command that we want to run
+        url: str
+            URL to the JBOSS server, defaults to the client URL
+        port: str
+            Port of the JBOSS server, defaults to the client port
+        deadline: float
+            time.monotonic() value by which the command has to complete, None waits as long as the timeouts allow
+
+        Returns
+        -------
+        response: requests.Response
+            The raw HTTP response. None when the results came from the response cache
+        results: dict
+            The response normalized to the { outcome: [outcome], result: [return] } structure. None when JBOSS
+            did not answer with a management result
+
+        """
+
+        if not timing.active:
+            return self._request(cli_command, *self._compile(cli_command), url, port, deadline)
+
+        start = time.perf_counter()
+        request_type, api_call = self._compile(cli_command)
+        response, results = self._request(cli_command, request_type, api_call, url, port, deadline)
+
+        # Recorded under the operation already parsed for the request, by its CLI name
+        timing.record("request", convert.operation_name(request_type, api_call["operation"]),
+                      time.perf_counter() - start)
+
+        return response, results
+
+    def _request(self, cli_command, request_type, api_call, url, port, deadline):
+        host = management_url(url or self.url, port or self.port)
+
+        if self.response_cache is not None and request_type == "GET":
+            results = self.response_cache.get(host, cli_command)
+
+            if results is not None:
+                return None, results
+
+        def send():
+            response = self._send(host, request_type, api_call, deadline=deadline)
+
+            if timing.active:
+                with timing.timer("decode", convert.operation_name(request_type, api_call["operation"])):
+                    results = normalize_response(request_type, response)
+            else:
+                results = normalize_response(request_type, response)
+
+            if self.response_cache is not None:
+                if request_type == "GET":
+                    self.response_cache.put(host, cli_command, results, self.model_index)
+                else:
+                    self.response_cache.observe(host, cli_command)
+
+            self._changed(host, request_type, api_call)
+
+            return response, results
+
+        if self.single_flight is None or not _read_only(request_type, api_call):
+            return send()
+
+        key = (host, request_type, json.dumps(api_call, sort_keys=True))
+        (response, results), shared = self.single_flight.do(key, send)
+
+        if not shared:
+            return response, results
+
+        with self._lock:
+            self._stats[host]["deduplicated"] += 1
+
+        # Every caller gets its own copy of the results, the response is only read
+        return response, copy.deepcopy(results)
+
+    def stream_records(self, cli_command, url=None, port=None, child_types=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                       deadline=None):
+        """Executes a read command and yields its result as flattened records while the response arrives
+
+        The response body is parsed incrementally, so memory stays bounded however large the result is. Intended for
+        recursive read-resource commands, E.g :read-resource(recursive=true,include-runtime=true)
+
+        Parameters
+        ----------
+        cli_command: str
+            The JBOSS CLI command that we want to run
+        url: str
+            URL to the JBOSS server, defaults to the client URL
+        port: str
+            Port of the JBOSS server, defaults to the client port
+        child_types: callable
+            Tells child resource types from attributes, see jboss_stream.resource_records. Defaults to the model
+            index of the client when it has one
+        chunk_size: int
+            Number of bytes read from the connection at a time
+        deadline: float
+            time.monotonic() value by which the response has to start arriving
+
+        Yields
+        ------
+        tuple:
+            (address, attribute, value), address being a list in the HTTP POST list form
+
+        Raises
+        ------
+        OperationFailed
+            When JBOSS reports the operation failed
+        requests.exceptions.HTTPError
+            When JBOSS did not answer with a management result, E.g a 401 for a bad username/password
+
+        """
+
+        request_type, api_call = self._compile(cli_command)
+        address = convert.cached_jboss_command_to_http_request(cli_command, "POST").get("address", [])
+
+        if child_types is None and self.model_index is not None:
+            child_types = model_child_types(self.model_index)
+
+        host = management_url(url or self.url, port or self.port)
+
+        with self._send(host, request_type, api_call, stream=True, deadline=deadline) as response:
+            if response.status_code != 200:
+                results = normalize_response(request_type, response)
+
+                if results is None:
+                    response.raise_for_status()
+
+                raise OperationFailed(cli_command, results)
+
+            events = json_events(decode_chunks(response.iter_content(chunk_size), response.encoding or 'utf-8'))
+
+            # HTTP GET answers with the bare result, HTTP POST wraps it in { outcome, result }
+            if request_type == "POST":
+                events = unwrap_result(events)
+
+            yield from resource_records(events, address, child_types)
+
+    def execute_api_call(self, request_type, api_call, url=None, port=None, deadline=None):
+        """Sends an API call converted ahead of time, E.g by a convert.script plan, and returns the normalized results
+
+        Parameters
+        ----------
+        request_type: str
+            The HTTP request method to use [GET, POST]
+        api_call: dict
+            The API call, as returned by convert.jboss_command_to_http_request for request_type
+        url: str
+            URL to the JBOSS server, defaults to the client URL
+        port: str
+            Port of the JBOSS server, defaults to the client port
+        deadline: float
+            time.monotonic() value by which the call has to complete
+
+        Returns
+        -------
+        dict:
+            The { outcome: [outcome], result: [return] } structure returned by JBOSS
+
+        Raises
+        ------
+        requests.exceptions.HTTPError
+            When JBOSS did not answer with a management result, E.g a 401 for a bad username/password
+
+        """
+
+        host = management_url(url or self.url, port or self.port)
+
+        # The address of an HTTP GET call is popped while it is sent
+        response = self._send(host, request_type, convert.copy_api_call(api_call), deadline=deadline)
+
+        if self.response_cache is not None and not _read_only(request_type, api_call):
+            self.response_cache.invalidate(host, api_call.get("address", []))
+
+        self._changed(host, request_type, api_call)
+
+        results = normalize_response(request_type, response)
+        if results is None:
+            response.raise_for_status()
+
+        return results
+
+    def execute_composite(self, cli_commands, url=None, port=None, deadline=None):
+        """Executes many JBOSS CLI commands as the steps of a single composite operation
+
+        Every command is sent in one HTTP POST. JBOSS rolls back all of the steps if any of them fail
+
+        Parameters
+        ----------
+        cli_commands: list
+            The JBOSS CLI commands that we want to run
+        url: str
+            URL to the JBOSS server, defaults to the client URL
+        port: str
+            Port of the JBOSS server, defaults to the client port
+        deadline: float
+            time.monotonic() value by which the operation has to complete
+
+        Returns
+        -------
+        list:
+            A (cli_command, step_results) tuple for each command, in the same order as cli_commands
+
+        Raises
+        ------
+        requests.exceptions.HTTPError
+            When JBOSS did not answer with a management result, E.g a 401 for a bad username/password
+
+        """
+
+        api_call = convert.jboss_commands_to_composite_request(cli_commands)
+
+        host = management_url(url or self.url, port or self.port)
+        # A composite operation with a write step changes the model, so it is never retried
+        response = self._send(host, "POST", api_call, deadline=deadline)
+
+        if self.response_cache is not None:
+            for cli_command in cli_commands:
+                self.response_cache.observe(host, cli_command)
+
+        self._changed(host, "POST", api_call)
+
+        results = normalize_response("POST", response)
+        if results is None:
+            response.raise_for_status()
+
+        return convert.unpack_composite_response(cli_commands, results)
+
+    def fetch_model_index(self, directory, url=None, port=None):
+        """Returns the management model index of a JBOSS server
+
+        The index is only built the first time a server version is seen, after that it is loaded from directory.
+        Checking the version costs one small read, building the index one recursive read-resource-description
+
+        Parameters
+        ----------
+        directory: str
+            Where the indexes of each server version are saved
+        url: str
+            URL to the JBOSS server, defaults to the client URL
+        port: str
+            Port of the JBOSS server, defaults to the client port
+
+        Returns
+        -------
+        convert.model_index.ModelIndex:
+            The index of the server version
+
+        """
+
+        root = self.execute(':read-resource(attributes-only=true)', url, port)
+        if root.get("outcome") != "success":
+            raise ModelIndexError(f'Unable to read the server version: {root.get("failure-description")}')
+
+        version = model_version(root["result"])
+        path = index_path(directory, version)
+
+        if os.path.exists(path):
+            return ModelIndex.load(path)
+
+        logging.info(f'Building model index for {version}')
+
+        description = self.execute(':read-resource-description(recursive=true,operations=true)', url, port)
+        if description.get("outcome") != "success":
+            raise ModelIndexError(f'Unable to read the model description: {description.get("failure-description")}')
+
+        index = ModelIndex.from_description(description["result"], version)
+        index.save(path)
+
+        return index
+
+    def stats(self):
+        """Returns the per host connection and authentication counters
+
+        Returns
+        -------
+        dict:
+            Keyed by management URL, each value containing
+            requests: HTTP requests made by the caller
+            deduplicated: requests that shared the HTTP call of an identical request already in flight
+            retries: read only requests sent again after a failure
+            circuit: state of the circuit breaker of the host, closed, open or half-open
+            auth_retries: requests that had to answer a 401 digest challenge before succeeding
+            bytes_received: bytes of the responses that were not streamed, as sent on the wire before decompression
+            connections_opened: new TCP connections opened
+            connections_reused: HTTP requests served over an already open keep-alive connection
+
+        """
+
+        with self._lock:
+            stats = {host: dict(counters) for host, counters in self._stats.items()}
+
+            for host, session in self._sessions.items():
+                opened, sent = 0, 0
+
+                # Each session only talks to one host, so every urllib3 pool it holds belongs to that host
+                pools = session.get_adapter(host).poolmanager.pools
+                for key in pools.keys():
+                    opened += pools[key].num_connections
+                    sent += pools[key].num_requests
+
+                stats[host]["connections_opened"] = opened
+                stats[host]["connections_reused"] = sent - opened
+                stats[host]["circuit"] = self._breakers[host].state
+
+        return stats
+
+    def upload(self, body, url=None, port=None, deadline=None):
+        """Sends an operation with attached content to the management upload endpoint and returns the results
+
+        The body is streamed as it is read, and is never retried since the operation changes the management model
+
+        Parameters
+        ----------
+        body: jboss_deploy.MultipartBody
+            The multipart/form-data body holding the operation and its content
+        url: str
+            URL to the JBOSS server, defaults to the client URL
+        port: str
+            Port of the JBOSS server, defaults to the client port
+        deadline: float
+            time.monotonic() value by which the upload has to complete
+
+        Returns
+        -------
+        dict:
+            The { outcome: [outcome], result: [return] } structure returned by JBOSS
+
+        Raises
+        ------
+        requests.exceptions.HTTPError
+            When JBOSS did not answer with a management result
+
+        """
+
+        host = management_url(url or self.url, port or self.port)
+
+        # Sharing the session of the management URL reuses its connections and digest nonce, so the body is not
+        # sent a second time to answer a 401 challenge
+        session = self._session(host)
+        breaker = self._breakers[host]
+
+        # The deadline is checked before the breaker, which must not let a trial call through that is never made
+        timeout = timeouts(self.connect_timeout, self.read_timeout, deadline)
+        breaker.before_call()
+        _timed.connect = 0
+
+        try:
+            response = session.post(management_upload_url(url or self.url, port or self.port), data=body,
+                                    headers={'content-type': body.content_type}, timeout=timeout)
+
+        except BaseException:
+            # Any error is the outcome of the call, so a half-open breaker is never left waiting for one
+            breaker.record_failure()
+            raise
+
+        self._record(host, response)
+        breaker.record_success()
+
+        if self.response_cache is not None:
+            self.response_cache.invalidate(host, body.operation.get("address", []))
+
+        self._changed(host, "POST", body.operation)
+
+        results = normalize_response("POST", response)
+
+        if results is None:
+            response.raise_for_status()
+
+        return results
+
+    def _changed(self, host, request_type, api_call):
+        """Drops the resources of the resource tree an API call changes, if it is a write operation"""
+
+        if self.tree is None or _read_only(request_type, api_call):
+            return
+
+        # The steps of a composite operation each change their own address
+        for step in api_call.get("steps") or [api_call]:
+            if not _read_only(request_type, step):
+                self.tree.invalidate(host, step.get("address", []))
+
+    def _compile(self, cli_command):
+        """Returns the HTTP request type and API call of a CLI command"""
+
+        if self.model_index is not None:
+            # Validated against the management model, which also decides between HTTP GET and POST
+            request_type, api_call = self.model_index.compile(cli_command)
+
+        else:
+            # Determine if we are using HTTP GET or POST method
+            request_type = convert.cached_get_request_type(cli_command)
+
+            # Convert the JBOSS cli command to the appropriate API call. The cache hands out copies, so the address
+            # can safely be popped when sending the request
+            api_call = convert.cached_jboss_command_to_http_request(cli_command, request_type)
+
+        # BUG: Use pretty JSON only works on POST methods, because of the way I have to reformat the JSON
+        # when using GET method requests.
+        if self.pretty_json is True:
+            api_call = {**api_call, "json.pretty": 1}
+
+        return request_type, api_call
+
+    def _send(self, host, request_type, api_call, stream=False, deadline=None):
+        """Sends an API call to a management URL and returns the response
+
+        Read only calls are retried after connection errors, timeouts and 502/503/504 answers, as long as the
+        deadline allows. The last answer is returned, or the last error raised, once there are no retries left
+
+        """
+
+        session = self._session(host)
+        breaker = self._breakers[host]
+        retries = self.retries if _read_only(request_type, api_call) else 0
+
+        # Streamed results are parsed while they arrive, which only the JSON form allows
+        headers, body = None, None
+        if self.transport == "dmr" and not stream:
+            headers = {'accept': jboss_dmr.CONTENT_TYPE}
+
+            if request_type == "POST":
+                headers['content-type'] = jboss_dmr.CONTENT_TYPE
+                body = jboss_dmr.to_base64(api_call)
+
+        if request_type == "GET":
+            # data structure returned from convert module sets the address for an HTTP GET method to a string
+            # with the correct path to be added to the URL.
+            api_path = ""
+            if api_call.get("address"):
+                api_path = api_call.pop("address")
+
+            logging.debug(f'address after pop: {api_path}')
+
+        attempt = 0
+        while True:
+            # The deadline is checked before the breaker, which must not let a trial call through that is never made
+            timeout = timeouts(self.connect_timeout, self.read_timeout, deadline)
+            breaker.before_call()
+
+            _timed.connect = 0
+            start = time.perf_counter()
+
+            try:
+                if request_type == "GET":
+                    response = session.get(host + api_path, params=api_call, headers=headers, stream=stream,
+                                           timeout=timeout)
+                elif body is not None:
+                    response = session.post(host, data=body, headers=headers, timeout=timeout)
+                else:
+                    response = session.post(host, json=api_call, stream=stream, timeout=timeout)
+
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as err:
+                breaker.record_failure()
+
+                if not self._retry(host, attempt, retries, deadline, err):
+                    raise
+
+            except BaseException:
+                # Any other error is the outcome of the call too, so a half-open breaker is never left waiting for one
+                breaker.record_failure()
+                raise
+
+            else:
+                self._record(host, response, stream)
+
+                if timing.active:
+                    operation = convert.operation_name(request_type, api_call["operation"])
+                    _record_phases(operation, response, time.perf_counter() - start)
+
+                if response.status_code not in RETRY_STATUS_CODES:
+                    breaker.record_success()
+                    return response
+
+                breaker.record_failure()
+
+                if not self._retry(host, attempt, retries, deadline, f'HTTP {response.status_code}'):
+                    return response
+
+                response.close()
+
+            attempt += 1
+
+    def _retry(self, host, attempt, retries, deadline, reason):
+        """Waits before the next attempt of a failed call, returns False if there should not be one"""
+
+        if attempt >= retries:
+            return False
+
+        delay = backoff_delay(attempt + 1, self.backoff)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return False
+
+        logging.debug(f'{host}: {reason}, retrying in {delay:.3f}s')
+
+        with self._lock:
+            self._stats[host]["retries"] += 1
+
+        time.sleep(delay)
+
+        return True
+
+    def _session(self, host):
+        """Returns the pooled session for a management URL, creating it on first use"""
+
+        with self._lock:
+            session = self._sessions.get(host)
+
+            if session is None:
+                session = requests.Session()
+                # A single auth instance per session is what lets requests reuse the digest nonce
+                session.auth = HTTPDigestAuth(self.user, self.password)
+                session.headers.update({'content-type': 'application/json',
+                                        'accept-encoding': 'gzip' if self.compress else 'identity'})
+
+                adapter = _TimedAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+
+                self._sessions[host] = session
+                self._stats[host] = {"requests": 0, "auth_retries": 0, "deduplicated": 0, "retries": 0,
+                                     "bytes_received": 0}
+                self._breakers[host] = CircuitBreaker(host, self.failure_threshold, self.reset_timeout)
+
+        return session
+
+    def _record(self, host, response, stream=False):
+        """Updates the counters of a host after a request"""
+
+        # requests keeps the 401 challenge response in the history when digest auth had to retry. A retry that was
+        # rejected again did not succeed, E.g because of a wrong password
+        auth_retries = 0
+        if response.status_code != 401:
+            auth_retries = sum(1 for previous in response.history if previous.status_code == 401)
+
+        # urllib3 counts the bytes read from the socket, before they are decompressed. A streamed body is still unread
+        received = 0 if stream else response.raw.tell()
+
+        with self._lock:
+            self._stats[host]["requests"] += 1
+            self._stats[host]["auth_retries"] += auth_retries
+            self._stats[host]["bytes_received"] += received
+
+
+def normalize_response(request_type, response):
+    """Returns a JBOSS API response in the { outcome: [outcome], result: [return] } structure
+
+    Parameters
+    ----------
+    request_type: str
+        The HTTP request method that was used [GET, POST]
+    response: requests.Response
+        The response returned by JBOSS
+
+    Returns
+    -------
+    dict:
+        The normalized results, or None if the response does not carry a JBOSS management result
+
+    """
+
+    if response.status_code == 200 and request_type == "GET":
+        # HACK: JBOSS REST API returns different data structure when using HTTP GET
+        # It completely removes the { outcome: [outcome], results: [return] } and instead just returns [return]
+        # This makes the output inconsistent and possibly breaking for scripting when used in combination
+        # with HTTP POST requests. Therefore I am adding the return into the same data structure that POST
+        # or a GET (500) failure returns
+        return {"outcome": "success", "result": response_value(response)}
+
+    # Response code 500 will output the correct data structure, only GET 200 returns inconsistently
+    # Anything else (such as a 401) does not carry a JBOSS JSON body
+    if response.status_code in (200, 500):
+        return response_value(response)
+
+    return None
+
+
+def response_value(response):
+    """Returns the decoded body of a JBOSS response, JSON or application/dmr-encoded as its content type says"""
+
+    if response.headers.get('content-type', '').startswith(jboss_dmr.CONTENT_TYPE):
+        return jboss_dmr.from_base64(response.content)
+
+    return response.json()
+
+
+def _record_phases(operation, response, elapsed):
+    """Records the connect, auth-challenge, server and transfer phases of a request that took elapsed seconds"""
+
+    connect = _timed.connect
+    challenge = sum(previous.elapsed.total_seconds() for previous in response.history if previous.status_code == 401)
+    server = response.elapsed.total_seconds()
+    transfer = elapsed - challenge - server - sum(previous.elapsed.total_seconds() for previous in response.history
+                                                  if previous.status_code != 401)
+
+    # requests measures each round trip from before its connection is opened, which happens on the first one
+    if challenge:
+        challenge = max(challenge - connect, 0)
+    else:
+        server = max(server - connect, 0)
+
+    if connect:
+        timing.record("connect", operation, connect)
+
+    if challenge:
+        timing.record("auth-challenge", operation, challenge)
+
+    timing.record("server", operation, server)
+    timing.record("transfer", operation, max(transfer, 0))
+
+
+def _read_only(request_type, api_call):
+    """Returns True if an API call never changes the management model"""
+
+    operation = api_call.get("operation", "")
+
+    if operation == "composite":
+        return all(_read_only(request_type, step) for step in api_call.get("steps", []))
+
+    # HTTP GET operations are read-* operations with the read- prefix removed
+    return request_type == "GET" or operation.startswith("read-") or operation in READ_ONLY_OPERATIONS
+
+
+def management_url(url, port, api_path=""):
+    """Return a structured URL for API calls"""
+
+    return url + ":" + str(port) + "/management" + api_path
+
+
+def management_upload_url(url, port):
+    """Return the URL of the endpoint accepting operations with attached content"""
+
+    return url + ":" + str(port) + "/management-upload"
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+
+"""
+jboss_daemon.py
+
+Resident daemon running JBOSS CLI commands for short lived callers over a local Unix socket
+
+Starting jboss_api.py for every command pays for the Python startup, importing requests, opening a connection and
+answering a digest challenge every time. The daemon, started with ./jboss_api.py --daemon, keeps the converted
+command cache, the keep-alive sessions, the digest nonce and the response cache warm between commands.
+
+Running this module is a drop-in replacement for ./jboss_api.py 'jboss cli command': the command is sent to the
+daemon when one is listening, and run by jboss_api.py in process otherwise. Any other jboss_api.py arguments, such
+as --batch, always run in process.
+
+The protocol is one JSON object per line in each direction, and a connection may send any number of requests
+    Request: {"command": ":read-attribute(name=server-state)", "format": "json"}
+    Response: {"status": 0, "output": "...", "error": null}
+status is the exit status jboss_api.py would have had, output is what it would have written to stdout and error is
+null or {"type": "UnknownCommand", "message": "..."}. Errors never stop the daemon.
+
+The socket is created with owner only permissions, since commands run with the credentials of the daemon.
+JBOSS_API_SOCKET overrides the default socket path, ~/.jboss_api/daemon.sock, and JBOSS_API_DAEMON_TIMEOUT the
+seconds to wait for an answer before running the command in process, by default the connect and read timeouts of a
+JBOSS request.
+
+Usage:
+    ./jboss_api.py --daemon [--socket PATH]
+    ./jboss_daemon.py 'jboss cli command' [--format FORMAT]
+"""
+
+from jboss_output import FORMATS
+from jboss_resilience import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+
+RECOVERABLE_ERROR = 1
+
+DEFAULT_SOCKET = os.environ.get("JBOSS_API_SOCKET",
+                                os.path.join(os.path.expanduser("~"), ".jboss_api", "daemon.sock"))
+DEFAULT_TIMEOUT = float(os.environ.get("JBOSS_API_DAEMON_TIMEOUT", DEFAULT_CONNECT_TIMEOUT + DEFAULT_READ_TIMEOUT))
+
+
+class DaemonUnavailable(Exception):
+    """Raised when no daemon is listening on the socket"""
+    pass
+
+
+class Daemon(socketserver.ThreadingUnixStreamServer):
+    """Unix socket server answering requests with run_command
+
+    Parameters
+    ----------
+    socket_path: str
+        Path of the Unix socket to listen on. A stale socket left by a daemon that died is replaced
+    run_command: callable
+        run_command(cli_command, output, output_format) returning (status, error), see jboss_api.run_command
+
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, run_command):
+        self.socket_path = socket_path
+        self.run_command = run_command
+
+        _remove_stale_socket(socket_path)
+        super().__init__(socket_path, _Handler)
+        os.chmod(socket_path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+    def answer(self, line):
+        """Returns the response to a request line"""
+
+        try:
+            request = json.loads(line)
+            cli_command = request["command"]
+
+        except (ValueError, KeyError, TypeError) as err:
+            return {"status": RECOVERABLE_ERROR, "output": "",
+                    "error": {"type": type(err).__name__, "message": f'Invalid request: {err}'}}
+
+        output = io.StringIO()
+        status, error = self.run_command(cli_command, output, request.get("format"))
+
+        return {"status": status, "output": output.getvalue(), "error": error}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        try:
+            for line in self.rfile:
+                if line.strip():
+                    self.wfile.write(json.dumps(self.server.answer(line)).encode() + b'\n')
+
+        except (BrokenPipeError, ConnectionResetError):
+            # The caller stopped waiting for the answer and ran the command in process
+            pass
+
+
+def serve(run_command, socket_path=DEFAULT_SOCKET):
+    """Answers requests on socket_path until interrupted"""
+
+    with Daemon(socket_path, run_command) as daemon:
+        try:
+            daemon.serve_forever()
+
+        except KeyboardInterrupt:
+            pass
+
+
+def call(cli_command, output_format=None, socket_path=DEFAULT_SOCKET, timeout=DEFAULT_TIMEOUT):
+    """Runs a JBOSS CLI command on the daemon and returns its response
+
+    Raises
+    ------
+    DaemonUnavailable
+        When no daemon is listening, nothing was sent, or the daemon did not answer within timeout seconds. Either
+        way the command is run another way
+
+    """
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+
+    try:
+        try:
+            client.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError, socket.timeout) as err:
+            raise DaemonUnavailable(f'No daemon listening on {socket_path}: {err}')
+
+        client.sendall(json.dumps({"command": cli_command, "format": output_format}).encode() + b'\n')
+
+        try:
+            with client.makefile('rb') as answers:
+                line = answers.readline()
+        except socket.timeout:
+            raise DaemonUnavailable(f'The daemon on {socket_path} did not answer within {timeout} seconds')
+
+    finally:
+        client.close()
+
+    if not line:
+        raise ConnectionError(f'The daemon on {socket_path} closed the connection without answering')
+
+    return json.loads(line)
+
+
+def _remove_stale_socket(socket_path):
+    """Creates the directory of socket_path, and removes a socket no daemon is listening on any more"""
+
+    directory = os.path.dirname(socket_path)
+    if directory:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    if not os.path.exists(socket_path):
+        return
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            probe.connect(socket_path)
+
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(socket_path)
+        return
+
+    raise OSError(f'A daemon is already listening on {socket_path}')
+
+
+def _daemon_request(argv):
+    """Returns the (command, format) of arguments the daemon can run, None for anything else"""
+
+    cli_command, output_format = None, None
+    arguments = iter(argv)
+
+    for argument in arguments:
+        if argument == "--format":
+            output_format = next(arguments, None)
+            if output_format is None:
+                return None
+
+        elif argument.startswith("--format="):
+            output_format = argument.split('=', 1)[1]
+
+        elif argument.startswith('-') or cli_command is not None:
+            return None
+
+        else:
+            cli_command = argument
+
+    # Leave reporting a missing command or an unknown format to jboss_api.py
+    if cli_command is None or output_format not in (None,) + FORMATS:
+        return None
+
+    return cli_command, output_format
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    request = _daemon_request(argv)
+
+    if request is not None:
+        try:
+            response = call(*request)
+
+        except DaemonUnavailable:
+            response = None
+
+        if response is not None:
+            sys.stdout.write(response["output"])
+            sys.stdout.flush()
+
+            if response["error"] is not None:
+                logging.basicConfig(format='%(asctime)s-%(levelname)s-%(message)s', level=logging.INFO)
+                logging.error(response["error"]["message"])
+
+            if response["status"]:
+                sys.exit(response["status"])
+
+            return
+
+    # No daemon, or arguments only jboss_api.py understands
+    import jboss_api
+
+    jboss_api.main(argv)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+"""
+jboss_deploy.py
+
+Deploys archives through the JBOSS management upload endpoint, skipping archives that are already deployed
+
+Archives are streamed to /management-upload as a multipart/form-data request, a chunk at a time, so deploying a
+300MB EAR does not read it into memory. JBOSS names deployment content by its SHA-1 hash, which read-resource returns
+as the content hash of a deployment. When a deployment with the same name exists, the SHA-1 of the archive is
+computed first, reading it in chunks, and an archive with the same hash is not uploaded at all, only deployed with
+deploy if it is disabled. Otherwise the SHA-1 is computed while the archive is uploaded.
+
+An existing deployment is replaced with full-replace-deployment, a new one is added with add. Both are standalone
+server operations, in domain mode the content also has to be assigned to server groups.
+"""
+
+import convert.convert as convert
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+SKIPPED = "skipped"
+ENABLED = "enabled"
+ADDED = "added"
+REPLACED = "replaced"
+
+# HTTP status some servers answer a read of a resource that does not exist with, instead of a 500 failure
+NOT_FOUND = 404
+
+
+def file_sha1(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Returns the hex SHA-1 of a file, reading it a chunk at a time"""
+
+    sha1 = hashlib.sha1()
+
+    with open(path, 'rb') as archive:
+        for chunk in iter(lambda: archive.read(chunk_size), b''):
+            sha1.update(chunk)
+
+    return sha1.hexdigest()
+
+
+def deployed_sha1(results):
+    """Returns the hex SHA-1 of the content of a deployment from its read-resource results, None if it has none
+
+    JBOSS returns the hash as a DMR bytes value, E.g "content": [{"hash": {"BYTES_VALUE": "base64"}}]
+    """
+
+    for content in (results.get("result") or {}).get("content") or []:
+        content_hash = content.get("hash") if isinstance(content, dict) else None
+
+        if isinstance(content_hash, dict) and "BYTES_VALUE" in content_hash:
+            return base64.b64decode(content_hash["BYTES_VALUE"]).hex()
+
+    return None
+
+
+class MultipartBody:
+    """File like multipart/form-data body holding an operation and the content of one file
+
+    The file is read while the body is sent, a chunk at a time, and its SHA-1 is computed on the way. The body has a
+    length, so it is sent with a Content-Length, and can be rewound, so digest auth can send it again after a 401
+
+    Parameters
+    ----------
+    operation: dict
+        The management operation, with {"input-stream-index": 0} as its content
+    content: file
+        Binary file object positioned at the start of the content
+    size: int
+        Number of bytes of content
+    filename: str
+        Name of the file sent in the Content-Disposition header
+
+    """
+
+    def __init__(self, operation, content, size, filename):
+        boundary = os.urandom(16).hex()
+
+        head = (f'--{boundary}\r\n'
+                f'Content-Disposition: form-data; name="operation"\r\n'
+                f'Content-Type: application/json\r\n\r\n'
+                f'{json.dumps(operation)}\r\n'
+                f'--{boundary}\r\n'
+                f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                f'Content-Type: application/octet-stream\r\n\r\n').encode()
+
+        self.operation = operation
+        self.content_type = f'multipart/form-data; boundary={boundary}'
+        self.sha1 = hashlib.sha1()
+
+        self._head = io.BytesIO(head)
+        self._content = content
+        self._content_start = content.tell()
+        self._tail = io.BytesIO(f'\r\n--{boundary}--\r\n'.encode())
+        self._length = len(head) + size + len(self._tail.getvalue())
+        self._position = 0
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self._length - self._position
+
+        data = self._head.read(size)
+
+        if len(data) < size:
+            chunk = self._content.read(size - len(data))
+            self.sha1.update(chunk)
+            data += chunk
+
+        if len(data) < size:
+            data += self._tail.read(size - len(data))
+
+        self._position += len(data)
+
+        return data
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        """Rewinds the body, only seeking back to the start is supported"""
+
+        if offset != 0 or whence != os.SEEK_SET:
+            raise io.UnsupportedOperation("MultipartBody can only be rewound to the start")
+
+        self._head.seek(0)
+        self._content.seek(self._content_start)
+        self._tail.seek(0)
+        self.sha1 = hashlib.sha1()
+        self._position = 0
+
+        return 0
+
+
+def deploy(client, path, name=None, runtime_name=None, enabled=True, sha1=None, force=False, url=None, port=None,
+           deadline=None):
+    """Deploys an archive, unless a deployment with the same name already has the same content
+
+    A deployment with the same content that is disabled is only deployed, when enabled is set
+
+    Parameters
+    ----------
+    client: jboss_client.JBossClient
+        The client used to call JBOSS
+    path: str
+        Path of the archive
+    name: str
+        Name of the deployment, defaults to the file name of the archive
+    runtime_name: str
+        Runtime name of the deployment, defaults to the name
+    enabled: bool
+        Deploy the content once it is uploaded
+    sha1: str
+        Hex SHA-1 of the archive when it is already known, E.g when deploying the same archive to a whole fleet
+    force: bool
+        Upload the archive even when the deployed content has the same hash
+    url: str
+        URL to the JBOSS server, defaults to the client URL
+    port: str
+        Port of the JBOSS server, defaults to the client port
+    deadline: float
+        time.monotonic() value by which every request has to complete
+
+    Returns
+    -------
+    dict:
+        The normalized { outcome, result } structure of the deployment operation with deployment, action (one of
+        skipped, enabled, added or replaced) and sha1 keys added
+
+    Raises
+    ------
+    requests.exceptions.HTTPError
+        When JBOSS did not answer the read of the deployment with a management result, E.g a 401
+
+    """
+
+    name = name or os.path.basename(path)
+    address = convert.format_cli_address([("deployment", name)])
+
+    response, current = client.request(f'{address}:read-resource', url, port, deadline)
+
+    if current is None:
+        if response.status_code != NOT_FOUND:
+            response.raise_for_status()
+
+        current = {"outcome": "failed"}
+
+    exists = current.get("outcome") == "success"
+
+    if exists and not force:
+        sha1 = sha1 or file_sha1(path)
+
+        if deployed_sha1(current) == sha1:
+            if enabled and current["result"].get("enabled") is False:
+                logging.debug(f'{name} is already uploaded with content {sha1}, deploying it')
+                results = client.execute(f'{address}:deploy', url, port, deadline)
+                return {"deployment": name, "action": ENABLED, "sha1": sha1, **results}
+
+            logging.debug(f'{name} is already deployed with content {sha1}')
+            return {"deployment": name, "action": SKIPPED, "sha1": sha1, "outcome": "success"}
+
+    operation = {"content": [{"input-stream-index": 0}], "runtime-name": runtime_name or name, "enabled": enabled}
+
+    if exists:
+        operation = {"operation": "full-replace-deployment", "address": [], "name": name, **operation}
+    else:
+        operation = {"operation": "add", "address": ["deployment", name], **operation}
+
+    with open(path, 'rb') as archive:
+        body = MultipartBody(operation, archive, os.fstat(archive.fileno()).st_size, os.path.basename(path))
+        results = client.upload(body, url, port, deadline)
+
+    uploaded = body.sha1.hexdigest()
+    record = {"deployment": name, "action": REPLACED if exists else ADDED, "sha1": uploaded, **results}
+
+    if sha1 is not None and uploaded != sha1:
+        record = {**record, "outcome": "failed",
+                  "failure-description": f'{path} changed while it was deployed, SHA-1 {sha1} became {uploaded}'}
+
+    return record
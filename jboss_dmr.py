@@ -0,0 +1,351 @@
+"""
+jboss_dmr.py
+
+Encoder and decoder of the binary DMR format, the application/dmr-encoded transport of the JBOSS HTTP management API
+
+A ModelNode is written as its type character followed by its value, the way org.jboss.dmr.ModelNode.writeExternal
+writes it:
+    J long, I int, D double: big-endian, 8, 4 and 8 bytes
+    Z boolean: one byte
+    s string, e expression: Java modified UTF-8, a 2 byte length then the bytes
+    b bytes, i big integer: a 4 byte length then the bytes, two's complement for a big integer
+    d big decimal: the unscaled value as a big integer, then a 4 byte scale
+    l list: a 4 byte count then the nodes
+    o object: a 4 byte count then a string key and a node per entry
+    p property: a string name then a node
+    t type: the type character of a ModelType
+    u undefined: nothing
+
+Over HTTP the binary form is sent Base64 encoded. Values are decoded to what json.loads returns for the JSON form of
+the same ModelNode, so callers never see which transport was used: expressions become {"EXPRESSION_VALUE": ...},
+bytes {"BYTES_VALUE": base64}, properties a single key object and types {"TYPE_MODEL_VALUE": name}. Encoding maps
+them back, and Python int, float, bool, str, list, dict and None to LONG or INT, DOUBLE, BOOLEAN, STRING, LIST, OBJECT
+and UNDEFINED.
+"""
+
+import base64
+import re
+import struct
+
+CONTENT_TYPE = "application/dmr-encoded"
+
+# How a JBossClient encodes operations and results on the wire, JSON or Base64 binary DMR
+TRANSPORTS = ("json", "dmr")
+DEFAULT_TRANSPORT = "json"
+
+TYPE_NAMES = {
+    b'd'[0]: "BIG_DECIMAL", b'i'[0]: "BIG_INTEGER", b'Z'[0]: "BOOLEAN", b'b'[0]: "BYTES", b'D'[0]: "DOUBLE",
+    b'e'[0]: "EXPRESSION", b'I'[0]: "INT", b'l'[0]: "LIST", b'J'[0]: "LONG", b'o'[0]: "OBJECT", b'p'[0]: "PROPERTY",
+    b's'[0]: "STRING", b't'[0]: "TYPE", b'u'[0]: "UNDEFINED",
+}
+
+TYPE_CODES = {name: bytes([code]) for code, name in TYPE_NAMES.items()}
+
+_INT = struct.Struct('>i')
+_LONG = struct.Struct('>q')
+_DOUBLE = struct.Struct('>d')
+_SHORT = struct.Struct('>H')
+
+_INT_RANGE = range(-2 ** 31, 2 ** 31)
+_LONG_RANGE = range(-2 ** 63, 2 ** 63)
+
+_RE_SUPPLEMENTARY = re.compile('[\U00010000-\U0010ffff]')
+
+
+class DMRError(ValueError):
+    """Raised when data is not a valid DMR encoded ModelNode, or a value cannot be encoded"""
+    pass
+
+
+def encode(value):
+    """Returns the binary DMR encoding of a JSON compatible value
+
+    Parameters
+    ----------
+    value: object
+        A value as json.loads returns it, E.g an API call from convert.jboss_command_to_http_request
+
+    Returns
+    -------
+    bytes
+
+    Raises
+    ------
+    DMRError
+        When the value holds something that is not JSON compatible, or a string longer than DMR allows
+
+    """
+
+    parts = []
+    _encode(value, parts)
+
+    return b''.join(parts)
+
+
+def decode(data):
+    """Returns the value of a binary DMR encoded ModelNode, the same value json.loads returns for its JSON form
+
+    Raises
+    ------
+    DMRError
+        When data is truncated, has trailing bytes or holds an unknown type
+
+    """
+
+    data = bytes(data)
+
+    try:
+        value, position = _Decoder(data).node(0)
+
+    except (IndexError, struct.error):
+        raise DMRError("Truncated DMR data")
+
+    if position != len(data):
+        raise DMRError(f'{len(data) - position} bytes after the end of the DMR ModelNode')
+
+    return value
+
+
+def to_base64(value):
+    """Returns the Base64 DMR encoding of a value, the body of an application/dmr-encoded request"""
+
+    return base64.b64encode(encode(value))
+
+
+def from_base64(data):
+    """Returns the value of the Base64 DMR encoding in the body of an application/dmr-encoded response"""
+
+    try:
+        binary = base64.b64decode(data, validate=True)
+
+    except ValueError as err:
+        raise DMRError(f'Invalid Base64 DMR data: {err}')
+
+    return decode(binary)
+
+
+def _encode(value, parts):
+    if value is None:
+        parts.append(b'u')
+
+    elif value is True or value is False:
+        parts.append(b'Z\x01' if value else b'Z\x00')
+
+    elif isinstance(value, str):
+        parts.append(b's')
+        parts.append(_utf(value))
+
+    elif isinstance(value, int):
+        if value in _INT_RANGE:
+            parts.append(b'I' + _INT.pack(value))
+        elif value in _LONG_RANGE:
+            parts.append(b'J' + _LONG.pack(value))
+        else:
+            # Two's complement in as few bytes as Java's BigInteger.toByteArray uses
+            unscaled = value.to_bytes(value.bit_length() // 8 + 1, 'big', signed=True)
+            parts.append(b'i' + _INT.pack(len(unscaled)) + unscaled)
+
+    elif isinstance(value, float):
+        parts.append(b'D' + _DOUBLE.pack(value))
+
+    elif isinstance(value, (list, tuple)):
+        parts.append(b'l' + _INT.pack(len(value)))
+
+        for item in value:
+            _encode(item, parts)
+
+    elif isinstance(value, dict):
+        if len(value) == 1:
+            (key, item), = value.items()
+
+            if key == "EXPRESSION_VALUE" and isinstance(item, str):
+                parts.append(b'e' + _utf(item))
+                return
+
+            if key == "BYTES_VALUE" and isinstance(item, str):
+                content = base64.b64decode(item)
+                parts.append(b'b' + _INT.pack(len(content)) + content)
+                return
+
+            if key == "TYPE_MODEL_VALUE" and item in TYPE_CODES:
+                parts.append(b't' + TYPE_CODES[item])
+                return
+
+        parts.append(b'o' + _INT.pack(len(value)))
+
+        for key, item in value.items():
+            parts.append(_utf(str(key)))
+            _encode(item, parts)
+
+    else:
+        raise DMRError(f'Cannot encode {type(value).__name__} {value!r} as DMR')
+
+
+class _Decoder:
+    """Decodes one DMR encoded ModelNode, decoding each distinct string once however often it repeats"""
+
+    def __init__(self, data):
+        self.data = data
+        self.strings = {}
+
+    def node(self, position):
+        """Returns the value of the ModelNode starting at position, and the position after it"""
+
+        data = self.data
+        code = data[position]
+        position += 1
+
+        if code == 111:  # o
+            count = _INT.unpack_from(data, position)[0]
+            position += 4
+            value = {}
+            string, node = self.string, self.node
+
+            for _ in range(count):
+                key, position = string(position)
+                code = data[position]
+
+                # The most common attribute values are read without a call of their own
+                if code == 117:  # u
+                    value[key] = None
+                    position += 1
+                elif code == 115:  # s
+                    value[key], position = string(position + 1)
+                elif code == 90:  # Z
+                    value[key] = data[position + 1] != 0
+                    position += 2
+                else:
+                    value[key], position = node(position)
+
+            return value, position
+
+        if code == 115:  # s
+            return self.string(position)
+
+        if code == 108:  # l
+            count = _INT.unpack_from(data, position)[0]
+            position += 4
+            value = []
+
+            for _ in range(count):
+                item, position = self.node(position)
+                value.append(item)
+
+            return value, position
+
+        if code == 73:  # I
+            return _INT.unpack_from(data, position)[0], position + 4
+
+        if code == 74:  # J
+            return _LONG.unpack_from(data, position)[0], position + 8
+
+        if code == 90:  # Z
+            return data[position] != 0, position + 1
+
+        if code == 117:  # u
+            return None, position
+
+        if code == 68:  # D
+            return _DOUBLE.unpack_from(data, position)[0], position + 8
+
+        if code == 101:  # e
+            expression, position = self.string(position)
+            return {"EXPRESSION_VALUE": expression}, position
+
+        if code == 112:  # p
+            name, position = self.string(position)
+            value, position = self.node(position)
+            return {name: value}, position
+
+        if code == 98:  # b
+            content, position = self.sized(position)
+            return {"BYTES_VALUE": base64.b64encode(content).decode()}, position
+
+        if code == 105:  # i
+            unscaled, position = self.sized(position)
+            return int.from_bytes(unscaled, 'big', signed=True), position
+
+        if code == 100:  # d
+            unscaled, position = self.sized(position)
+            unscaled = int.from_bytes(unscaled, 'big', signed=True)
+            scale = _INT.unpack_from(data, position)[0]
+
+            # The JSON form of a big decimal is a plain number, which json.loads makes an int or a float
+            return (unscaled * 10 ** -scale if scale <= 0 else unscaled / 10 ** scale), position + 4
+
+        if code == 116:  # t
+            if data[position] not in TYPE_NAMES:
+                raise DMRError(f'Unknown DMR type {chr(data[position])!r} at byte {position}')
+
+            return {"TYPE_MODEL_VALUE": TYPE_NAMES[data[position]]}, position + 1
+
+        raise DMRError(f'Unknown DMR type {chr(code)!r} at byte {position - 1}')
+
+    def string(self, position):
+        """Returns the Java modified UTF-8 string at position, and the position after it"""
+
+        data = self.data
+        end = position + 2 + (data[position] << 8 | data[position + 1])
+
+        if end > len(data):
+            raise IndexError(end)
+
+        raw = data[position + 2:end]
+        text = self.strings.get(raw)
+
+        if text is None:
+            text = self.strings[raw] = _modified_utf8(raw, position)
+
+        return text, end
+
+    def sized(self, position):
+        """Returns the bytes after the 4 byte length at position, and the position after them"""
+
+        end = position + 4 + _INT.unpack_from(self.data, position)[0]
+
+        if end > len(self.data) or end < position + 4:
+            raise IndexError(end)
+
+        return self.data[position + 4:end], end
+
+
+def _modified_utf8(raw, position):
+    try:
+        # Modified UTF-8 only differs from UTF-8 for NUL and characters outside the Basic Multilingual Plane
+        return raw.decode('utf-8')
+
+    except UnicodeDecodeError:
+        pass
+
+    try:
+        text = raw.replace(b'\xc0\x80', b'\x00').decode('utf-8', 'surrogatepass')
+        return text.encode('utf-16-le', 'surrogatepass').decode('utf-16-le')
+
+    except UnicodeError as err:
+        raise DMRError(f'Invalid modified UTF-8 string at byte {position}: {err}')
+
+
+def _utf(text):
+    """Returns the 2 byte length and Java modified UTF-8 bytes of a string"""
+
+    if text.isascii() and '\x00' not in text:
+        raw = text.encode('ascii')
+
+    else:
+        # NUL is written as 2 bytes, and supplementary characters as their UTF-16 surrogate pair, 3 bytes each
+        raw = _surrogate_pairs(text).encode('utf-8', 'surrogatepass').replace(b'\x00', b'\xc0\x80')
+
+    if len(raw) > 0xffff:
+        raise DMRError(f'String of {len(raw)} bytes is longer than DMR allows: {text[:40]}...')
+
+    return _SHORT.pack(len(raw)) + raw
+
+
+def _surrogate_pairs(text):
+    """Returns text with every character outside the Basic Multilingual Plane replaced by its surrogate pair"""
+
+    def pair(match):
+        code = ord(match.group()) - 0x10000
+        return chr(0xd800 | code >> 10) + chr(0xdc00 | code & 0x3ff)
+
+    return _RE_SUPPLEMENTARY.sub(pair, text)
@@ -0,0 +1,183 @@
+"""
+jboss_fleet.py
+
+Runs JBOSS CLI commands against a whole fleet of JBOSS servers concurrently
+
+Requests are scheduled with asyncio and limited by a global concurrency cap and a per host cap. The HTTP calls
+themselves run on a thread pool through one JBossClient per host, so every host keeps its own keep-alive session
+and digest auth nonce.
+
+Inventory files contain one host per line: URL[:PORT] [USER [PASSWORD]]
+Blank lines and lines starting with # are skipped. The port defaults to 9990, and the user/password default to
+the credentials passed to load_inventory
+E.g
+    http://jboss01.example.com:9990
+    https://jboss02.example.com:9993 admin secret
+"""
+
+import convert.convert as convert
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import logging
+import time
+
+DEFAULT_PORT = '9990'
+DEFAULT_MAX_CONCURRENCY = 64
+DEFAULT_MAX_PER_HOST = 2
+
+
+def load_inventory(lines, user='', password=''):
+    """Returns the hosts listed in an inventory file
+
+    Parameters
+    ----------
+    lines: iterable
+        Lines of the inventory file
+    user: str
+        JBOSS user for hosts that do not define their own
+    password: str
+        Password for hosts that do not define their own
+
+    Returns
+    -------
+    list:
+        A dictionary for each host with the url, port, user and password keys
+
+    """
+
+    inventory = []
+
+    for line in lines:
+        fields = line.split()
+
+        if not fields or fields[0].startswith('#'):
+            continue
+
+        host = urlsplit(fields[0] if '://' in fields[0] else 'http://' + fields[0])
+
+        # urlsplit drops the brackets of an IPv6 address, which the URL needs to be joined with a port again
+        hostname = host.hostname or ''
+        hostname = f'[{hostname}]' if ':' in hostname else hostname
+
+        inventory.append({
+            "url": f'{host.scheme}://{hostname}',
+            "port": str(host.port or DEFAULT_PORT),
+            "user": fields[1] if len(fields) > 1 else user,
+            "password": fields[2] if len(fields) > 2 else password
+        })
+
+    return inventory
+
+
+async def fleet_results(inventory, cli_commands, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                        max_per_host=DEFAULT_MAX_PER_HOST, deadline=None, client_options=None):
+    """Runs every JBOSS CLI command on every host and yields the results as they complete
+
+    Parameters
+    ----------
+    inventory: list
+        Hosts as returned by load_inventory
+    cli_commands: list
+        The JBOSS CLI commands that we want to run on each host
+    max_concurrency: int
+        Maximum number of HTTP requests running at the same time across the whole fleet
+    max_per_host: int
+        Maximum number of HTTP requests running at the same time against a single host
+    deadline: float
+        Seconds the whole run may take, commands that cannot complete in time fail
+    client_options: dict
+        Extra JBossClient arguments for every host, E.g {"read_timeout": 10, "retries": 0}
+
+    Yields
+    ------
+    dict:
+        The normalized { outcome, result } structure of one command on one host, with the host, command and
+        elapsed_ms (wall time of the HTTP call in milliseconds) keys added
+
+    """
+
+    # Imported here, so jboss_api can read the defaults above without importing asyncio and the HTTP stack
+    import asyncio
+    from jboss_client import JBossClient
+
+    # Convert each command once up front so a malformed command fails before anything is sent to the fleet
+    for cli_command in cli_commands:
+        convert.cached_jboss_command_to_http_request(cli_command, convert.cached_get_request_type(cli_command))
+
+    deadline = None if deadline is None else time.monotonic() + deadline
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    fleet_limit = asyncio.Semaphore(max_concurrency)
+
+    clients, host_limits, tasks = {}, {}, []
+
+    for host in inventory:
+        key = (host["url"], host["port"])
+
+        # Hosts listed more than once share their client, and so their session and per host cap
+        if key not in clients:
+            clients[key] = JBossClient(host["url"], host["port"], host["user"], host["password"],
+                                       pool_maxsize=max_per_host, **(client_options or {}))
+            host_limits[key] = asyncio.Semaphore(max_per_host)
+
+        for cli_command in cli_commands:
+            tasks.append(_execute_on_host(loop, executor, clients[key], cli_command, host_limits[key], fleet_limit,
+                                          deadline))
+
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+
+    finally:
+        executor.shutdown(wait=False)
+
+        for client in clients.values():
+            client.close()
+
+
+def run_fleet(inventory, cli_commands, max_concurrency=DEFAULT_MAX_CONCURRENCY, max_per_host=DEFAULT_MAX_PER_HOST,
+              deadline=None, client_options=None):
+    """Runs every JBOSS CLI command on every host and returns all of the results
+
+    Blocking version of fleet_results for callers that are not running an asyncio event loop
+
+    Returns
+    -------
+    list:
+        The results yielded by fleet_results, in completion order
+
+    """
+
+    import asyncio
+
+    async def collect():
+        return [results async for results in fleet_results(inventory, cli_commands, max_concurrency, max_per_host,
+                                                           deadline, client_options)]
+
+    return asyncio.run(collect())
+
+
+async def _execute_on_host(loop, executor, client, cli_command, host_limit, fleet_limit, deadline=None):
+    """Returns the timed result of a single command on a single host"""
+
+    # Wait on the host first, so a request queued behind a busy host does not hold one of the fleet slots
+    async with host_limit:
+        async with fleet_limit:
+            start = time.perf_counter()
+
+            try:
+                results = await loop.run_in_executor(executor, client.execute, cli_command, None, None, deadline)
+
+            except Exception as err:
+                logging.debug(f'{client.url}:{client.port} failed: {err}')
+                results = {"outcome": "failed", "failure-description": str(err)}
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "host": f'{client.url}:{client.port}',
+        "command": cli_command,
+        "elapsed_ms": round(elapsed_ms, 3),
+        **results
+    }
@@ -0,0 +1,360 @@
+"""
+jboss_metrics.py
+
+Long-running polling of JBOSS runtime metrics
+
+Metric files contain one metric per line: ADDRESS ATTRIBUTE [INTERVAL [NAME]]
+Blank lines and lines starting with # are skipped. ATTRIBUTE can follow a dotted path into an OBJECT attribute,
+INTERVAL is in seconds and NAME is the Prometheus metric name, derived from the attribute when it is not given.
+E.g
+    /subsystem=datasources/data-source=ExampleDS/statistics=pool ActiveCount 10
+    /subsystem=datasources/data-source=ExampleDS/statistics=pool AvailableCount 10
+    /core-service=platform-mbean/type=memory heap-memory-usage.used 10 jboss_heap_used_bytes
+
+Every metric on the same address is read with a single ADDRESS:read-resource(include-runtime=true,attributes-only=true)
+per host, instead of one read-attribute per metric, at the shortest interval of the metrics on the address.
+Polls are scheduled against fixed deadlines, start + n * interval, so slow polls do not make the schedule drift, and
+deadlines missed entirely are skipped rather than run late. The most recent samples of every series are kept in
+fixed size ring buffers of doubles.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from array import array
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+
+DEFAULT_INTERVAL = 10
+DEFAULT_HISTORY = 360
+
+Metric = namedtuple("Metric", ["name", "address", "attribute", "interval"])
+Sample = namedtuple("Sample", ["timestamp", "host", "address", "name", "attribute", "value"])
+
+
+def load_metrics(lines, interval=DEFAULT_INTERVAL):
+    """Returns the metrics listed in a metric file
+
+    Parameters
+    ----------
+    lines: iterable
+        Lines of the metric file
+    interval: float
+        Seconds between polls of metrics that do not define their own
+
+    Returns
+    -------
+    list:
+        A Metric for each line
+
+    """
+
+    metrics = []
+
+    for line_number, line in enumerate(lines, 1):
+        fields = line.split()
+
+        if not fields or fields[0].startswith('#'):
+            continue
+
+        if len(fields) < 2 or len(fields) > 4:
+            raise ValueError(f'Line {line_number}: expected ADDRESS ATTRIBUTE [INTERVAL [NAME]], got {line.strip()}')
+
+        address, attribute = fields[0], fields[1]
+        metric_interval = float(fields[2]) if len(fields) > 2 else interval
+
+        if metric_interval <= 0:
+            raise ValueError(f'Line {line_number}: interval must be positive')
+
+        name = fields[3] if len(fields) > 3 else metric_name(attribute)
+        metrics.append(Metric(name, address.rstrip('/') or '/', attribute, metric_interval))
+
+    return metrics
+
+
+def metric_name(attribute):
+    """Returns the Prometheus metric name of an attribute. E.g ActiveCount becomes jboss_active_count"""
+
+    name = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', attribute)
+
+    return 'jboss_' + re.sub(r'[^a-zA-Z0-9_]', '_', name).lower()
+
+
+class RingBuffer:
+    """Keeps the most recent samples of a series as two fixed size arrays of doubles
+
+    Parameters
+    ----------
+    capacity: int
+        Number of samples kept, older samples are overwritten
+
+    """
+
+    __slots__ = ("capacity", "timestamps", "values", "_next", "_size")
+
+    def __init__(self, capacity=DEFAULT_HISTORY):
+        self.capacity = max(1, capacity)
+        self.timestamps = array('d', bytes(8 * self.capacity))
+        self.values = array('d', bytes(8 * self.capacity))
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, timestamp, value):
+        """Adds a sample, overwriting the oldest one when the buffer is full"""
+
+        self.timestamps[self._next] = timestamp
+        self.values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def latest(self):
+        """Returns the most recent (timestamp, value) sample, or None if there are none"""
+
+        if not self._size:
+            return None
+
+        position = self._next - 1
+
+        return self.timestamps[position], self.values[position]
+
+    def samples(self):
+        """Returns every (timestamp, value) sample kept, oldest first"""
+
+        start = (self._next - self._size) % self.capacity
+
+        return [(self.timestamps[(start + offset) % self.capacity], self.values[(start + offset) % self.capacity])
+                for offset in range(self._size)]
+
+
+class MetricsPoller:
+    """Polls metrics on one or more JBOSS servers
+
+    Parameters
+    ----------
+    clients: list
+        A jboss_client.JBossClient for each server polled
+    metrics: list
+        Metrics as returned by load_metrics
+    history: int
+        Number of samples kept per series
+
+    """
+
+    def __init__(self, clients, metrics, history=DEFAULT_HISTORY):
+        self.clients = clients
+        self.history = history
+        self.series = {}
+        self.missed = 0
+
+        # Metrics on the same address are read together, as often as the most frequent of them needs
+        self.groups = {}
+        self.intervals = {}
+        for metric in metrics:
+            self.groups.setdefault(metric.address, []).append(metric)
+            self.intervals[metric.address] = min(metric.interval, self.intervals.get(metric.address, math.inf))
+
+        self._executor = ThreadPoolExecutor(max_workers=max(1, min(32, len(clients) * len(self.groups))))
+
+    def close(self):
+        """Stops the polling threads"""
+
+        self._executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def poll(self, groups=None):
+        """Reads the metrics of groups on every server and records the samples
+
+        Parameters
+        ----------
+        groups: list
+            Addresses of self.groups to read, all of them by default
+
+        Returns
+        -------
+        list:
+            A Sample for every metric read, metrics that could not be read are logged and left out
+
+        """
+
+        groups = list(self.groups) if groups is None else groups
+
+        futures = [self._executor.submit(self._poll_address, client, address, self.groups[address])
+                   for address in groups for client in self.clients]
+
+        samples = []
+        for future in futures:
+            samples.extend(future.result())
+
+        for sample in samples:
+            key = (sample.host, sample.address, sample.name)
+
+            if key not in self.series:
+                self.series[key] = RingBuffer(self.history)
+
+            self.series[key].append(sample.timestamp, sample.value)
+
+        return samples
+
+    def run(self, on_poll=None, stop=None, polls=None):
+        """Polls every group on its own interval until stopped
+
+        Parameters
+        ----------
+        on_poll: callable
+            Called with the samples of every poll
+        stop: threading.Event
+            Polling stops when it is set
+        polls: int
+            Stop after this many polls, polling forever when None
+
+        """
+
+        stop = stop or threading.Event()
+        start = time.monotonic()
+        completed = 0
+
+        schedule = [(start, address) for address in self.groups]
+        heapq.heapify(schedule)
+
+        while schedule and not stop.is_set():
+            delay = schedule[0][0] - time.monotonic()
+            if delay > 0 and stop.wait(delay):
+                break
+
+            now = time.monotonic()
+            due = []
+
+            while schedule and schedule[0][0] <= now:
+                deadline, address = heapq.heappop(schedule)
+                due.append(address)
+
+                # The next deadline stays on the start + n * interval grid, skipping any that have already passed
+                interval = self.intervals[address]
+                deadline += interval
+                if deadline <= now:
+                    skipped = math.floor((now - deadline) / interval) + 1
+                    self.missed += skipped
+                    deadline += skipped * interval
+
+                heapq.heappush(schedule, (deadline, address))
+
+            samples = self.poll(due)
+
+            if on_poll is not None:
+                on_poll(samples)
+
+            completed += 1
+            if polls is not None and completed >= polls:
+                break
+
+    def latest(self):
+        """Yields the most recent Sample of every series"""
+
+        for (host, address, name), ring in self.series.items():
+            timestamp, value = ring.latest()
+            yield Sample(timestamp, host, address, name, None, value)
+
+    def _poll_address(self, client, address, metrics):
+        """Returns the samples of the metrics of one address on one server"""
+
+        host = f'{client.url}:{client.port}'
+        cli_command = f'{"" if address == "/" else address}:read-resource(include-runtime=true,attributes-only=true)'
+
+        try:
+            results = client.execute(cli_command)
+
+        except Exception as err:
+            logging.warning(f'{host} {address}: {err}')
+            return []
+
+        if results.get("outcome") != "success":
+            logging.warning(f'{host} {address}: {results.get("failure-description")}')
+            return []
+
+        timestamp = time.time()
+        attributes = results.get("result") or {}
+        samples = []
+
+        for metric in metrics:
+            value = _number(_attribute(attributes, metric.attribute))
+
+            if value is None:
+                logging.debug(f'{host} {address} {metric.attribute} is not a number')
+                continue
+
+            samples.append(Sample(timestamp, host, address, metric.name, metric.attribute, value))
+
+        return samples
+
+
+def prometheus_text(samples):
+    """Returns samples in the Prometheus text exposition format
+
+    Parameters
+    ----------
+    samples: iterable
+        Samples as yielded by MetricsPoller.latest
+
+    """
+
+    by_name = {}
+    for sample in samples:
+        by_name.setdefault(sample.name, []).append(sample)
+
+    lines = []
+    for name in sorted(by_name):
+        lines.append(f'# TYPE {name} gauge')
+
+        for sample in by_name[name]:
+            labels = f'host="{_label(sample.host)}",address="{_label(sample.address)}"'
+            lines.append(f'{name}{{{labels}}} {sample.value!r} {int(sample.timestamp * 1000)}')
+
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def _attribute(attributes, path):
+    """Returns the value at a dotted path in the attributes of a resource, or None"""
+
+    value = attributes
+
+    for key in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+
+        value = value.get(key)
+
+    return value
+
+
+def _number(value):
+    """Returns a metric value as a float, or None if it is not a number"""
+
+    # Booleans are ints, and become 1.0 or 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    # LONG and BIG_DECIMAL values can be returned as strings
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+    return None
+
+
+def _label(value):
+    """Returns a Prometheus label value with backslashes, quotes and newlines escaped"""
+
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,290 @@
+"""
+jboss_output.py
+
+Structured output writers for JBOSS management API results
+
+Every writer takes records built from the normalized { outcome, result } structure, optionally with context keys
+such as line, command or host added, and writes them to a buffered text file:
+    json: compact JSON, a single object for one record or an array for many
+    ndjson: one compact JSON object per line
+    pretty: indented JSON
+    csv/tsv: one row per leaf value of the result, keyed by its dotted path, E.g host.default-host.alias.0
+
+JSON is encoded with orjson when it is installed, and with the standard library json module otherwise.
+"""
+
+from functools import partial
+import csv
+import io
+import json
+import sys
+
+try:
+    import orjson
+
+except ModuleNotFoundError:
+    orjson = None
+
+FORMATS = ("json", "ndjson", "pretty", "csv", "tsv")
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# Keys of the normalized structure, every other key of a record is context added by the caller
+RESULT_KEYS = ("outcome", "result", "failure-description", "rolled-back", "response-headers")
+
+
+def dumps(value, pretty=False):
+    """Returns value encoded as JSON text
+
+    Parameters
+    ----------
+    value: object
+        The value to encode
+    pretty: bool
+        Indent the JSON by 2 spaces instead of making it compact
+
+    """
+
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+
+        # orjson refuses a few values the json module accepts, such as integers above 64 bits
+        except TypeError:
+            pass
+
+    if pretty:
+        return json.dumps(value, indent=2, ensure_ascii=False)
+
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+
+def open_output(path=None, buffer_size=DEFAULT_BUFFER_SIZE):
+    """Returns a buffered text file to write output to
+
+    Parameters
+    ----------
+    path: str
+        File to write to. None or - writes to stdout
+    buffer_size: int
+        Number of bytes buffered before they are written
+
+    """
+
+    if path is not None and path != '-':
+        return open(path, 'w', buffering=buffer_size, encoding='utf-8', newline='')
+
+    try:
+        return open(sys.stdout.fileno(), 'w', buffering=buffer_size, encoding='utf-8', newline='', closefd=False)
+
+    # sys.stdout has been replaced by an object without a file descriptor, E.g while tests capture output
+    except (AttributeError, ValueError, io.UnsupportedOperation):
+        return sys.stdout
+
+
+def get_writer(output_format, output):
+    """Returns the writer of an output format
+
+    Parameters
+    ----------
+    output_format: str
+        One of FORMATS
+    output: file
+        Where the writer writes to
+
+    """
+
+    try:
+        writer = WRITERS[output_format]
+
+    except KeyError:
+        raise ValueError(f'Unknown output format {output_format}, expected one of {", ".join(FORMATS)}')
+
+    return writer(output)
+
+
+def flatten(value, prefix=''):
+    """Yields the (path, value) pairs of every leaf of a JSON value
+
+    Object keys and array positions are joined with dots, E.g {"a": [{"b": 1}]} yields ("a.0.b", 1).
+    Empty objects and arrays are leaves themselves
+
+    """
+
+    if isinstance(value, dict) and value:
+        for key, item in value.items():
+            yield from flatten(item, f'{prefix}.{key}' if prefix else key)
+
+    elif isinstance(value, list) and value:
+        for position, item in enumerate(value):
+            yield from flatten(item, f'{prefix}.{position}' if prefix else str(position))
+
+    else:
+        yield prefix, value
+
+
+class OutputWriter:
+    """Base class of the output writers
+
+    Parameters
+    ----------
+    output: file
+        Text file the records are written to
+
+    """
+
+    def __init__(self, output):
+        self.output = output
+        self.records = 0
+
+    def write(self, record):
+        """Writes a single record"""
+
+        raise NotImplementedError
+
+    def flush(self):
+        """Writes out everything written so far"""
+
+        self.output.flush()
+
+    def close(self):
+        """Finishes the output, the file itself is left open"""
+
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class NdjsonWriter(OutputWriter):
+    """Writes one compact JSON object per line"""
+
+    def write(self, record):
+        self.output.write(dumps(record) + "\n")
+        self.records += 1
+
+
+class PrettyWriter(OutputWriter):
+    """Writes indented JSON objects"""
+
+    def write(self, record):
+        self.output.write(dumps(record, pretty=True) + "\n")
+        self.records += 1
+
+
+class JsonWriter(OutputWriter):
+    """Writes a single compact JSON document
+
+    A single record is written as an object and many records as an array. Only the first record is held back,
+    until the second one shows which of the two it is
+
+    """
+
+    def __init__(self, output):
+        super().__init__(output)
+        self._first = None
+        self._array = False
+
+    def write(self, record):
+        self.records += 1
+
+        if self.records == 1:
+            self._first = record
+            return
+
+        if self.records == 2:
+            self.output.write("[" + dumps(self._first))
+            self._first = None
+            self._array = True
+
+        self.output.write("," + dumps(record))
+
+    def close(self):
+        if self._first is not None:
+            self.output.write(dumps(self._first) + "\n")
+            self._first = None
+
+        elif self._array:
+            self.output.write("]\n")
+            self._array = False
+
+        super().close()
+
+
+class CsvWriter(OutputWriter):
+    """Writes flattened rows with a header taken from the first record
+
+    A record with an outcome is written as one row per leaf of its result, with the context keys of the record
+    followed by the outcome, key and value columns. Any other record, such as those of jboss_stream, is a single row.
+    Values that are objects or arrays are written as JSON
+
+    Parameters
+    ----------
+    output: file
+        Text file the rows are written to
+    delimiter: str
+        Column separator
+
+    """
+
+    def __init__(self, output, delimiter=','):
+        super().__init__(output)
+        self._writer = csv.writer(output, delimiter=delimiter, lineterminator='\n')
+        self._columns = None
+
+    def write(self, record):
+        if self._columns is None:
+            if "outcome" in record:
+                self._columns = [key for key in record if key not in RESULT_KEYS] + ["outcome", "key", "value"]
+            else:
+                self._columns = list(record)
+
+            self._writer.writerow(self._columns)
+
+        self._writer.writerows(self._rows(record))
+        self.records += 1
+
+    def _rows(self, record):
+        """Yields the rows of a record"""
+
+        if "outcome" not in record:
+            yield [_cell(record.get(column)) for column in self._columns]
+            return
+
+        context = [_cell(record.get(column)) for column in self._columns[:-3]]
+        outcome = record.get("outcome")
+
+        if outcome != "success":
+            leaves = [("failure-description", record.get("failure-description"))]
+        else:
+            leaves = flatten(record.get("result"))
+
+        for key, value in leaves:
+            yield context + [outcome, key, _cell(value)]
+
+
+def _cell(value):
+    """Returns the CSV cell text of a value, using the JSON spelling of true, false and null"""
+
+    if isinstance(value, str):
+        return value
+
+    if value is None:
+        return ''
+
+    if isinstance(value, (bool, dict, list)):
+        return dumps(value)
+
+    return str(value)
+
+
+WRITERS = {
+    "json": JsonWriter,
+    "ndjson": NdjsonWriter,
+    "pretty": PrettyWriter,
+    "csv": CsvWriter,
+    "tsv": partial(CsvWriter, delimiter='\t')
+}
@@ -0,0 +1,303 @@
+"""
+jboss_reconcile.py
+
+Reconciles a JBOSS server with a desired configuration, writing only the attributes that differ
+
+The desired configuration is a JSON or YAML file mapping CLI resource addresses to the attributes they should have
+    /subsystem=datasources/data-source=ExampleDS:
+      min-pool-size: 5
+      max-pool-size: 50
+    /subsystem=logging/logger=com.example:
+      level: DEBUG
+A null value undefines an attribute. A resource that does not exist is added with its attributes.
+
+The current state is read with one recursive read-resource per subtree, the deepest address shared by the desired
+resources of each top level resource such as /subsystem=datasources, and all of these reads are sent as a single
+composite operation. Every attribute that differs is written in one more composite operation, which JBOSS applies or
+rolls back as a whole. Unchanged attributes are never written, so they cannot put the server in reload-required.
+
+Reading YAML needs PyYAML, JSON is always supported.
+"""
+
+import convert.convert as convert
+import json
+import logging
+import os
+
+
+class DesiredStateError(convert.Error):
+    """Raised when a desired configuration file cannot be used"""
+    pass
+
+
+def load_desired(path):
+    """Returns the desired configuration in a JSON or YAML file
+
+    Parameters
+    ----------
+    path: str
+        Path of the file, read as YAML when it ends with .yml or .yaml
+
+    Returns
+    -------
+    dict:
+        { address: { attribute: value } }, address being a tuple in the HTTP POST list form
+
+    Raises
+    ------
+    DesiredStateError
+        When the file cannot be parsed or is not a mapping of addresses to attributes
+
+    """
+
+    with open(path) as desired_file:
+        if os.path.splitext(path)[1].lower() in ('.yml', '.yaml'):
+            try:
+                import yaml
+            except ModuleNotFoundError:
+                raise DesiredStateError(f'Python [PyYAML] module is required to read {path}')
+
+            try:
+                desired = yaml.safe_load(desired_file)
+            except yaml.YAMLError as err:
+                raise DesiredStateError(f'Unable to parse {path}: {err}')
+
+        else:
+            try:
+                desired = json.load(desired_file)
+            except ValueError as err:
+                raise DesiredStateError(f'Unable to parse {path}: {err}')
+
+    return parse_desired(desired or {}, path)
+
+
+def parse_desired(desired, source="desired configuration"):
+    """Returns { address tuple: attributes } of a { CLI address: { attribute: value } } mapping"""
+
+    if not isinstance(desired, dict):
+        raise DesiredStateError(f'{source} must map resource addresses to attributes')
+
+    parsed = {}
+
+    for cli_address, attributes in desired.items():
+        if not isinstance(attributes, dict):
+            raise DesiredStateError(f'{source}: the attributes of {cli_address} must be a mapping')
+
+        try:
+            address = tuple(convert.get_path_to_resource(str(cli_address), "POST"))
+        except convert.Error as err:
+            raise DesiredStateError(f'{source}: invalid address {cli_address}: {err}')
+
+        if len(address) % 2:
+            raise DesiredStateError(f'{source}: invalid address {cli_address}, expected /type=name/...')
+
+        parsed.setdefault(address, {}).update(attributes)
+
+    return parsed
+
+
+def reconcile(client, desired, check=False, url=None, port=None, deadline=None):
+    """Writes the attributes of desired that differ from the current configuration of a server
+
+    Parameters
+    ----------
+    client: jboss_client.JBossClient
+        The client used to call JBOSS
+    desired: dict
+        { address: { attribute: value } } as returned by load_desired
+    check: bool
+        Only report what would change, without writing anything
+    url: str
+        URL to the JBOSS server, defaults to the client URL
+    port: str
+        Port of the JBOSS server, defaults to the client port
+    deadline: float
+        time.monotonic() value by which every request has to complete
+
+    Returns
+    -------
+    changes: list
+        {"address", "attribute", "from", "to", "outcome"} for every attribute written, "add" as the attribute for a
+        resource that was added. The outcome is "check" when nothing was written
+    summary: dict
+        Numbers of resources, desired attributes, writes and unchanged attributes, the round trips made and the round
+        trips avoided compared with one write-attribute request per desired attribute, and whether the server needs a
+        reload
+
+    """
+
+    current, round_trips = read_current(client, desired, url, port, deadline)
+    changes, steps, unchanged = plan_changes(desired, current)
+
+    reload_required = False
+
+    if steps and not check:
+        results = client.execute_api_call("POST", {"operation": "composite", "address": [], "steps": steps}, url,
+                                          port, deadline)
+        round_trips += 1
+
+        outcome = results.get("outcome", "failed")
+        changes = [{**change, "outcome": outcome} for change in changes]
+
+        if outcome != "success":
+            changes[0]["failure-description"] = results.get("failure-description")
+
+        headers = results.get("response-headers") or {}
+        reload_required = headers.get("process-state") in ("reload-required", "restart-required")
+
+    else:
+        changes = [{**change, "outcome": "check" if check else "success"} for change in changes]
+
+    attributes = sum(len(attributes) for attributes in desired.values())
+
+    summary = {
+        "resources": len(desired),
+        "attributes": attributes,
+        "writes": len(steps),
+        "unchanged": unchanged,
+        "round-trips": round_trips,
+        "round-trips-avoided": max(attributes - round_trips, 0),
+        "reload-required": reload_required
+    }
+
+    return changes, summary
+
+
+def read_current(client, desired, url=None, port=None, deadline=None):
+    """Returns the current attributes of every desired resource and the number of round trips it took
+
+    Returns
+    -------
+    current: dict
+        { address: { attribute: value } }, None for a resource that does not exist
+    round_trips: int
+        Number of HTTP requests made
+
+    """
+
+    subtrees = read_subtrees(desired)
+    steps = [{"operation": "read-resource", "address": list(subtree), "recursive": True} for subtree in subtrees]
+
+    results = client.execute_api_call("POST", {"operation": "composite", "address": [], "steps": steps}, url, port,
+                                      deadline)
+    round_trips = 1
+
+    if results.get("outcome") == "success":
+        reads = [results["result"][f'step-{position}'] for position in range(1, len(steps) + 1)]
+
+    else:
+        # One missing subtree fails the whole composite operation, so each subtree is read on its own
+        logging.debug(f'Reading subtrees one at a time: {results.get("failure-description")}')
+        reads = [client.execute_api_call("POST", step, url, port, deadline) for step in steps]
+        round_trips += len(steps)
+
+    trees = {}
+    for subtree, read in zip(subtrees, reads):
+        if read.get("outcome") == "success":
+            trees[subtree] = read.get("result")
+
+        elif "WFLYCTL0216" not in str(read.get("failure-description")):
+            raise DesiredStateError(f'Unable to read {_cli_address(subtree)}: {read.get("failure-description")}')
+
+    current = {}
+    for address in desired:
+        subtree = next(subtree for subtree in subtrees if address[:len(subtree)] == subtree)
+        current[address] = _resource(trees.get(subtree), address[len(subtree):])
+
+    return current, round_trips
+
+
+def read_subtrees(desired):
+    """Returns the deepest address shared by the desired resources of each top level resource"""
+
+    subtrees = {}
+
+    for address in sorted(desired):
+        top = address[:2]
+        shared = subtrees.get(top, address)
+
+        depth = 0
+        while depth < min(len(shared), len(address)) and shared[depth:depth + 2] == address[depth:depth + 2]:
+            depth += 2
+
+        subtrees[top] = address[:depth]
+
+    return sorted(subtrees.values())
+
+
+def plan_changes(desired, current):
+    """Returns the changes needed to reach desired from current, the composite steps making them and the number of
+    desired attributes that already have their value
+    """
+
+    changes, steps = [], []
+    unchanged = 0
+
+    for address in sorted(desired):
+        attributes, existing = desired[address], current.get(address)
+
+        if existing is None:
+            arguments = {name: value for name, value in attributes.items() if value is not None}
+            changes.append({"address": _cli_address(address), "attribute": "add", "from": None, "to": arguments})
+            steps.append({"operation": "add", "address": list(address), **arguments})
+            continue
+
+        for name, value in sorted(attributes.items()):
+            if same_value(existing.get(name), value):
+                unchanged += 1
+                continue
+
+            changes.append({"address": _cli_address(address), "attribute": name, "from": existing.get(name),
+                            "to": value})
+
+            if value is None:
+                steps.append({"operation": "undefine-attribute", "address": list(address), "name": name})
+            else:
+                steps.append({"operation": "write-attribute", "address": list(address), "name": name, "value": value})
+
+    return changes, steps, unchanged
+
+
+def same_value(current, desired):
+    """Returns True if a current attribute value already is the desired value
+
+    JBOSS answers with typed values, such as 5 or true, where the desired configuration may hold "5" or "true", and
+    with {"EXPRESSION_VALUE": "${...}"} for expressions
+    """
+
+    if isinstance(current, dict) and list(current) == ["EXPRESSION_VALUE"]:
+        current = current["EXPRESSION_VALUE"]
+
+    if current == desired and type(current) is type(desired):
+        return True
+
+    if isinstance(current, (dict, list)) or isinstance(desired, (dict, list)):
+        return current == desired
+
+    if current is None or desired is None:
+        return False
+
+    return _text(current) == _text(desired)
+
+
+def _text(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+
+    return str(value)
+
+
+def _resource(tree, relative):
+    """Returns the attributes of the resource at the relative address inside a recursive read, None if absent"""
+
+    for position in range(0, len(relative), 2):
+        if not isinstance(tree, dict):
+            return None
+
+        tree = (tree.get(relative[position]) or {}).get(relative[position + 1])
+
+    return tree if isinstance(tree, dict) else None
+
+
+def _cli_address(address):
+    return convert.format_cli_address(list(zip(address[::2], address[1::2])))
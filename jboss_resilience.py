@@ -0,0 +1,155 @@
+"""
+jboss_resilience.py
+
+Timeouts, retries and circuit breaking for JBOSS management API calls
+
+Every request has a connect and a read timeout, clipped to the deadline of the run it belongs to. Read only calls are
+retried on connection errors, timeouts and 502/503/504 answers with jittered exponential backoff. Calls that may
+change the management model are never retried, since JBOSS may have applied them before the connection failed.
+
+Each host has a circuit breaker. After a number of consecutive failures the breaker opens and calls to the host fail
+immediately, instead of waiting for a timeout every time. Once the reset timeout has passed a single trial call is let
+through, which closes the breaker again if it succeeds.
+"""
+
+import random
+import threading
+import time
+
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 60
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.25
+DEFAULT_MAX_BACKOFF = 5
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30
+
+# Answers from a proxy or an overloaded server, which are worth retrying for a read
+RETRY_STATUS_CODES = {502, 503, 504}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a host whose circuit breaker is open"""
+
+    def __init__(self, host, retry_after):
+        self.host = host
+        self.retry_after = retry_after
+        super().__init__(f'{host} is failing, not calling it for another {retry_after:.1f}s')
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the deadline of a run passed before a call could be made"""
+    pass
+
+
+def backoff_delay(attempt, backoff=DEFAULT_BACKOFF, max_backoff=DEFAULT_MAX_BACKOFF):
+    """Returns the seconds to wait before a retry, with full jitter
+
+    Parameters
+    ----------
+    attempt: int
+        Number of the retry, starting at 1
+    backoff: float
+        Upper bound of the first delay, doubled for every following retry
+    max_backoff: float
+        Upper bound of every delay
+
+    """
+
+    return random.uniform(0, min(max_backoff, backoff * 2 ** (attempt - 1)))
+
+
+def timeouts(connect_timeout, read_timeout, deadline=None):
+    """Returns the (connect, read) timeouts of a request, clipped to the time left before deadline
+
+    Parameters
+    ----------
+    connect_timeout: float
+        Seconds to wait for a connection
+    read_timeout: float
+        Seconds to wait between bytes of the response
+    deadline: float
+        time.monotonic() value by which the run has to finish. None has no deadline
+
+    Raises
+    ------
+    DeadlineExceeded
+        When the deadline has already passed
+
+    """
+
+    if deadline is None:
+        return connect_timeout, read_timeout
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded("Deadline exceeded")
+
+    return min(connect_timeout, remaining), min(read_timeout, remaining)
+
+
+class CircuitBreaker:
+    """Stops calls to a host after consecutive failures
+
+    Parameters
+    ----------
+    host: str
+        Name of the host, used in error messages
+    failure_threshold: int
+        Consecutive failures that open the breaker. 0 never opens it
+    reset_timeout: float
+        Seconds the breaker stays open before a trial call is let through
+
+    """
+
+    def __init__(self, host, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0
+
+        self._opened_at = 0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raises CircuitOpenError if the host must not be called now"""
+
+        with self._lock:
+            if self.state == CLOSED:
+                return
+
+            retry_after = self._opened_at + self.reset_timeout - time.monotonic()
+
+            # Only the first caller after the reset timeout makes the trial call, the others keep failing fast
+            if self.state == OPEN and retry_after <= 0:
+                self.state = HALF_OPEN
+                return
+
+            raise CircuitOpenError(self.host, max(retry_after, 0))
+
+    def record_success(self):
+        """Closes the breaker after a successful call"""
+
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        """Counts a failed call, opening the breaker when there were too many in a row"""
+
+        with self._lock:
+            self.failures += 1
+
+            if self.state == HALF_OPEN or (self.failure_threshold and self.failures >= self.failure_threshold):
+                if self.state != OPEN:
+                    self.opened += 1
+
+                self.state = OPEN
+                self._opened_at = time.monotonic()
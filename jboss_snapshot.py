@@ -0,0 +1,373 @@
+"""
+jboss_snapshot.py
+
+Incremental configuration snapshots of JBOSS servers and path level diffs between them, for drift detection
+
+A snapshot records, for every resource of :read-resource(recursive=true), a short hash of each attribute value and a
+Merkle hash of the resource and everything below it. Resources are keyed by their CLI address, which
+convert.get_path_to_resource turns back into the HTTP POST list form. Two snapshots are compared by walking down
+from the root into the subtrees whose hashes differ only, so unchanged parts of the model cost nothing to diff.
+
+JBOSS has no hash of its own model to compare against, so a later snapshot only avoids reading the whole model when
+the server keeps a configuration change history, see
+    /subsystem=core-management/service=configuration-changes:add(max-history=100)
+The cheap reads of the history, the server start time and the history size are sent in one composite operation.
+When the history proves that nothing else changed since the previous snapshot, only the top level subtrees with
+changes, such as /subsystem=datasources, are read again. Otherwise, E.g after a restart since the history is kept in
+memory, the whole model is read, streamed as it arrives.
+
+Resources without attributes or children leave no records in a read-resource result and are not part of snapshots.
+"""
+
+import convert.convert as convert
+import hashlib
+import json
+import logging
+import os
+
+SNAPSHOT_VERSION = 1
+
+START_TIME_COMMAND = '/core-service=platform-mbean/type=runtime:read-attribute(name=start-time)'
+HISTORY_COMMAND = '/subsystem=core-management/service=configuration-changes:read-attribute(name=max-history)'
+CHANGES_COMMAND = '/subsystem=core-management/service=configuration-changes:list-changes'
+
+# Operations at the root address that change a deployment named by their arguments
+DEPLOYMENT_OPERATIONS = {"full-replace-deployment": ("name",), "replace-deployment": ("name", "to-replace")}
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+
+class Snapshot:
+    """Hashes of the configuration of one JBOSS server
+
+    Parameters
+    ----------
+    nodes: dict
+        { address: { attribute: value hash } }, address being a tuple in the HTTP POST list form
+    start_time: int
+        Start time of the server in milliseconds when the snapshot was taken, None if unknown
+    last_change: str
+        operation-date of the newest change in the change history when the snapshot was taken, None if there was none
+    history: bool
+        Whether the server kept a change history when the snapshot was taken
+
+    """
+
+    def __init__(self, nodes=None, start_time=None, last_change=None, history=False):
+        self.nodes = nodes if nodes is not None else {}
+        self.start_time = start_time
+        self.last_change = last_change
+        self.history = history
+
+        self._hashes = None
+
+    @property
+    def hashes(self):
+        """{ address: Merkle hash of the resource and every resource below it }"""
+
+        if self._hashes is None:
+            self._hashes = tree_hashes(self.nodes)
+
+        return self._hashes
+
+    @classmethod
+    def load(cls, path):
+        """Returns the snapshot saved in path, None if there is none"""
+
+        try:
+            with open(path) as snapshot_file:
+                saved = json.load(snapshot_file)
+
+        except FileNotFoundError:
+            return None
+
+        if saved.get("version") != SNAPSHOT_VERSION:
+            logging.warning(f'Ignoring {path}, it was saved by another version')
+            return None
+
+        nodes = {tuple(convert.get_path_to_resource(address, "POST")): node["attributes"]
+                 for address, node in saved["nodes"].items()}
+
+        return cls(nodes, saved["start-time"], saved["last-change"], saved["history"])
+
+    def save(self, path):
+        """Saves the snapshot to path, replacing the previous one at once"""
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        saved = {
+            "version": SNAPSHOT_VERSION,
+            "start-time": self.start_time,
+            "last-change": self.last_change,
+            "history": self.history,
+            "nodes": {cli_address(address): {"hash": self.hashes[address], "attributes": self.nodes.get(address, {})}
+                      for address in sorted(self.hashes)}
+        }
+
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'w') as snapshot_file:
+            json.dump(saved, snapshot_file, separators=(',', ':'))
+
+        os.replace(temporary, path)
+
+
+def take_snapshot(client, previous=None, full=False, url=None, port=None, deadline=None):
+    """Returns a new snapshot of a server, reading only the subtrees changed since previous when it can
+
+    Parameters
+    ----------
+    client: jboss_client.JBossClient
+        The client used to call JBOSS
+    previous: Snapshot
+        The previous snapshot of the server, None reads the whole model
+    full: bool
+        Read the whole model even when the change history would allow less
+    url: str
+        URL to the JBOSS server, defaults to the client URL
+    port: str
+        Port of the JBOSS server, defaults to the client port
+    deadline: float
+        time.monotonic() value by which the reads have to start arriving
+
+    Returns
+    -------
+    snapshot: Snapshot
+        The new snapshot
+    subtrees: list
+        Addresses of the top level subtrees that were read again, None when the whole model was read
+
+    """
+
+    # Read before the model, so a change made while it is being read is seen again by the next snapshot
+    start_time, history, changes = _change_history(client, url, port, deadline)
+
+    last_change = max((change["operation-date"] for change in changes), default=None)
+    if last_change is None and previous is not None and previous.start_time == start_time:
+        last_change = previous.last_change
+
+    snapshot = Snapshot(start_time=start_time, last_change=last_change, history=history is not None)
+    subtrees = None if full else changed_subtrees(previous, start_time, history, changes)
+
+    if subtrees is None:
+        logging.debug(f'Reading the whole model of {client.url}:{client.port}')
+        _read(client, (), snapshot.nodes, url, port, deadline)
+        return snapshot, None
+
+    snapshot.nodes = {address: attributes for address, attributes in previous.nodes.items()
+                      if address[:2] not in subtrees}
+
+    for subtree in sorted(subtrees):
+        logging.debug(f'Reading {cli_address(subtree)} of {client.url}:{client.port}')
+        _read(client, subtree, snapshot.nodes, url, port, deadline)
+
+    return snapshot, sorted(subtrees)
+
+
+def changed_subtrees(previous, start_time, history, changes):
+    """Returns the top level subtrees changed since previous, None if the change history cannot tell
+
+    Parameters
+    ----------
+    previous: Snapshot
+        The previous snapshot, None if there is none
+    start_time: int
+        Current start time of the server
+    history: int
+        max-history of the change history, None if the server does not keep one
+    changes: list
+        list-changes results, newest first
+
+    Returns
+    -------
+    set:
+        The top level addresses, E.g ("subsystem", "datasources"), with changes since previous
+
+    """
+
+    if previous is None or not previous.history or history is None or start_time != previous.start_time:
+        return None
+
+    dates = [change["operation-date"] for change in changes]
+
+    # A full history may have dropped changes made after the previous snapshot
+    if len(changes) >= history and (previous.last_change is None or previous.last_change not in dates):
+        return None
+
+    subtrees = set()
+
+    for change in changes:
+        if previous.last_change is not None and change["operation-date"] <= previous.last_change:
+            continue
+
+        if change.get("outcome") != "success":
+            continue
+
+        for operation in _operations(change.get("operations") or []):
+            address = [part for element in operation.get("address") or [] for part in _address_element(element)]
+
+            if address:
+                subtrees.add(tuple(address[:2]))
+
+            elif operation.get("operation") in DEPLOYMENT_OPERATIONS:
+                subtrees.update(("deployment", operation[argument]) for argument in
+                                DEPLOYMENT_OPERATIONS[operation["operation"]] if operation.get(argument))
+
+            else:
+                # The root resource itself changed
+                return None
+
+    return subtrees
+
+
+def diff(previous, snapshot):
+    """Yields the differences between two snapshots as path level changes
+
+    Only subtrees whose Merkle hashes differ are walked. An added or removed subtree is reported once, at its top
+
+    Yields
+    ------
+    dict:
+        {"address": CLI address, "change": added, removed or changed}, with the names of the added, removed or
+        changed attributes in "attributes" for a changed resource
+
+    """
+
+    old_children = _children(previous.hashes)
+    new_children = _children(snapshot.hashes)
+    pending = [()]
+
+    while pending:
+        address = pending.pop()
+        old_hash, new_hash = previous.hashes.get(address), snapshot.hashes.get(address)
+
+        if old_hash == new_hash:
+            continue
+
+        if old_hash is None:
+            yield {"address": cli_address(address), "change": ADDED}
+            continue
+
+        if new_hash is None:
+            yield {"address": cli_address(address), "change": REMOVED}
+            continue
+
+        old_attributes, new_attributes = previous.nodes.get(address, {}), snapshot.nodes.get(address, {})
+        attributes = sorted(name for name in old_attributes.keys() | new_attributes.keys()
+                            if old_attributes.get(name) != new_attributes.get(name))
+
+        if attributes:
+            yield {"address": cli_address(address), "change": CHANGED, "attributes": attributes}
+
+        # Walked in reverse so the changes come out in address order
+        pending.extend(sorted(old_children.get(address, set()) | new_children.get(address, set()), reverse=True))
+
+
+def tree_hashes(nodes):
+    """Returns { address: Merkle hash } for every resource of nodes and every resource above them
+
+    The hash of a resource covers the hashes of its attribute values and the hashes of its child resources
+    """
+
+    addresses = set(nodes)
+    for address in nodes:
+        addresses.update(address[:depth] for depth in range(0, len(address), 2))
+
+    children = _children(addresses)
+    hashes = {}
+
+    # Deepest first, so the hashes of the children are known
+    for address in sorted(addresses, key=len, reverse=True):
+        digest = hashlib.sha1()
+
+        for name, value_hash in sorted(nodes.get(address, {}).items()):
+            digest.update(f'{name}\0{value_hash}\0'.encode())
+
+        digest.update(b'\1')
+
+        for child in sorted(children.get(address, ())):
+            digest.update(f'{child[-2]}\0{child[-1]}\0{hashes[child]}\0'.encode())
+
+        hashes[address] = digest.hexdigest()
+
+    return hashes
+
+
+def value_hash(value):
+    """Returns the short hash recorded for an attribute value"""
+
+    return hashlib.sha1(json.dumps(value, sort_keys=True, separators=(',', ':')).encode()).hexdigest()[:16]
+
+
+def cli_address(address):
+    """Returns the CLI address of an address in the HTTP POST list form, E.g /subsystem=undertow"""
+
+    return convert.format_cli_address(list(zip(address[::2], address[1::2])))
+
+
+def _change_history(client, url, port, deadline):
+    """Returns the (start time, max-history, changes) of a server, max-history None without a change history"""
+
+    steps = dict(client.execute_composite([START_TIME_COMMAND, HISTORY_COMMAND, CHANGES_COMMAND], url, port,
+                                          deadline))
+
+    if steps[CHANGES_COMMAND].get("outcome") == "success":
+        return (steps[START_TIME_COMMAND].get("result"), steps[HISTORY_COMMAND].get("result"),
+                steps[CHANGES_COMMAND].get("result") or [])
+
+    # The composite operation rolled back, so the start time is read on its own
+    logging.debug(f'No configuration change history: {steps[CHANGES_COMMAND].get("failure-description")}')
+
+    return client.execute(START_TIME_COMMAND, url, port, deadline).get("result"), None, []
+
+
+def _read(client, address, nodes, url, port, deadline):
+    """Adds the attribute hashes of the subtree at address to nodes, nothing if the subtree no longer exists"""
+
+    from jboss_client import OperationFailed
+
+    cli_command = f'{cli_address(address)}:read-resource(recursive=true)'
+
+    try:
+        for resource, attribute, value in client.stream_records(cli_command, url, port, deadline=deadline):
+            nodes.setdefault(tuple(resource), {})[attribute] = value_hash(value)
+
+    except OperationFailed as err:
+        if address and "WFLYCTL0216" in str(err.results.get("failure-description")):
+            return
+
+        raise
+
+
+def _operations(operations):
+    """Yields every operation, including the steps of composite operations"""
+
+    for operation in operations:
+        if operation.get("operation") == "composite":
+            yield from _operations(operation.get("steps") or [])
+        else:
+            yield operation
+
+
+def _address_element(element):
+    """Returns the [type, name] of an address element of the change history, E.g {"subsystem": "undertow"}"""
+
+    if isinstance(element, dict):
+        return [part for pair in element.items() for part in pair]
+
+    return list(element)
+
+
+def _children(addresses):
+    """Returns { address: set of the addresses of its children }"""
+
+    children = {}
+
+    for address in addresses:
+        if address:
+            children.setdefault(address[:-2], set()).add(address)
+
+    return children
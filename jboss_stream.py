@@ -0,0 +1,337 @@
+"""
+jboss_stream.py
+
+Streaming, low-memory parsing of large JBOSS management API responses
+
+A recursive read-resource with include-runtime=true on a large domain controller can return hundreds of MB of JSON.
+Instead of loading all of it into Python dictionaries, the response body is tokenized incrementally as it arrives
+and flattened into (address, attribute, value) records, so memory stays bounded by the size of the largest single
+attribute value no matter how large the whole response is.
+
+The JSON of read-resource does not say which keys are child resource types and which are OBJECT attributes. A
+model index (see convert.model_index) answers this exactly. Without one, a key is taken to be a child resource type
+when its value is an object whose first member is itself an object, which is how JBOSS lays out child resources.
+"""
+
+from json.decoder import JSONDecodeError, scanstring
+import codecs
+import re
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Consumed input is dropped from the buffer once this many characters have been parsed
+COMPACT_THRESHOLD = 64 * 1024
+
+RE_WHITESPACE = re.compile(r'[ \t\n\r]*')
+RE_NUMBER_CHARACTERS = re.compile(r'[-+.0-9eE]*')
+RE_NUMBER = re.compile(r'-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?')
+
+LITERALS = {"t": ("true", True), "f": ("false", False), "n": ("null", None)}
+
+
+def decode_chunks(chunks, encoding='utf-8'):
+    """Yields the text of an iterable of byte chunks, handling characters split between chunks"""
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+
+def json_events(chunks):
+    """Yields parse events for a JSON document split into text chunks of any size
+
+    Events are (event, value) tuples:
+        ("start_map", None), ("map_key", key), ("end_map", None),
+        ("start_array", None), ("end_array", None), ("value", value)
+
+    Parameters
+    ----------
+    chunks: iterable
+        Text chunks of the JSON document
+
+    """
+
+    chunks = iter(chunks)
+    buffer, position = '', 0
+    exhausted = False
+    containers, expect_key = [], False
+
+    def fill():
+        """Appends the next chunk to the buffer. Returns False when there are no more chunks"""
+
+        nonlocal buffer, position, exhausted
+
+        for chunk in chunks:
+            if position > COMPACT_THRESHOLD:
+                buffer, position = buffer[position:], 0
+
+            buffer += chunk
+            return True
+
+        exhausted = True
+        return False
+
+    while True:
+        position = RE_WHITESPACE.match(buffer, position).end()
+
+        if position >= len(buffer):
+            if fill():
+                continue
+
+            if containers:
+                raise JSONDecodeError("Unexpected end of document", buffer, position)
+
+            return
+
+        character = buffer[position]
+
+        if character == '"':
+            try:
+                value, end = scanstring(buffer, position + 1)
+            except JSONDecodeError:
+                # The string is not finished in the buffer yet
+                if fill():
+                    continue
+                raise
+
+            position = end
+            yield ("map_key", value) if expect_key else ("value", value)
+
+        elif character in ',:':
+            position += 1
+            expect_key = character == ',' and containers[-1] == "map"
+
+        elif character == '{':
+            position += 1
+            containers.append("map")
+            expect_key = True
+            yield "start_map", None
+
+        elif character == '}':
+            position += 1
+            containers.pop()
+            expect_key = False
+            yield "end_map", None
+
+        elif character == '[':
+            position += 1
+            containers.append("array")
+            expect_key = False
+            yield "start_array", None
+
+        elif character == ']':
+            position += 1
+            containers.pop()
+            yield "end_array", None
+
+        elif character in LITERALS:
+            literal, value = LITERALS[character]
+
+            if len(buffer) - position < len(literal) and not exhausted and fill():
+                continue
+
+            if not buffer.startswith(literal, position):
+                raise JSONDecodeError("Expecting value", buffer, position)
+
+            position += len(literal)
+            yield "value", value
+
+        else:
+            end = RE_NUMBER_CHARACTERS.match(buffer, position).end()
+
+            # A number ending with the buffer may continue in the next chunk
+            if end == len(buffer) and not exhausted and fill():
+                continue
+
+            match = RE_NUMBER.fullmatch(buffer, position, end)
+
+            if match is None:
+                raise JSONDecodeError("Expecting value", buffer, position)
+
+            number = match.group(0)
+            position = end
+            yield "value", float(number) if match.group(1) or match.group(2) else int(number)
+
+
+class PeekableEvents:
+    """Iterator of JSON events that can look at the next events without consuming them"""
+
+    def __init__(self, events):
+        self._events = iter(events)
+        self._peeked = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._peeked:
+            return self._peeked.pop(0)
+
+        return next(self._events)
+
+    def peek(self, count=1):
+        """Returns the next count events, fewer if the document ends first"""
+
+        while len(self._peeked) < count:
+            try:
+                self._peeked.append(next(self._events))
+            except StopIteration:
+                break
+
+        return self._peeked[:count]
+
+
+def resource_records(events, address=(), child_types=None):
+    """Yields the flattened (address, attribute, value) records of a read-resource result
+
+    Parameters
+    ----------
+    events: iterable
+        JSON events of the read-resource result, as returned by json_events
+    address: tuple
+        Address of the resource that was read, in the HTTP POST list form
+    child_types: callable
+        child_types(address, key) returns True if key is a child resource type of the resource at address, False if
+        it is an attribute and None if it does not know. See model_child_types
+
+    Yields
+    ------
+    tuple:
+        (address, attribute, value), address being a list in the HTTP POST list form. A result that is not a
+        resource, such as the value of a read-attribute, is a single record with attribute None
+
+    """
+
+    events = events if isinstance(events, PeekableEvents) else PeekableEvents(events)
+    event, value = next(events)
+
+    if event != "start_map":
+        yield list(address), None, _value(event, value, events)
+        return
+
+    yield from _resource_records(events, tuple(address), child_types)
+
+
+def unwrap_result(events):
+    """Returns the events of a { outcome, result } response positioned at the value of result
+
+    Parameters
+    ----------
+    events: iterable
+        JSON events of the whole response, as returned by json_events
+
+    Returns
+    -------
+    PeekableEvents:
+        The remaining events, starting with the result value
+
+    """
+
+    events = events if isinstance(events, PeekableEvents) else PeekableEvents(events)
+    event, _ = next(events)
+
+    if event == "start_map":
+        for event, key in events:
+            if event == "end_map":
+                break
+
+            if key == "result":
+                return events
+
+            _value(*next(events), events)
+
+    raise JSONDecodeError("Response has no result", '', 0)
+
+
+def model_child_types(index):
+    """Returns a child_types callable for resource_records backed by a convert.model_index.ModelIndex"""
+
+    def child_types(address, key):
+        try:
+            node = index.resource(list(address))
+        except Exception:
+            return None
+
+        if node is None:
+            return None
+
+        return key in node.get("c", {})
+
+    return child_types
+
+
+def _resource_records(events, address, child_types):
+    """Yields the records of a resource whose start_map has been consumed"""
+
+    for event, key in events:
+        if event == "end_map":
+            return
+
+        event, value = next(events)
+
+        if event == "start_map" and _is_child_type(events, address, key, child_types):
+            yield from _children_records(events, address + (key,), child_types)
+        else:
+            yield list(address), key, _value(event, value, events)
+
+
+def _children_records(events, address, child_types):
+    """Yields the records of every child resource of one type, the start_map of the type has been consumed"""
+
+    for event, name in events:
+        if event == "end_map":
+            return
+
+        event, _ = next(events)
+
+        if event == "start_map":
+            yield from _resource_records(events, address + (name,), child_types)
+
+        # An undefined child (null) has no records
+
+
+def _is_child_type(events, address, key, child_types):
+    """Returns True if the object starting in events, the value of key, holds child resources"""
+
+    if child_types is not None:
+        known = child_types(address, key)
+        if known is not None:
+            return known
+
+    following = events.peek(2)
+
+    return len(following) == 2 and following[0][0] == "map_key" and following[1][0] == "start_map"
+
+
+def _value(event, value, events):
+    """Returns the complete value starting with event, consuming the events of a nested object or array"""
+
+    if event == "value":
+        return value
+
+    if event == "start_map":
+        values = {}
+
+        for event, key in events:
+            if event == "end_map":
+                return values
+
+            values[key] = _value(*next(events), events)
+
+    if event == "start_array":
+        values = []
+
+        for event, value in events:
+            if event == "end_array":
+                return values
+
+            values.append(_value(event, value, events))
+
+    raise JSONDecodeError(f'Unexpected {event}', '', 0)
@@ -0,0 +1,352 @@
+"""
+jboss_tree.py
+
+Lazy, cached object model of the JBOSS management resource tree
+
+    root = client.root
+    for data_source in root['subsystem']['datasources']['data-source']:
+        print(data_source.name, data_source['statistics']['pool'].runtime_attributes["ActiveCount"])
+
+A Resource is an address, in the list form returned by convert.get_path_to_resource, and a Children is the resources
+of one child type under a resource. Neither holds any data: the first access to the attributes or children of a
+resource reads it with one composite operation of read-children-types and read-resource, and keeps the result in the
+ResourceTree of the client for a time to live. Runtime attributes, such as pool statistics, are read on their own with
+a much shorter time to live.
+
+The tree keeps at most maxsize entries, dropping the least recently used ones, so walking a large model does not
+keep all of it in memory. The limit is an entry count, not a memory size: a resource takes one entry for its
+attributes and children and another for its runtime attributes, however large they are. Iterating a Children reads
+the siblings that are not cached yet in parallel, in the order they are yielded. Writes sent through the same
+JBossClient drop the cached resources they change.
+"""
+
+import convert.convert as convert
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import logging
+import threading
+import time
+
+from jboss_cache import DEFAULT_TTL
+from jboss_client import OperationFailed, SingleFlight, management_url
+
+DEFAULT_RUNTIME_TTL = 1
+DEFAULT_MAXSIZE = 1024
+
+RESOURCE_ENTRY = "resource"
+RUNTIME_ENTRY = "runtime"
+
+
+class ResourceTree:
+    """Reads and caches the resources of one JBOSS server for Resource and Children
+
+    Parameters
+    ----------
+    client: jboss_client.JBossClient
+        The client used to call JBOSS, the tree reads its default URL and port
+    ttl: float
+        Seconds the attributes and children of a resource stay valid
+    runtime_ttl: float
+        Seconds the runtime attributes of a resource stay valid, 0 reads them on every access
+    maxsize: int
+        Maximum number of cached entries, not bytes. Each resource takes up to two, see RESOURCE_ENTRY and
+        RUNTIME_ENTRY
+    max_workers: int
+        Maximum number of siblings read at the same time, defaults to the connection pool size of the client
+
+    """
+
+    def __init__(self, client, ttl=DEFAULT_TTL, runtime_ttl=DEFAULT_RUNTIME_TTL, maxsize=DEFAULT_MAXSIZE,
+                 max_workers=None):
+        self.client = client
+        self.host = management_url(client.url, client.port)
+        self.ttl = ttl
+        self.runtime_ttl = runtime_ttl
+        self.max_workers = max_workers or client.pool_maxsize
+
+        self._entries = convert.LRUCache(maxsize)
+        self._single_flight = SingleFlight()
+        self._counters = {"reads": 0, "prefetched": 0, "invalidations": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def root(self):
+        """The root resource of the server"""
+
+        return Resource(self, [])
+
+    def resource(self, cli_address):
+        """Returns the resource at a CLI address, E.g /subsystem=datasources/data-source=ExampleDS"""
+
+        address = convert.get_path_to_resource(cli_address, "POST")
+
+        if len(address) % 2:
+            raise convert.Error(f'Invalid resource address {cli_address}, expected /type=name/...')
+
+        return Resource(self, address)
+
+    def read(self, address, entry=RESOURCE_ENTRY):
+        """Returns the cached entry of an address, reading the resource when it is missing or expired
+
+        Returns
+        -------
+        dict:
+            { attributes, children: { child type: [names] } } for RESOURCE_ENTRY, the attributes including runtime
+            values for RUNTIME_ENTRY. Callers must not modify it
+
+        Raises
+        ------
+        jboss_client.OperationFailed
+            When JBOSS could not read the resource, E.g because it does not exist
+
+        """
+
+        key = (tuple(address), entry)
+        cached = self._entries.get(key)
+
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        value, _ = self._single_flight.do(key, lambda: self._fetch(key))
+        return value
+
+    def prefetch(self, addresses):
+        """Yields each address once its resource is cached, reading those that are not in parallel"""
+
+        missing = [address for address in addresses if not self.cached(address)]
+
+        if len(missing) < 2 or self.max_workers < 2:
+            yield from addresses
+            return
+
+        with self._lock:
+            self._counters["prefetched"] += len(missing)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as executor:
+            futures = {tuple(address): executor.submit(self.read, address) for address in missing}
+
+            try:
+                for address in addresses:
+                    future = futures.get(tuple(address))
+
+                    if future is not None:
+                        future.result()
+
+                    yield address
+
+            finally:
+                # Stopping the iteration early does not wait for siblings nobody asked for yet
+                for future in futures.values():
+                    future.cancel()
+
+    def cached(self, address, entry=RESOURCE_ENTRY):
+        """Returns True if the entry of an address is cached and has not expired"""
+
+        cached = self._entries.get((tuple(address), entry))
+
+        return cached is not None and cached[0] > time.monotonic()
+
+    def invalidate(self, host, address):
+        """Drops the cached resources a write to an address changes
+
+        The resource, every resource under it and its parent, whose children change when it is added or removed, are
+        dropped. Writes to another host are ignored
+
+        """
+
+        if host != self.host:
+            return
+
+        address = tuple(address)
+        parent = address[:-2]
+
+        with self._lock:
+            self._counters["invalidations"] += 1
+
+        for key in self._entries.keys():
+            if key[0][:len(address)] == address or key[0] == parent:
+                self._entries.pop(key)
+
+    def forget(self, address):
+        """Drops the cached entries of one address"""
+
+        for entry in (RESOURCE_ENTRY, RUNTIME_ENTRY):
+            self._entries.pop((tuple(address), entry))
+
+    def clear(self):
+        """Drops every cached resource"""
+
+        for key in self._entries.keys():
+            self._entries.pop(key)
+
+    def stats(self):
+        """Returns the number of resources read and prefetched, of cached entries and of invalidations"""
+
+        with self._lock:
+            return {**self._counters, "cached": len(self._entries)}
+
+    def _fetch(self, key):
+        address, entry = key
+
+        if entry == RUNTIME_ENTRY:
+            api_call = {"operation": "read-resource", "address": list(address), "include-runtime": True,
+                        "attributes-only": True}
+        else:
+            api_call = {"operation": "composite", "address": [], "steps": [
+                {"operation": "read-children-types", "address": list(address)},
+                {"operation": "read-resource", "address": list(address)},
+            ]}
+
+        logging.debug(f'Reading {entry} {_cli_address(address)}')
+        results = self.client.execute_api_call("POST", api_call)
+
+        with self._lock:
+            self._counters["reads"] += 1
+
+        if results.get("outcome") != "success":
+            raise OperationFailed(f'{_cli_address(address)}:read-resource', results)
+
+        if entry == RUNTIME_ENTRY:
+            value, ttl = results.get("result") or {}, self.runtime_ttl
+        else:
+            value, ttl = _resource_entry(results["result"]), self.ttl
+
+        if ttl > 0:
+            self._entries.put(key, (time.monotonic() + ttl, value))
+
+        return value
+
+
+class Resource:
+    """A resource of the management model, read on first access
+
+    Parameters
+    ----------
+    tree: ResourceTree
+        The tree that reads and caches the resource
+    address: list
+        The address in the list form used for HTTP POST, E.g ["subsystem", "datasources"]
+
+    """
+
+    def __init__(self, tree, address):
+        self.tree = tree
+        self.address = list(address)
+
+    def __repr__(self):
+        return f'Resource({self.cli_address})'
+
+    def __eq__(self, other):
+        return isinstance(other, Resource) and other.tree is self.tree and other.address == self.address
+
+    def __hash__(self):
+        return hash(tuple(self.address))
+
+    def __getitem__(self, child_type):
+        if child_type not in self.child_types:
+            raise KeyError(f'{self.cli_address} has no child type {child_type}')
+
+        return Children(self, child_type)
+
+    def __contains__(self, child_type):
+        return child_type in self.child_types
+
+    @property
+    def name(self):
+        """The name of the resource, None for the root"""
+
+        return self.address[-1] if self.address else None
+
+    @property
+    def cli_address(self):
+        """The address in the JBOSS CLI form, E.g /subsystem=datasources"""
+
+        return _cli_address(self.address)
+
+    @property
+    def child_types(self):
+        """The child types of the resource, E.g ["subsystem", "interface", ...] for the root"""
+
+        return list(self.tree.read(self.address)["children"])
+
+    @property
+    def attributes(self):
+        """The configuration attributes of the resource"""
+
+        return copy.deepcopy(self.tree.read(self.address)["attributes"])
+
+    @property
+    def runtime_attributes(self):
+        """The attributes of the resource including runtime values, cached for the runtime time to live"""
+
+        return copy.deepcopy(self.tree.read(self.address, RUNTIME_ENTRY))
+
+    def refresh(self):
+        """Drops the cached attributes and children of the resource, so they are read again on next access"""
+
+        self.tree.forget(self.address)
+
+
+class Children:
+    """The resources of one child type under a resource, E.g the data-source resources of the datasources subsystem
+
+    Parameters
+    ----------
+    parent: Resource
+        The resource the children are under
+    child_type: str
+        The child type, E.g data-source
+
+    """
+
+    def __init__(self, parent, child_type):
+        self.parent = parent
+        self.child_type = child_type
+
+    def __repr__(self):
+        return f'Children({self.parent.cli_address}, {self.child_type})'
+
+    def __getitem__(self, name):
+        if name not in self.names:
+            raise KeyError(f'{self.parent.cli_address} has no {self.child_type}={name}')
+
+        return self._child(name)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        """Yields every child resource, reading the siblings that are not cached yet in parallel"""
+
+        children = {tuple(child.address): child for child in map(self._child, self.names)}
+
+        for address in self.parent.tree.prefetch(list(children)):
+            yield children[tuple(address)]
+
+    @property
+    def names(self):
+        """The names of the child resources"""
+
+        return list(self.parent.tree.read(self.parent.address)["children"].get(self.child_type, []))
+
+    def _child(self, name):
+        return Resource(self.parent.tree, self.parent.address + [self.child_type, name])
+
+
+def _resource_entry(result):
+    """Returns the cached entry of a read-children-types and read-resource composite result"""
+
+    child_types = result["step-1"].get("result") or []
+    resource = result["step-2"].get("result") or {}
+
+    return {
+        "attributes": {name: value for name, value in resource.items() if name not in child_types},
+        "children": {child_type: list(resource.get(child_type) or {}) for child_type in child_types},
+    }
+
+
+def _cli_address(address):
+    return convert.format_cli_address(list(zip(address[::2], address[1::2])))
@@ -0,0 +1,120 @@
+"""
+jboss_wildcard.py
+
+Runs JBOSS CLI commands whose resource path has wildcard values on every resource they match
+
+E.g /host=*/server=*/subsystem=datasources/data-source=*:read-resource(include-runtime=true) in domain mode
+
+JBOSS expands wildcards itself for the read operations in SERVER_WILDCARD_OPERATIONS, answering a single request
+with the results of every matching resource. Any other operation is run by walking the model: the children of each
+wildcard are listed with read-children-names, up to max_in_flight requests at a time, and the operation is sent to
+each concrete resource as soon as its address is known.
+
+Either way the results are yielded one concrete address at a time, E.g
+    ("/host=master/server=server-one/subsystem=datasources/data-source=ExampleDS", {"outcome": "success", ...})
+"""
+
+import convert.convert as convert
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import logging
+
+DEFAULT_MAX_IN_FLIGHT = 8
+
+# Operations JBOSS runs on every resource matched by a wildcard address
+SERVER_WILDCARD_OPERATIONS = {"read-resource", "read-attribute", "read-resource-description"}
+
+
+def wildcard_results(client, cli_command, max_in_flight=DEFAULT_MAX_IN_FLIGHT, deadline=None):
+    """Runs a JBOSS CLI command on every resource matched by its wildcard address and yields the results
+
+    Parameters
+    ----------
+    client: jboss_client.JBossClient
+        The client used to call JBOSS
+    cli_command: str
+        The JBOSS CLI command, with * as the value of one or more resource path elements
+    max_in_flight: int
+        Maximum number of HTTP requests running at the same time while walking the model
+    deadline: float
+        time.monotonic() value by which every request has to complete
+
+    Yields
+    ------
+    tuple:
+        (address, results), address being the concrete CLI resource path and results the normalized
+        { outcome, result } structure of the command on that resource. When a wildcard cannot be expanded, address
+        still holds the wildcards below the resource that failed
+
+    """
+
+    elements, operation = convert.split_command(cli_command)
+    api_call = convert.cached_jboss_command_to_http_request(cli_command, "POST")
+
+    if api_call["operation"] in SERVER_WILDCARD_OPERATIONS:
+        yield from _server_results(client, cli_command, elements, deadline)
+    else:
+        yield from _walk_results(client, elements, operation, max(1, max_in_flight), deadline)
+
+
+def _server_results(client, cli_command, elements, deadline):
+    """Yields the results of a command JBOSS expands the wildcards of itself"""
+
+    try:
+        results = client.execute(cli_command, deadline=deadline)
+    except Exception as err:
+        results = {"outcome": "failed", "failure-description": str(err)}
+
+    if results.get("outcome") != "success":
+        yield convert.format_cli_address(elements), results
+        return
+
+    # Each matched resource has its own { address, outcome, result }, the address as a list of { type: name }
+    for step in results.get("result") or []:
+        address = [(key, value) for element in step.get("address", []) for key, value in element.items()]
+        yield convert.format_cli_address(address), {key: value for key, value in step.items() if key != "address"}
+
+
+def _walk_results(client, elements, operation, max_in_flight, deadline):
+    """Yields the results of a command on every resource found by listing the children of its wildcards"""
+
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        def schedule(prefix, position):
+            # Concrete elements are copied as they are, up to the next wildcard
+            while position < len(elements) and elements[position][1] != convert.WILDCARD:
+                prefix = prefix + [elements[position]]
+                position += 1
+
+            address = convert.format_cli_address(prefix)
+
+            if position == len(elements):
+                cli_command = address + operation
+            else:
+                cli_command = f'{address}:read-children-names(child-type={elements[position][0]})'
+
+            logging.debug(f'Walking {cli_command}')
+            running[executor.submit(client.execute, cli_command, None, None, deadline)] = (prefix, position)
+
+        schedule([], 0)
+
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                prefix, position = running.pop(future)
+
+                try:
+                    results = future.result()
+                except Exception as err:
+                    results = {"outcome": "failed", "failure-description": str(err)}
+
+                if position == len(elements):
+                    yield convert.format_cli_address(prefix), results
+
+                elif results.get("outcome") != "success":
+                    yield convert.format_cli_address(prefix + elements[position:]), results
+
+                else:
+                    for name in results.get("result") or []:
+                        schedule(prefix + [(elements[position][0], name)], position + 1)
@@ -0,0 +1,104 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+import unittest
+from unittest import mock
+import jboss_api
+from benchmarks.standin import StandInServer
+from jboss_api import call_jboss_api_batch, call_jboss_api_dry_run
+
+LATENCY = 0.05
+
+
+class TestBatchTestCase(unittest.TestCase):
+    """Test case for jboss_api --batch against the stand-in server"""
+
+    def setUp(self):
+        self.server = StandInServer(latency=LATENCY).start()
+        self.addCleanup(self.server.stop)
+
+        configuration = mock.patch.multiple(jboss_api, JBOSS_URL=self.server.url, JBOSS_PORT=str(self.server.port),
+                                            API_AUTH_USER="admin", API_AUTH_PWD="admin")
+        configuration.start()
+        self.addCleanup(configuration.stop)
+        self.addCleanup(lambda: jboss_api.get_client().close())
+
+    def batch(self, lines, max_in_flight):
+        """Returns the failures and records of a batch run"""
+
+        output = io.StringIO()
+        failures = call_jboss_api_batch(lines, output, max_in_flight=max_in_flight)
+
+        return failures, [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_input_order(self):
+        """See if results are written in input order when later commands complete first, skipping comments"""
+
+        batch_result = jboss_api._batch_result
+
+        def slower_first(line_number, cli_command, deadline=None):
+            time.sleep(0.2 / line_number)
+            return batch_result(line_number, cli_command, deadline)
+
+        lines = ["# runbook", ":read-attribute(name=one)", "", "  :read-attribute(name=two)  ",
+                 "/subsystem=missing:read-resource", ":read-attribute(name=three)"]
+
+        with mock.patch.object(jboss_api, "_batch_result", slower_first):
+            failures, records = self.batch(lines, max_in_flight=4)
+
+        self.assertEqual([(record["line"], record["command"]) for record in records], [
+            (2, ":read-attribute(name=one)"), (4, ":read-attribute(name=two)"),
+            (5, "/subsystem=missing:read-resource"), (6, ":read-attribute(name=three)"),
+        ])
+        self.assertEqual([record["outcome"] for record in records], ["success", "success", "failed", "success"])
+        self.assertEqual(records[0]["result"], "value-of-one")
+        self.assertIn("WFLYCTL0216", records[2]["failure-description"])
+        self.assertEqual(failures, 1)
+
+    def test_max_in_flight(self):
+        """See if no more than max_in_flight commands are sent at the same time"""
+
+        failures, records = self.batch([f':read-attribute(name=attribute-{position})' for position in range(8)],
+                                       max_in_flight=3)
+
+        self.assertEqual(failures, 0)
+        self.assertEqual(len(records), 8)
+        self.assertEqual(self.server.max_in_flight, 3)
+
+
+class TestDryRunTestCase(unittest.TestCase):
+    """Test case for jboss_api --dry-run"""
+
+    def test_api_calls(self):
+        """See if every command is written with its request type and API call, and failures are counted"""
+
+        output = io.StringIO()
+        failures = call_jboss_api_dry_run([':read-attribute(name=server-state)', '# comment', ':read-resource('],
+                                          output)
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+
+        self.assertEqual(failures, 1)
+        self.assertEqual(records[0], {"line": 1, "command": ":read-attribute(name=server-state)",
+                                      "request_type": "GET",
+                                      "api_call": {"operation": "attribute", "name": "server-state"}})
+        self.assertEqual(records[1]["line"], 3)
+        self.assertEqual(records[1]["outcome"], "failed")
+
+    def test_http_stack_is_not_imported(self):
+        """See if --dry-run runs without importing requests"""
+
+        check = ("import sys, jboss_api; jboss_api.main(['--dry-run', ':whoami']); "
+                 "sys.exit(int('requests' in sys.modules or 'urllib3' in sys.modules))")
+        process = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True,
+                                 cwd=os.path.dirname(os.path.abspath(__file__)))
+
+        self.assertEqual(process.returncode, 0, process.stderr)
+        self.assertEqual(json.loads(process.stdout)["api_call"], {"operation": "whoami"})
+
+
+if __name__ == '__main__':
+    unittest.main()
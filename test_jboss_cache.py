@@ -0,0 +1,169 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from benchmarks.standin import StandInServer
+from convert.model_index import ModelIndex
+from jboss_cache import ResponseCache
+from jboss_client import JBossClient
+
+HOST = 'http://localhost:9990/management'
+RESULTS = {"outcome": "success", "result": {"name": "default-server"}}
+
+READ_ATTRIBUTE = {"read-only": True, "request-properties": {"name": {"type": "STRING", "required": True}}}
+DESCRIPTION = {
+    "attributes": {
+        "name": {"type": "STRING", "storage": "configuration"},
+        "server-state": {"type": "STRING", "storage": "runtime"}
+    },
+    "operations": {"read-attribute": READ_ATTRIBUTE}
+}
+
+
+class TestResponseCacheTestCase(unittest.TestCase):
+    """Test case for jboss_cache.ResponseCache"""
+
+    def setUp(self):
+        self.cache = ResponseCache(ttl=60)
+
+    def test_equivalent_commands_share_an_entry(self):
+        """See if different spellings of the same command hit the same entry"""
+
+        self.cache.put(HOST, '/subsystem=undertow:read-resource(recursive=true,attributes-only=true)', RESULTS)
+        result = self.cache.get(HOST, ' /subsystem=undertow : read-resource( attributes-only=true, recursive=true )')
+        self.assertEqual(result, RESULTS)
+
+    def test_hits_are_copies(self):
+        """See if modifying a cached result leaves the entry intact"""
+
+        self.cache.put(HOST, ':read-resource', RESULTS)
+        self.cache.get(HOST, ':read-resource')["result"]["name"] = "changed"
+        self.assertEqual(self.cache.get(HOST, ':read-resource'), RESULTS)
+
+    def test_only_cacheable_results_are_kept(self):
+        """See if failures, POST operations and runtime reads are not cached"""
+
+        self.cache.put(HOST, ':read-resource', {"outcome": "failed", "failure-description": "WFLYCTL0030"})
+        self.cache.put(HOST, ':whoami', RESULTS)
+        self.cache.put(HOST, '/subsystem=undertow:read-resource(include-runtime=true)', RESULTS)
+        self.assertIsNone(self.cache.get(HOST, ':read-resource'))
+        self.assertIsNone(self.cache.get(HOST, ':whoami'))
+        self.assertIsNone(self.cache.get(HOST, '/subsystem=undertow:read-resource(include-runtime=true)'))
+
+    def test_read_attribute_needs_a_configuration_attribute(self):
+        """See if read-attribute is only cached for attributes the model index describes as configuration"""
+
+        index = ModelIndex.from_description(DESCRIPTION, "WildFly_Full-18.0.1.Final-10.0.0")
+
+        self.cache.put(HOST, ':read-attribute(name=name)', RESULTS)
+        self.cache.put(HOST, ':read-attribute(name=server-state)', RESULTS, index)
+        self.assertIsNone(self.cache.get(HOST, ':read-attribute(name=name)'))
+        self.assertIsNone(self.cache.get(HOST, ':read-attribute(name=server-state)'))
+
+        self.cache.put(HOST, ':read-attribute(name=name)', RESULTS, index)
+        self.assertEqual(self.cache.get(HOST, ':read-attribute(name=name)'), RESULTS)
+
+    def test_expired_entries_are_misses(self):
+        """See if an entry is dropped after its time to live"""
+
+        cache = ResponseCache(ttl=0.01)
+        cache.put(HOST, ':read-resource', RESULTS)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get(HOST, ':read-resource'))
+
+    def test_write_invalidates_address_children_and_parents(self):
+        """See if a write drops the entries of its address, the addresses under it and its parents only"""
+
+        reads = [
+            ':read-resource(recursive=true)',
+            '/subsystem=undertow:read-resource',
+            '/subsystem=undertow/server=default-server:read-resource',
+            '/subsystem=undertow/server=default-server/host=default-host:read-resource',
+            '/subsystem=ee:read-resource'
+        ]
+        for read in reads:
+            self.cache.put(HOST, read, RESULTS)
+
+        self.cache.observe(HOST, '/subsystem=undertow/server=default-server:write-attribute(name=a,value=b)')
+
+        self.assertEqual([self.cache.get(HOST, read) is not None for read in reads],
+                         [False, False, False, False, True])
+
+    def test_reads_do_not_invalidate(self):
+        """See if read only POST operations leave the cache intact"""
+
+        self.cache.put(HOST, '/subsystem=undertow:read-resource', RESULTS)
+        self.cache.observe(HOST, '/subsystem=undertow:read-children-names(child-type=server)')
+        self.assertEqual(self.cache.get(HOST, '/subsystem=undertow:read-resource'), RESULTS)
+
+
+class TestResponseCacheDiskTestCase(unittest.TestCase):
+    """Test case for the on-disk tier of jboss_cache.ResponseCache"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_entries_are_shared_between_caches(self):
+        """See if an entry written by one cache is read by another using the same directory"""
+
+        ResponseCache(ttl=60, directory=self.directory).put(HOST, '/subsystem=undertow:read-resource', RESULTS)
+
+        cache = ResponseCache(ttl=60, directory=self.directory)
+        self.assertEqual(cache.get(HOST, '/subsystem=undertow:read-resource'), RESULTS)
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+
+    def test_write_invalidates_disk_entries(self):
+        """See if a write removes the on-disk entries of its address and its parents"""
+
+        ResponseCache(ttl=60, directory=self.directory).put(HOST, '/subsystem=undertow:read-resource', RESULTS)
+        ResponseCache(ttl=60, directory=self.directory).put(HOST, ':read-resource', RESULTS)
+
+        cache = ResponseCache(ttl=60, directory=self.directory)
+        cache.observe(HOST, '/subsystem=undertow/server=default-server:remove')
+
+        self.assertIsNone(cache.get(HOST, '/subsystem=undertow:read-resource'))
+        self.assertIsNone(cache.get(HOST, ':read-resource'))
+
+    def test_address_elements_stay_inside_directory(self):
+        """See if address elements such as .. or JNDI names cannot escape the cache directory"""
+
+        cache = ResponseCache(ttl=60, directory=self.directory)
+        cache.put(HOST, '/deployment=..:read-resource', RESULTS)
+        cache.put(HOST, '/subsystem=naming/binding="java:global/a":read-resource', RESULTS)
+
+        entries = [name for _, _, names in os.walk(self.directory) for name in names]
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(cache.get(HOST, '/deployment=..:read-resource'), RESULTS)
+
+
+
+class TestResponseCacheClientTestCase(unittest.TestCase):
+    """Test case for a jboss_cache.ResponseCache used by a JBossClient"""
+
+    def setUp(self):
+        self.server = StandInServer(model={(): {"name": "default-server", "server-state": "running"}}).start()
+        self.addCleanup(self.server.stop)
+
+        index = ModelIndex.from_description(DESCRIPTION, "WildFly_Full-18.0.1.Final-10.0.0")
+        self.client = JBossClient(self.server.url, self.server.port, "admin", "admin",
+                                  response_cache=ResponseCache(ttl=60), model_index=index)
+        self.addCleanup(self.client.close)
+
+    def test_runtime_attribute_is_always_fetched(self):
+        """See if a runtime read-attribute reaches the server on every call and a configuration one only once"""
+
+        for _ in range(3):
+            self.assertEqual(self.client.execute(':read-attribute(name=server-state)')["result"], "running")
+        self.assertEqual(self.server.requests, 3)
+
+        for _ in range(3):
+            self.assertEqual(self.client.execute(':read-attribute(name=name)')["result"], "default-server")
+        self.assertEqual(self.server.requests, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import threading
+import time
+import unittest
+from benchmarks.standin import StandInServer
+from convert import timing
+from jboss_client import JBossClient, SingleFlight, _read_only, management_url
+
+
+class TestSingleFlightTestCase(unittest.TestCase):
+    """Test case for jboss_client.SingleFlight"""
+
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def slow_call(self, value=None, error=None):
+        """Returns a function that blocks until released, counting how often it runs"""
+
+        def call():
+            self.calls += 1
+            self.started.set()
+            self.release.wait(5)
+
+            if error is not None:
+                raise error
+
+            return value
+
+        return call
+
+    def run_concurrently(self, count, function):
+        """Runs count callers of the same key, the first one starting before the others, and returns their outcomes"""
+
+        outcomes = [None] * count
+
+        def caller(position):
+            try:
+                outcomes[position] = self.flight.do("key", function)
+            except Exception as err:
+                outcomes[position] = err
+
+        threads = [threading.Thread(target=caller, args=(position,)) for position in range(count)]
+        threads[0].start()
+        self.started.wait(5)
+
+        for thread in threads[1:]:
+            thread.start()
+
+        # Give the followers time to find the call in flight before it completes
+        time.sleep(0.1)
+
+        self.release.set()
+
+        for thread in threads:
+            thread.join(5)
+
+        return outcomes
+
+    def test_concurrent_calls_are_shared(self):
+        """See if concurrent callers of one key share a single call"""
+
+        outcomes = self.run_concurrently(5, self.slow_call("result"))
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(sorted(shared for _, shared in outcomes), [False, True, True, True, True])
+        self.assertTrue(all(value == "result" for value, _ in outcomes))
+
+    def test_errors_are_shared(self):
+        """See if every caller receives the exception of the shared call"""
+
+        outcomes = self.run_concurrently(3, self.slow_call(error=ValueError("down")))
+
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(isinstance(outcome, ValueError) for outcome in outcomes))
+
+    def test_sequential_calls_are_not_shared(self):
+        """See if a call that completed is not reused"""
+
+        self.release.set()
+        self.flight.do("key", self.slow_call(1))
+        self.assertEqual(self.flight.do("key", self.slow_call(2)), (2, False))
+        self.assertEqual(self.calls, 2)
+
+    def test_read_only(self):
+        """See if only operations that never change the model are coalesced"""
+
+        self.assertTrue(_read_only("GET", {"operation": "resource"}))
+        self.assertTrue(_read_only("POST", {"operation": "read-children-names"}))
+        self.assertTrue(_read_only("POST", {"operation": "whoami"}))
+        self.assertFalse(_read_only("POST", {"operation": "write-attribute"}))
+        self.assertTrue(_read_only("POST", {"operation": "composite", "steps": [{"operation": "read-resource"}]}))
+
+        steps = [{"operation": "read-resource"}, {"operation": "remove"}]
+        self.assertFalse(_read_only("POST", {"operation": "composite", "steps": steps}))
+
+
+class TestPoolingTestCase(unittest.TestCase):
+    """Test case for the pooled sessions of jboss_client.JBossClient against the stand-in server"""
+
+    def test_session_and_nonce_are_reused(self):
+        """See if only the first request answers a digest challenge, and every request shares one connection"""
+
+        with StandInServer() as server, JBossClient(server.url, server.port, "admin", "admin") as client:
+            host = management_url(server.url, server.port)
+
+            results = [client.execute(':read-attribute(name=server-state)'),
+                       client.execute('/subsystem=undertow:write-attribute(name=statistics-enabled,value=true)'),
+                       client.execute(':read-resource')]
+
+            self.assertEqual([result["outcome"] for result in results], ["success"] * 3)
+            self.assertIs(client._session(host), client._session(host))
+            self.assertEqual(client._session(host).auth._thread_local.last_nonce, server.nonce)
+
+            stats = client.stats()[host]
+            self.assertEqual(stats["requests"], 3)
+            self.assertEqual(stats["auth_retries"], 1)
+            self.assertEqual(stats["connections_opened"], 1)
+
+            # The 401 challenge and the three requests all went over the first connection
+            self.assertEqual(stats["connections_reused"], 3)
+            self.assertEqual(server.requests, 3)
+
+    def test_wrong_password(self):
+        """See if a rejected challenge is answered once, and not counted as a successful retry"""
+
+        with StandInServer() as server, JBossClient(server.url, server.port, "admin", "wrong") as client:
+            response, results = client.request(':read-attribute(name=server-state)')
+
+            self.assertEqual(response.status_code, 401)
+            self.assertIsNone(results)
+            self.assertEqual(server.requests, 0)
+            self.assertEqual(client.stats()[management_url(server.url, server.port)]["auth_retries"], 0)
+
+    def test_requests_are_timed_per_operation(self):
+        """See if the request phase is recorded under the CLI operation of each command"""
+
+        timing.reset()
+        timing.enable()
+        self.addCleanup(timing.reset)
+        self.addCleanup(timing.disable)
+
+        with StandInServer() as server, JBossClient(server.url, server.port, "admin", "admin") as client:
+            client.execute(':read-attribute(name=server-state)')
+            client.execute('/subsystem=undertow:write-attribute(name=statistics-enabled,value=true)')
+
+        histograms = timing.histograms()
+        self.assertEqual(histograms[("request", "read-attribute")]["count"], 1)
+        self.assertEqual(histograms[("request", "write-attribute")]["count"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
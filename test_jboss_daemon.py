@@ -0,0 +1,131 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+import jboss_api
+from benchmarks.standin import StandInServer
+from jboss_api import run_command
+from jboss_daemon import Daemon, DaemonUnavailable, _daemon_request, call
+
+
+def fake_run_command(cli_command, output, output_format):
+    """Writes the command back, failing for commands starting with bad"""
+
+    if cli_command.startswith("slow"):
+        time.sleep(0.5)
+
+    if cli_command.startswith("bad"):
+        return 1, {"type": "UnknownCommand", "message": f'Unknown command ({cli_command})'}
+
+    output.write(f'{output_format}:{cli_command}\n')
+    return 0, None
+
+
+class TestDaemonTestCase(unittest.TestCase):
+    """Test case for jboss_daemon.Daemon and call"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.directory.name, "daemon.sock")
+
+        self.daemon = Daemon(self.socket_path, fake_run_command)
+        threading.Thread(target=self.daemon.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.daemon.shutdown()
+        self.daemon.server_close()
+        self.directory.cleanup()
+
+    def test_call(self):
+        """See if commands are answered with their output and exit status"""
+
+        self.assertEqual(call(':whoami', "ndjson", self.socket_path),
+                         {"status": 0, "output": "ndjson::whoami\n", "error": None})
+
+        response = call('bad:whoami', None, self.socket_path)
+        self.assertEqual(response["status"], 1)
+        self.assertEqual(response["error"]["type"], "UnknownCommand")
+
+        self.assertEqual(os.stat(self.socket_path).st_mode & 0o777, 0o600)
+
+    def test_single_daemon(self):
+        """See if a second daemon refuses the socket of a running one, and the socket is removed on close"""
+
+        with self.assertRaises(OSError):
+            Daemon(self.socket_path, fake_run_command)
+
+        self.daemon.shutdown()
+        self.daemon.server_close()
+        self.assertFalse(os.path.exists(self.socket_path))
+
+        with self.assertRaises(DaemonUnavailable):
+            call(':whoami', None, self.socket_path)
+
+
+    def test_timeout(self):
+        """See if a daemon that does not answer in time is reported as unavailable, so the command runs in process"""
+
+        with self.assertRaises(DaemonUnavailable):
+            call('slow:whoami', None, self.socket_path, timeout=0.05)
+
+
+class TestShimTestCase(unittest.TestCase):
+    """Test case for the arguments jboss_daemon sends to the daemon"""
+
+    def test_daemon_request(self):
+        """See if only a single command with an optional known format goes to the daemon"""
+
+        self.assertEqual(_daemon_request([':whoami']), (':whoami', None))
+        self.assertEqual(_daemon_request([':whoami', '--format', 'csv']), (':whoami', 'csv'))
+        self.assertEqual(_daemon_request(['--format=tsv', ':whoami']), (':whoami', 'tsv'))
+
+        self.assertIsNone(_daemon_request([]))
+        self.assertIsNone(_daemon_request(['--batch', 'commands.txt']))
+        self.assertIsNone(_daemon_request([':whoami', '--format', 'xml']))
+        self.assertIsNone(_daemon_request([':whoami', ':read-resource']))
+
+    def test_errors_are_structured(self):
+        """See if a command that cannot be converted is returned as an error instead of exiting"""
+
+        status, error = run_command(':read-resource(recursive=true', None)
+
+        self.assertEqual(status, 1)
+        self.assertEqual(error["type"], "UnknownCommand")
+
+
+
+class TestRunCommandTestCase(unittest.TestCase):
+    """Test case for jboss_api.run_command, the function the daemon runs commands with, against the stand-in server"""
+
+    def setUp(self):
+        self.server = StandInServer(model={
+            ("host", "master", "server", "server-one"): {"server-state": "running"},
+            ("host", "master", "server", "server-two"): {"server-state": "stopped"}
+        }).start()
+        self.addCleanup(self.server.stop)
+
+        configuration = mock.patch.multiple(jboss_api, JBOSS_URL=self.server.url, JBOSS_PORT=str(self.server.port),
+                                            API_AUTH_USER="admin", API_AUTH_PWD="admin")
+        configuration.start()
+        self.addCleanup(configuration.stop)
+        self.addCleanup(lambda: jboss_api.get_client().close())
+
+    def test_wildcard_command(self):
+        """See if a command with wildcards is expanded as on the command line, one result per matched resource"""
+
+        output = io.StringIO()
+        status, error = run_command('/host=*/server=*:read-attribute(name=server-state)', output)
+
+        self.assertEqual((status, error), (0, None))
+        self.assertEqual([json.loads(line) for line in output.getvalue().splitlines()], [
+            {"address": "/host=master/server=server-one", "outcome": "success", "result": "running"},
+            {"address": "/host=master/server=server-two", "outcome": "success", "result": "stopped"}
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
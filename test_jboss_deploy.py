@@ -0,0 +1,131 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from benchmarks.standin import StandInServer
+from jboss_client import JBossClient
+from jboss_deploy import ADDED, ENABLED, REPLACED, SKIPPED, MultipartBody, deploy, file_sha1
+
+CONTENT = os.urandom(200000)
+
+
+class TestDeployTestCase(unittest.TestCase):
+    """Test case for jboss_deploy"""
+
+    def setUp(self):
+        archive = tempfile.NamedTemporaryFile(suffix=".ear", delete=False)
+        archive.write(CONTENT)
+        archive.close()
+
+        self.path = archive.name
+        self.name = os.path.basename(archive.name)
+        self.sha1 = hashlib.sha1(CONTENT).hexdigest()
+
+        self.server = StandInServer().start()
+        self.addCleanup(self.server.stop)
+
+        self.client = JBossClient(self.server.url, self.server.port, "admin", "admin")
+        self.addCleanup(self.client.close)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_multipart_body(self):
+        """See if the body holds both parts, has the length it sends and rewinds for a digest challenge"""
+
+        operation = {"operation": "add", "address": ["deployment", "app.ear"]}
+        body = MultipartBody(operation, io.BytesIO(CONTENT), len(CONTENT), "app.ear")
+
+        first = body.read(7) + body.read(len(body))
+        self.assertEqual(len(first), len(body))
+        self.assertEqual(body.read(10), b'')
+        self.assertEqual(body.sha1.hexdigest(), self.sha1)
+
+        body.seek(0)
+        self.assertEqual(body.tell(), 0)
+        self.assertEqual(body.read(len(body)), first)
+        self.assertEqual(body.sha1.hexdigest(), self.sha1)
+
+        boundary = body.content_type.split("boundary=")[1].encode()
+        parts = first.split(b'--' + boundary)
+        self.assertEqual(len(parts), 4)
+        self.assertEqual(json.loads(parts[1].split(b'\r\n\r\n', 1)[1]), operation)
+        self.assertEqual(parts[2].split(b'\r\n\r\n', 1)[1], CONTENT + b'\r\n')
+        self.assertEqual(parts[3], b'--\r\n')
+
+    def test_new_deployment_is_added(self):
+        """See if an archive that is not deployed is uploaded with add and hashed while it streams"""
+
+        results = deploy(self.client, self.path)
+
+        self.assertEqual(results["action"], ADDED)
+        self.assertEqual(results["sha1"], self.sha1)
+        self.assertEqual(results["outcome"], "success")
+        self.assertEqual(file_sha1(self.path, chunk_size=4096), self.sha1)
+
+        # The stand-in only accepts add for a deployment that does not exist, with the content attached
+        self.assertEqual(self.server.deployments, {self.name: hashlib.sha1(CONTENT).digest()})
+        self.assertEqual(self.server.uploads, 1)
+
+    def test_unchanged_deployment_is_skipped(self):
+        """See if an archive whose hash matches the deployed content is never uploaded"""
+
+        self.server.deployments[self.name] = hashlib.sha1(CONTENT).digest()
+
+        self.assertEqual(deploy(self.client, self.path)["action"], SKIPPED)
+        self.assertEqual(deploy(self.client, self.path, sha1=self.sha1)["action"], SKIPPED)
+        self.assertEqual(self.server.uploads, 0)
+
+        self.assertEqual(deploy(self.client, self.path, force=True)["action"], REPLACED)
+        self.assertEqual(self.server.uploads, 1)
+
+    def test_disabled_deployment_is_deployed(self):
+        """See if an unchanged archive that is not enabled is deployed without uploading it again"""
+
+        self.server.deployments[self.name] = hashlib.sha1(CONTENT).digest()
+        self.server.disabled.add(self.name)
+
+        self.assertEqual(deploy(self.client, self.path, enabled=False)["action"], SKIPPED)
+        self.assertIn(self.name, self.server.disabled)
+
+        results = deploy(self.client, self.path)
+        self.assertEqual((results["action"], results["outcome"]), (ENABLED, "success"))
+        self.assertEqual(self.server.disabled, set())
+        self.assertEqual(deploy(self.client, self.path)["action"], SKIPPED)
+        self.assertEqual(self.server.uploads, 0)
+
+    def test_not_found_status(self):
+        """See if a deployment whose read is answered with 404 instead of a failure is added"""
+
+        server = StandInServer(not_found_status=404).start()
+        self.addCleanup(server.stop)
+
+        client = JBossClient(server.url, server.port, "admin", "admin")
+        self.addCleanup(client.close)
+
+        results = deploy(client, self.path)
+        self.assertEqual((results["action"], results["outcome"]), (ADDED, "success"))
+        self.assertEqual(server.deployments, {self.name: hashlib.sha1(CONTENT).digest()})
+
+    def test_changed_deployment_is_replaced(self):
+        """See if an archive whose hash differs from the deployed content replaces it"""
+
+        self.server.deployments["app.ear"] = hashlib.sha1(b'previous').digest()
+        results = deploy(self.client, self.path, name="app.ear", enabled=False)
+
+        self.assertEqual(results["action"], REPLACED)
+        self.assertEqual(results["outcome"], "success")
+
+        # The stand-in only accepts full-replace-deployment for a deployment that exists
+        self.assertEqual(self.server.deployments["app.ear"], hashlib.sha1(CONTENT).digest())
+        self.assertFalse(self.client.execute('/deployment=app.ear:read-resource')["result"]["enabled"])
+
+        # The archive changed after it was hashed
+        results = deploy(self.client, self.path, name="app.ear", sha1=hashlib.sha1(b'other').hexdigest())
+        self.assertEqual(results["outcome"], "failed")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import base64
+import unittest
+from jboss_client import response_value
+from jboss_dmr import CONTENT_TYPE, DMRError, decode, encode, from_base64, to_base64
+
+VALUE = {
+    "outcome": "success",
+    "result": {
+        "enabled": True,
+        "max-pool-size": 20,
+        "blocking-timeout-wait-millis": 2 ** 40,
+        "huge": -2 ** 70,
+        "ratio": 0.75,
+        "jndi-name": "java:jboss/datasources/ExampleDS",
+        "connection-url": {"EXPRESSION_VALUE": "${env.DB_URL:jdbc:h2:mem:test}"},
+        "hash": {"BYTES_VALUE": base64.b64encode(bytes(range(256))).decode()},
+        "type": {"TYPE_MODEL_VALUE": "STRING"},
+        "description": "Nul \x00, accents éè and emoji \U0001F600",
+        "statistics": None,
+        "connection-properties": [{"name": "a"}, [], {}],
+    },
+}
+
+
+class FakeResponse:
+    def __init__(self, content, content_type):
+        self.content = content
+        self.headers = {"content-type": content_type}
+
+
+class TestDMRTestCase(unittest.TestCase):
+    """Test case for jboss_dmr"""
+
+    def test_round_trip(self):
+        """See if every JSON compatible value decodes to what was encoded, binary and Base64"""
+
+        self.assertEqual(decode(encode(VALUE)), VALUE)
+        self.assertEqual(from_base64(to_base64(VALUE)), VALUE)
+
+        for value in (None, True, 0, -1, 2 ** 31, "", [], {}):
+            self.assertEqual(decode(encode(value)), value)
+
+    def test_java_encoding(self):
+        """See if the bytes match what ModelNode.writeExternal writes, including modified UTF-8 strings"""
+
+        self.assertEqual(encode({"a": 1}), b'o\x00\x00\x00\x01\x00\x01aI\x00\x00\x00\x01')
+        self.assertEqual(encode("\x00"), b's\x00\x02\xc0\x80')
+        self.assertEqual(encode("\U0001F600"), b's\x00\x06\xed\xa0\xbd\xed\xb8\x80')
+        self.assertEqual(encode(2 ** 63), b'i\x00\x00\x00\x09\x00\x80' + bytes(7))
+
+        # Types the Python side never writes, read the way their JSON form is parsed
+        self.assertEqual(decode(b'J' + (2 ** 40).to_bytes(8, 'big')), 2 ** 40)
+        self.assertEqual(decode(b'd\x00\x00\x00\x01\x0f\x00\x00\x00\x01'), 1.5)
+        self.assertEqual(decode(b'p\x00\x04namel\x00\x00\x00\x00'), {"name": []})
+
+    def test_invalid_data(self):
+        """See if truncated, trailing and unknown data is rejected"""
+
+        data = encode(VALUE)
+
+        for invalid in (data[:-1], data + b'u', b'q', b's\x00\x02\xff\xff'):
+            with self.assertRaises(DMRError):
+                decode(invalid)
+
+        self.assertRaises(DMRError, from_base64, b'not base64!')
+        self.assertRaises(DMRError, encode, {"a": object()})
+        self.assertRaises(DMRError, encode, "x" * 0x10000)
+
+    def test_response_value(self):
+        """See if responses are decoded by their content type"""
+
+        self.assertEqual(response_value(FakeResponse(to_base64(VALUE), CONTENT_TYPE)), VALUE)
+
+
+if __name__ == '__main__':
+    unittest.main()
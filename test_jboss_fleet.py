@@ -0,0 +1,67 @@
+import unittest
+from benchmarks.standin import StandInServer
+from jboss_fleet import load_inventory, run_fleet
+
+LATENCY = 0.05
+
+
+class TestInventoryTestCase(unittest.TestCase):
+    """Test case for jboss_fleet.load_inventory"""
+
+    def test_load_inventory(self):
+        """See if hosts get default ports and credentials, and comments and blank lines are skipped"""
+
+        inventory = load_inventory(["# fleet", "", "jboss01.example.com", "https://jboss02.example.com:9993 ops s3cret",
+                                    "http://[::1]:9990", "[fe80::1]"], "admin", "admin")
+
+        self.assertEqual(inventory, [
+            {"url": "http://jboss01.example.com", "port": "9990", "user": "admin", "password": "admin"},
+            {"url": "https://jboss02.example.com", "port": "9993", "user": "ops", "password": "s3cret"},
+            {"url": "http://[::1]", "port": "9990", "user": "admin", "password": "admin"},
+            {"url": "http://[fe80::1]", "port": "9990", "user": "admin", "password": "admin"},
+        ])
+
+
+class TestFleetTestCase(unittest.TestCase):
+    """Test case for jboss_fleet.run_fleet against the stand-in server"""
+
+    def setUp(self):
+        self.server = StandInServer(latency=LATENCY).start()
+        self.addCleanup(self.server.stop)
+
+    def host(self, name="127.0.0.1"):
+        return f'http://{name}:{self.server.port} admin admin'
+
+    def commands(self, count):
+        # Distinct reads, which the client would otherwise coalesce into a single request
+        return [f':read-attribute(name=attribute-{position})' for position in range(count)]
+
+    def test_per_host_cap(self):
+        """See if no more than max_per_host requests run against one host, and each result is timed"""
+
+        results = run_fleet(load_inventory([self.host()]), self.commands(6), max_concurrency=64, max_per_host=2)
+
+        self.assertEqual(len(results), 6)
+        self.assertEqual(self.server.max_in_flight, 2)
+
+        for record in results:
+            self.assertEqual(record["outcome"], "success")
+            self.assertEqual(record["host"], f'http://127.0.0.1:{self.server.port}')
+            self.assertGreaterEqual(record["elapsed_ms"], LATENCY * 1000)
+
+    def test_global_cap(self):
+        """See if no more than max_concurrency requests run across the fleet"""
+
+        # The same server under two names is two hosts to the fleet, so the server sees the requests of both
+        inventory = load_inventory([self.host(), self.host("localhost")])
+        results = run_fleet(inventory, self.commands(4), max_concurrency=3, max_per_host=4)
+
+        self.assertEqual(sorted(record["host"] for record in results),
+                         [f'http://127.0.0.1:{self.server.port}'] * 4 + [f'http://localhost:{self.server.port}'] * 4)
+        self.assertTrue(all(record["outcome"] == "success" for record in results))
+        self.assertLessEqual(self.server.max_in_flight, 3)
+        self.assertGreater(self.server.max_in_flight, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
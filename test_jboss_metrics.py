@@ -0,0 +1,130 @@
+import unittest
+from benchmarks.standin import StandInServer
+from jboss_client import JBossClient
+from jboss_metrics import MetricsPoller, RingBuffer, load_metrics, metric_name, prometheus_text
+
+METRICS = """
+# datasource pool
+/subsystem=datasources/data-source=ExampleDS/statistics=pool ActiveCount
+/subsystem=datasources/data-source=ExampleDS/statistics=pool AvailableCount
+/core-service=platform-mbean/type=memory heap-memory-usage.used 5 jboss_heap_used_bytes
+""".splitlines()
+
+MODEL = {
+    ("subsystem", "datasources", "data-source", "ExampleDS", "statistics", "pool"): {"ActiveCount": 3,
+                                                                                     "AvailableCount": "20"},
+    ("core-service", "platform-mbean", "type", "memory"): {"heap-memory-usage": {"used": 1024, "max": 2048}},
+    ("subsystem", "undertow"): {"ActiveCount": 1, "AvailableCount": 2},
+}
+
+
+class TestMetricsTestCase(unittest.TestCase):
+    """Test case for jboss_metrics"""
+
+    def setUp(self):
+        self.server = StandInServer(model=MODEL).start()
+        self.addCleanup(self.server.stop)
+
+        self.client = JBossClient(self.server.url, self.server.port, "admin", "admin")
+        self.addCleanup(self.client.close)
+        self.host = f'{self.server.url}:{self.server.port}'
+
+    def test_load_metrics(self):
+        """See if metric lines are parsed with default intervals and names"""
+
+        metrics = load_metrics(METRICS, interval=10)
+
+        self.assertEqual(len(metrics), 3)
+        self.assertEqual(metrics[0].name, "jboss_active_count")
+        self.assertEqual(metrics[0].interval, 10)
+        self.assertEqual(metrics[2].name, "jboss_heap_used_bytes")
+        self.assertEqual(metrics[2].interval, 5)
+
+        with self.assertRaises(ValueError):
+            load_metrics(["/subsystem=undertow"])
+
+    def test_metric_name(self):
+        """See if attribute names become Prometheus metric names"""
+
+        self.assertEqual(metric_name("MaxWaitTime"), "jboss_max_wait_time")
+        self.assertEqual(metric_name("heap-memory-usage.used"), "jboss_heap_memory_usage_used")
+
+    def test_attributes_are_coalesced_per_address(self):
+        """See if every metric on an address is read with a single read-resource"""
+
+        with MetricsPoller([self.client], load_metrics(METRICS)) as poller:
+            samples = poller.poll()
+
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(sorted((sample.address, sample.value) for sample in samples), [
+            ("/core-service=platform-mbean/type=memory", 1024.0),
+            ("/subsystem=datasources/data-source=ExampleDS/statistics=pool", 3.0),
+            ("/subsystem=datasources/data-source=ExampleDS/statistics=pool", 20.0),
+        ])
+
+    def test_address_is_read_once_per_poll(self):
+        """See if metrics on one address with different intervals are read together, at the shortest interval"""
+
+        metrics = load_metrics(["/subsystem=undertow ActiveCount 60", "/subsystem=undertow AvailableCount 0.01"])
+
+        with MetricsPoller([self.client], metrics) as poller:
+            self.assertEqual(poller.intervals, {"/subsystem=undertow": 0.01})
+            poller.run(polls=3)
+
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(len(poller.series[(self.host, "/subsystem=undertow", "jboss_active_count")]), 3)
+
+    def test_run_polls(self):
+        """See if run stops after the requested number of polls and keeps the samples"""
+
+        polled = []
+
+        with MetricsPoller([self.client], load_metrics(METRICS[:3], interval=0.01)) as poller:
+            poller.run(polled.append, polls=3)
+
+        self.assertEqual(len(polled), 3)
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(len(poller.series[(self.host, METRICS[2].split()[0], "jboss_active_count")]), 3)
+
+    def test_unreadable_metrics_are_left_out(self):
+        """See if metrics of unknown resources or with values that are not numbers are skipped"""
+
+        metrics = load_metrics(["/subsystem=missing ActiveCount", "/core-service=platform-mbean/type=memory "
+                                "heap-memory-usage", "/subsystem=undertow ActiveCount"])
+
+        with MetricsPoller([self.client], metrics) as poller:
+            samples = poller.poll()
+
+        self.assertEqual([(sample.address, sample.value) for sample in samples], [("/subsystem=undertow", 1.0)])
+
+    def test_prometheus_text(self):
+        """See if the latest samples are written in the text exposition format"""
+
+        with MetricsPoller([self.client], load_metrics(METRICS)) as poller:
+            poller.poll()
+            text = prometheus_text(poller.latest())
+
+        self.assertIn("# TYPE jboss_active_count gauge\n", text)
+        self.assertIn(f'jboss_active_count{{host="{self.host}",address="/subsystem=datasources/data-source='
+                      'ExampleDS/statistics=pool"} 3.0 ', text)
+
+
+class TestRingBufferTestCase(unittest.TestCase):
+    """Test case for jboss_metrics.RingBuffer"""
+
+    def test_wraps(self):
+        """See if the oldest samples are overwritten once the buffer is full"""
+
+        ring = RingBuffer(3)
+        self.assertIsNone(ring.latest())
+
+        for sample in range(5):
+            ring.append(sample, sample * 10)
+
+        self.assertEqual(len(ring), 3)
+        self.assertEqual(ring.samples(), [(2, 20), (3, 30), (4, 40)])
+        self.assertEqual(ring.latest(), (4, 40))
+
+
+if __name__ == '__main__':
+    unittest.main()
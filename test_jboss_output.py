@@ -0,0 +1,85 @@
+import io
+import json
+import unittest
+from jboss_output import dumps, flatten, get_writer
+
+SUCCESS = {"line": 1, "command": ":read-resource", "outcome": "success",
+           "result": {"name": "default-server", "alias": ["localhost", "example"], "enabled": True, "empty": {}}}
+FAILED = {"line": 2, "command": "/bad=x:read-resource", "outcome": "failed", "failure-description": "WFLYCTL0216"}
+
+
+def write(output_format, records):
+    """Returns the text written for records in an output format"""
+
+    output = io.StringIO()
+    with get_writer(output_format, output) as writer:
+        for record in records:
+            writer.write(record)
+
+    return output.getvalue()
+
+
+class TestOutputWritersTestCase(unittest.TestCase):
+    """Test case for the jboss_output writers"""
+
+    def test_json(self):
+        """See if a single record is an object and many records are an array"""
+
+        self.assertEqual(json.loads(write("json", [SUCCESS])), SUCCESS)
+        self.assertEqual(json.loads(write("json", [SUCCESS, FAILED])), [SUCCESS, FAILED])
+        self.assertEqual(write("json", []), '')
+
+    def test_ndjson(self):
+        """See if every record is a line of compact JSON"""
+
+        lines = write("ndjson", [SUCCESS, FAILED]).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [SUCCESS, FAILED])
+        self.assertNotIn(' ', lines[1].replace('read-resource', ''))
+
+    def test_pretty(self):
+        """See if records are indented"""
+
+        self.assertIn('\n  "outcome": "success"', write("pretty", [SUCCESS]))
+
+    def test_csv(self):
+        """See if results are flattened into one row per leaf, failures into a single row"""
+
+        rows = write("csv", [SUCCESS, FAILED]).splitlines()
+
+        self.assertEqual(rows[0], "line,command,outcome,key,value")
+        self.assertIn("1,:read-resource,success,alias.1,example", rows)
+        self.assertIn("1,:read-resource,success,enabled,true", rows)
+        self.assertIn("1,:read-resource,success,empty,{}", rows)
+        self.assertIn("2,/bad=x:read-resource,failed,failure-description,WFLYCTL0216", rows)
+        self.assertEqual(len(rows), 7)
+
+    def test_tsv(self):
+        """See if columns are separated by tabs"""
+
+        row = write("tsv", [FAILED]).splitlines()[1]
+        self.assertEqual(row, "2\t/bad=x:read-resource\tfailed\tfailure-description\tWFLYCTL0216")
+
+    def test_unknown_format(self):
+        """See if an unknown format is rejected"""
+
+        with self.assertRaises(ValueError):
+            get_writer("xml", io.StringIO())
+
+
+class TestEncodingTestCase(unittest.TestCase):
+    """Test case for jboss_output.dumps and jboss_output.flatten"""
+
+    def test_dumps(self):
+        """See if values orjson refuses are still encoded"""
+
+        self.assertEqual(dumps({"a": [1, None]}), '{"a":[1,null]}')
+        self.assertEqual(dumps(2 ** 70), str(2 ** 70))
+
+    def test_flatten_scalar(self):
+        """See if a scalar result is a single leaf without a path"""
+
+        self.assertEqual(list(flatten("running")), [("", "running")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+import unittest
+from benchmarks.standin import StandInServer
+from jboss_client import JBossClient
+from jboss_reconcile import DesiredStateError, load_desired, parse_desired, read_subtrees, reconcile
+
+MODEL = {
+    ("subsystem", "undertow"): {"statistics-enabled": False, "default-server": "default-server"},
+    ("subsystem", "datasources", "data-source", "ExampleDS"): {
+        "min-pool-size": 0, "max-pool-size": 20, "jndi-name": "java:jboss/datasources/ExampleDS"
+    },
+    ("subsystem", "logging", "logger", "com.arjuna"): {"level": "WARN"},
+}
+
+
+class TestReconcileTestCase(unittest.TestCase):
+    """Test case for jboss_reconcile"""
+
+    def setUp(self):
+        self.server = StandInServer(model=MODEL).start()
+        self.addCleanup(self.server.stop)
+
+        self.client = JBossClient(self.server.url, self.server.port, "admin", "admin")
+        self.addCleanup(self.client.close)
+
+    def test_reconcile(self):
+        """See if only the attributes that differ are written, in one composite operation"""
+
+        desired = parse_desired({
+            "/subsystem=undertow": {"statistics-enabled": "true", "default-server": "default-server"},
+            "/subsystem=datasources/data-source=ExampleDS": {"min-pool-size": "0", "max-pool-size": 50},
+            "/subsystem=logging/logger=com.example": {"level": "DEBUG"},
+            "/subsystem=logging/logger=com.arjuna": {"level": "WARN"},
+        })
+
+        changes, summary = reconcile(self.client, desired)
+
+        self.assertEqual(changes, [
+            {"address": "/subsystem=datasources/data-source=ExampleDS", "attribute": "max-pool-size", "from": 20,
+             "to": 50, "outcome": "success"},
+            {"address": "/subsystem=logging/logger=com.example", "attribute": "add", "from": None,
+             "to": {"level": "DEBUG"}, "outcome": "success"},
+            {"address": "/subsystem=undertow", "attribute": "statistics-enabled", "from": False, "to": "true",
+             "outcome": "success"},
+        ])
+
+        # One composite read of the three subtrees, then one composite of the three writes
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(self.server.model[("subsystem", "logging", "logger", "com.example")], {"level": "DEBUG"})
+        self.assertEqual(self.server.model[("subsystem", "datasources", "data-source", "ExampleDS")]["max-pool-size"],
+                         50)
+
+        self.assertEqual(summary, {"resources": 4, "attributes": 6, "writes": 3, "unchanged": 3, "round-trips": 2,
+                                   "round-trips-avoided": 4, "reload-required": True})
+
+        # Nothing left to write
+        changes, summary = reconcile(self.client, desired)
+        self.assertEqual((changes, summary["writes"], self.server.requests), ([], 0, 3))
+
+    def test_check(self):
+        """See if --check reports the changes without writing them, reading missing subtrees one at a time"""
+
+        desired = parse_desired({
+            "/subsystem=undertow": {"statistics-enabled": True},
+            "/subsystem=jgroups/stack=tcp": {"statistics-enabled": True},
+        })
+
+        changes, summary = reconcile(self.client, desired, check=True)
+
+        self.assertEqual([(change["address"], change["outcome"]) for change in changes],
+                         [("/subsystem=jgroups/stack=tcp", "check"), ("/subsystem=undertow", "check")])
+        self.assertEqual(summary["round-trips"], 3)
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(self.server.model, MODEL)
+
+    def test_failed_write_is_rolled_back(self):
+        """See if a write JBOSS rejects leaves every other attribute of the composite operation unwritten"""
+
+        desired = parse_desired({
+            "/subsystem=undertow": {"statistics-enabled": True},
+            "/subsystem=missing/stack=tcp": {"statistics-enabled": True},
+        })
+
+        changes, summary = reconcile(self.client, desired)
+
+        self.assertEqual([change["outcome"] for change in changes], ["failed", "failed"])
+        self.assertEqual(self.server.model, MODEL)
+
+    def test_load_desired(self):
+        """See if desired configurations are parsed, and unusable ones rejected"""
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "desired.json")
+
+            with open(path, 'w') as desired_file:
+                json.dump({"/subsystem=undertow": {"statistics-enabled": True}}, desired_file)
+
+            self.assertEqual(load_desired(path), {("subsystem", "undertow"): {"statistics-enabled": True}})
+
+            for desired in (["/subsystem=undertow"], {"/subsystem=undertow": True}, {"subsystem undertow": {}}):
+                with self.assertRaises(DesiredStateError):
+                    parse_desired(desired)
+
+    def test_read_subtrees(self):
+        """See if resources below the same top level resource share the deepest common subtree"""
+
+        self.assertEqual(read_subtrees({
+            ("subsystem", "logging", "logger", "a"): {},
+            ("subsystem", "logging", "logger", "b"): {},
+            ("subsystem", "undertow", "server", "default-server", "host", "default-host"): {},
+            ("subsystem", "undertow", "server", "default-server"): {},
+            ("interface", "public"): {},
+        }), [("interface", "public"), ("subsystem", "logging"), ("subsystem", "undertow", "server", "default-server")])
+
+
+if __name__ == '__main__':
+    unittest.main()
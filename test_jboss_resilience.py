@@ -0,0 +1,164 @@
+import io
+import time
+import unittest
+import requests
+from jboss_client import JBossClient, management_url
+from jboss_resilience import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, DeadlineExceeded, backoff_delay, timeouts
+)
+
+HOST = management_url('http://localhost', '9990')
+
+
+class FakeResponse:
+    """Just enough of a requests.Response for JBossClient"""
+
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.history = []
+        self.headers = {}
+        self.raw = io.BytesIO()
+        self._body = body
+
+    def json(self):
+        return self._body
+
+    def close(self):
+        pass
+
+
+class TestCircuitBreakerTestCase(unittest.TestCase):
+    """Test case for jboss_resilience.CircuitBreaker"""
+
+    def test_opens_after_consecutive_failures(self):
+        """See if the breaker opens after the threshold and fails fast"""
+
+        breaker = CircuitBreaker(HOST, failure_threshold=2, reset_timeout=60)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CLOSED)
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_half_open_trial(self):
+        """See if a single trial call is let through after the reset timeout"""
+
+        breaker = CircuitBreaker(HOST, failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        breaker.before_call()
+        self.assertEqual(breaker.state, HALF_OPEN)
+
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+
+        breaker.before_call()
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(breaker.opened, 2)
+
+
+class TestTimeoutsTestCase(unittest.TestCase):
+    """Test case for jboss_resilience.timeouts and backoff_delay"""
+
+    def test_clipped_to_deadline(self):
+        """See if timeouts never outlast the deadline"""
+
+        self.assertEqual(timeouts(5, 60), (5, 60))
+
+        connect, read = timeouts(5, 60, time.monotonic() + 2)
+        self.assertLessEqual(connect, 2)
+        self.assertLessEqual(read, 2)
+
+        with self.assertRaises(DeadlineExceeded):
+            timeouts(5, 60, time.monotonic() - 1)
+
+    def test_backoff_bounds(self):
+        """See if delays stay within the exponential bound and the cap"""
+
+        for attempt in range(1, 10):
+            self.assertLessEqual(backoff_delay(attempt, 0.1, 1), min(1, 0.1 * 2 ** (attempt - 1)))
+
+
+class TestRetriesTestCase(unittest.TestCase):
+    """Test case for the retry rules of jboss_client.JBossClient"""
+
+    def client(self, answers, **options):
+        """Returns a client whose session answers with answers in turn, and the list of calls made"""
+
+        client = JBossClient(**{"retries": 2, "backoff": 0, "failure_threshold": 0, **options})
+        session = client._session(HOST)
+        calls = []
+
+        def answer(*args, **kwargs):
+            calls.append(kwargs["timeout"])
+            current = answers[min(len(calls), len(answers)) - 1]
+
+            if isinstance(current, Exception):
+                raise current
+
+            return current
+
+        session.get = session.post = answer
+
+        return client, calls
+
+    def test_reads_are_retried(self):
+        """See if read only commands are retried after timeouts and 503 answers"""
+
+        client, calls = self.client([requests.exceptions.ReadTimeout(), FakeResponse(503), FakeResponse(200, "ok")])
+
+        self.assertEqual(client.execute(':read-attribute(name=server-state)'), {"outcome": "success", "result": "ok"})
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(client.stats()[HOST]["retries"], 2)
+
+    def test_writes_are_never_retried(self):
+        """See if commands that change the model are sent only once"""
+
+        client, calls = self.client([requests.exceptions.ConnectionError(), FakeResponse(200, {"outcome": "success"})])
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            client.execute('/subsystem=undertow:write-attribute(name=statistics-enabled,value=true)')
+
+        self.assertEqual(len(calls), 1)
+
+    def test_trial_call_always_has_an_outcome(self):
+        """See if a half-open breaker closes again after trial calls that failed before or outside the request"""
+
+        client, calls = self.client([requests.exceptions.ConnectionError(), ValueError("bad body"),
+                                     FakeResponse(200, "running")], retries=0, failure_threshold=1, reset_timeout=0)
+        command = ':read-attribute(name=server-state)'
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            client.execute(command)
+
+        self.assertEqual(client.stats()[HOST]["circuit"], OPEN)
+
+        # An expired deadline never reaches the breaker
+        with self.assertRaises(DeadlineExceeded):
+            client.execute(command, deadline=time.monotonic() - 1)
+
+        self.assertEqual(client.stats()[HOST]["circuit"], OPEN)
+
+        # Neither does an error that is not a connection error or a timeout leave the breaker half-open
+        with self.assertRaises(ValueError):
+            client.execute(command)
+
+        self.assertEqual(client.stats()[HOST]["circuit"], OPEN)
+
+        self.assertEqual(client.execute(command), {"outcome": "success", "result": "running"})
+        self.assertEqual(client.stats()[HOST]["circuit"], CLOSED)
+        self.assertEqual(len(calls), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
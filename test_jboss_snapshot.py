@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+from benchmarks.standin import CONFIGURATION_CHANGES, StandInServer
+from jboss_client import JBossClient
+from jboss_snapshot import ADDED, CHANGED, REMOVED, Snapshot, diff, take_snapshot, value_hash
+
+RUNTIME = ("core-service", "platform-mbean", "type", "runtime")
+
+MODEL = {
+    (): {"name": "server-one"},
+    RUNTIME: {"start-time": 1000},
+    ("subsystem", "undertow"): {"default-server": "default-server", "statistics-enabled": False},
+    ("subsystem", "undertow", "server", "default-server"): {"default-host": "default-host"},
+    ("subsystem", "datasources", "data-source", "ExampleDS"): {"jndi-name": "java:jboss/datasources/ExampleDS"},
+}
+
+
+class TestSnapshotTestCase(unittest.TestCase):
+    """Test case for jboss_snapshot, against the stand-in server"""
+
+    def serve(self, model, history=None):
+        """Returns a client of a stand-in serving model, keeping a change history of history changes if not None"""
+
+        if history is not None:
+            model = {**model, CONFIGURATION_CHANGES: {"max-history": history}}
+
+        server = StandInServer(model=model).start()
+        self.addCleanup(server.stop)
+
+        client = JBossClient(server.url, server.port, "admin", "admin")
+        self.addCleanup(client.close)
+
+        return server, client
+
+    def snapshot(self, model, previous=None, full=False):
+        """Returns the snapshot of a stand-in serving model without a change history"""
+
+        return take_snapshot(self.serve(model)[1], previous, full)
+
+    def test_diff(self):
+        """See if only changed resources are reported, and added or removed subtrees only at their top"""
+
+        model = dict(MODEL)
+        model[("subsystem", "undertow")] = {**model[("subsystem", "undertow")], "statistics-enabled": True}
+        model[("subsystem", "jgroups", "stack", "tcp")] = {"transport": "TCP"}
+        del model[("subsystem", "datasources", "data-source", "ExampleDS")]
+
+        previous, _ = self.snapshot(MODEL)
+        snapshot, _ = self.snapshot(model)
+
+        self.assertEqual(list(diff(previous, snapshot)), [
+            {"address": "/subsystem=datasources", "change": REMOVED},
+            {"address": "/subsystem=jgroups", "change": ADDED},
+            {"address": "/subsystem=undertow", "change": CHANGED, "attributes": ["statistics-enabled"]},
+        ])
+
+        self.assertEqual(list(diff(previous, self.snapshot(MODEL)[0])), [])
+        self.assertEqual(previous.hashes[()], self.snapshot(dict(reversed(MODEL.items())))[0].hashes[()])
+
+    def test_save_and_load(self):
+        """See if a saved snapshot loads with the same hashes"""
+
+        server, client = self.serve(MODEL, history=10)
+        client.execute('/subsystem=undertow:write-attribute(name=statistics-enabled,value=false)')
+        snapshot, _ = take_snapshot(client)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "snapshots", "localhost_9990.json")
+            snapshot.save(path)
+            loaded = Snapshot.load(path)
+
+            self.assertIsNone(Snapshot.load(os.path.join(directory, "missing.json")))
+
+        self.assertEqual(loaded.nodes[("subsystem", "undertow")]["statistics-enabled"], value_hash("false"))
+        self.assertEqual(loaded.hashes, snapshot.hashes)
+        self.assertEqual(loaded.last_change, server.changes[0]["operation-date"])
+        self.assertTrue(loaded.history)
+
+    def test_incremental_snapshot(self):
+        """See if only the top level subtrees named by the change history are read again"""
+
+        server, client = self.serve(MODEL, history=10)
+        client.execute('/subsystem=undertow:write-attribute(name=statistics-enabled,value=true)')
+
+        previous, subtrees = take_snapshot(client)
+        self.assertIsNone(subtrees)
+
+        client.execute('/subsystem=undertow/server=default-server:write-attribute(name=default-host,value=other-host)')
+        requests = server.requests
+        snapshot, subtrees = take_snapshot(client, previous)
+
+        # The change history, then /subsystem=undertow:read-resource(recursive=true)
+        self.assertEqual(subtrees, [("subsystem", "undertow")])
+        self.assertEqual(server.requests - requests, 2)
+        self.assertEqual(snapshot.last_change, server.changes[0]["operation-date"])
+        self.assertEqual(list(diff(previous, snapshot)), [
+            {"address": "/subsystem=undertow/server=default-server", "change": CHANGED, "attributes": ["default-host"]}
+        ])
+
+        # Nothing changed since, so only the change history is read
+        requests = server.requests
+        self.assertEqual(take_snapshot(client, snapshot)[1], [])
+        self.assertEqual(server.requests - requests, 1)
+
+    def test_full_snapshot_when_history_cannot_tell(self):
+        """See if the whole model is read after a restart, without history or when the history overflowed"""
+
+        server, client = self.serve(MODEL, history=2)
+        client.execute('/subsystem=undertow:write-attribute(name=statistics-enabled,value=true)')
+        previous, _ = take_snapshot(client)
+
+        # The history overflowed
+        for value in ("false", "true"):
+            client.execute(f'/subsystem=undertow:write-attribute(name=statistics-enabled,value={value})')
+
+        self.assertIsNone(take_snapshot(client, previous)[1])
+
+        # The server restarted, which clears the history
+        server.model[RUNTIME]["start-time"] = 2000
+        server.changes.clear()
+        self.assertIsNone(take_snapshot(client, previous)[1])
+
+        # The server does not keep a history
+        self.assertIsNone(self.snapshot(MODEL, previous)[1])
+
+        # A history that can tell is ignored when the whole model is asked for
+        _, client = self.serve(MODEL, history=2)
+        previous, _ = take_snapshot(client)
+        self.assertEqual(take_snapshot(client, previous)[1], [])
+        self.assertIsNone(take_snapshot(client, previous, full=True)[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import unittest
+from jboss_stream import decode_chunks, json_events, resource_records, unwrap_result
+
+RESULT = {
+    "name": "default-server",
+    "statistics-enabled": False,
+    "max-post-size": 10485760,
+    "ratio": -1.5e3,
+    "properties": {"a": "b", "nested": {"c": [1, 2, None]}},
+    "handlers": ["FILE", "CONSOLEé\"\\"],
+    "host": {
+        "default-host": {"alias": ["localhost"], "location": {"/": {"handler": "welcome-content"}}},
+        "other": None
+    }
+}
+
+
+def split(text, size):
+    """Returns text split into chunks of size characters"""
+
+    return [text[position:position + size] for position in range(0, len(text), size)]
+
+
+class TestJsonEventsTestCase(unittest.TestCase):
+    """Test case for jboss_stream.json_events"""
+
+    def events_value(self, events):
+        """Rebuilds the value of a complete list of events"""
+
+        records = list(resource_records(iter([("start_array", None)] + events + [("end_array", None)])))
+        return records[0][2][0]
+
+    def test_any_chunk_size(self):
+        """See if documents split anywhere, including inside strings, numbers and literals, parse the same"""
+
+        text = json.dumps(RESULT, indent=2)
+
+        for size in (1, 2, 3, 7, len(text)):
+            self.assertEqual(self.events_value(list(json_events(split(text, size)))), RESULT)
+
+    def test_characters_split_between_byte_chunks(self):
+        """See if multi-byte characters split between chunks are decoded"""
+
+        data = json.dumps({"name": "é中"}, ensure_ascii=False).encode()
+        events = list(json_events(decode_chunks(split(data, 1))))
+        self.assertIn(("value", "é中"), events)
+
+    def test_unterminated_document(self):
+        """See if a truncated document raises an error"""
+
+        with self.assertRaises(json.JSONDecodeError):
+            list(json_events(split('{"name": "default', 4)))
+
+
+class TestResourceRecordsTestCase(unittest.TestCase):
+    """Test case for jboss_stream.resource_records"""
+
+    def test_flatten(self):
+        """See if attributes are flattened under the address of their resource"""
+
+        records = list(resource_records(json_events(split(json.dumps(RESULT), 5)), ["subsystem", "undertow"]))
+
+        self.assertIn((["subsystem", "undertow"], "name", "default-server"), records)
+        self.assertIn((["subsystem", "undertow"], "properties", RESULT["properties"]), records)
+        self.assertIn((["subsystem", "undertow", "host", "default-host"], "alias", ["localhost"]), records)
+        self.assertIn((["subsystem", "undertow", "host", "default-host", "location", "/"], "handler",
+                       "welcome-content"), records)
+        self.assertEqual(len(records), 8)
+
+    def test_child_types(self):
+        """See if child_types decides between child resources and OBJECT attributes"""
+
+        def child_types(address, key):
+            return False if key == "host" else None
+
+        records = list(resource_records(json_events([json.dumps(RESULT)]), child_types=child_types))
+        self.assertIn(([], "host", RESULT["host"]), records)
+
+    def test_scalar_result(self):
+        """See if a result that is not a resource is a single record"""
+
+        records = list(resource_records(json_events(['"running"']), ["host", "master"]))
+        self.assertEqual(records, [(["host", "master"], None, "running")])
+
+    def test_unwrap_result(self):
+        """See if the result of a { outcome, result } response is found"""
+
+        response = json.dumps({"outcome": "success", "response-headers": {"a": 1}, "result": {"name": "x"}})
+        records = list(resource_records(unwrap_result(json_events([response]))))
+        self.assertEqual(records, [([], "name", "x")])
+
+
+if __name__ == '__main__':
+    unittest.main()
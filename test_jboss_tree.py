@@ -0,0 +1,119 @@
+import unittest
+from benchmarks.standin import StandInServer
+from jboss_client import JBossClient, OperationFailed
+from jboss_tree import ResourceTree
+
+LATENCY = 0.05
+
+MODEL = {
+    (): {"name": "server-one"},
+    ("subsystem", "datasources"): {},
+    ("subsystem", "datasources", "data-source", "ExampleDS"): {"jndi-name": "java:jboss/datasources/ExampleDS"},
+    ("subsystem", "datasources", "data-source", "OtherDS"): {"jndi-name": "java:jboss/datasources/OtherDS"},
+    ("subsystem", "datasources", "data-source", "ThirdDS"): {"jndi-name": "java:jboss/datasources/ThirdDS"},
+    ("subsystem", "undertow"): {"statistics-enabled": False},
+}
+
+
+class TestResourceTreeTestCase(unittest.TestCase):
+    """Test case for jboss_tree, against the stand-in server"""
+
+    def serve(self, latency=0.0):
+        """Returns the stand-in serving MODEL and a client of it"""
+
+        server = StandInServer(latency=latency, model=MODEL).start()
+        self.addCleanup(server.stop)
+
+        client = JBossClient(server.url, server.port, "admin", "admin")
+        self.addCleanup(client.close)
+
+        return server, client
+
+    def test_navigation(self):
+        """See if each resource is read once, on first access, with its attributes and children"""
+
+        server, client = self.serve()
+        root = ResourceTree(client).root
+
+        data_sources = root['subsystem']['datasources']['data-source']
+        self.assertEqual(data_sources.names, ["ExampleDS", "OtherDS", "ThirdDS"])
+        self.assertEqual(server.requests, 2)
+
+        example = data_sources['ExampleDS']
+        self.assertEqual(example.address, ["subsystem", "datasources", "data-source", "ExampleDS"])
+        self.assertEqual(example.cli_address, "/subsystem=datasources/data-source=ExampleDS")
+        self.assertEqual(example.attributes, {"jndi-name": "java:jboss/datasources/ExampleDS"})
+        self.assertEqual(root.attributes, {"name": "server-one"})
+        self.assertEqual(root.child_types, ["subsystem"])
+        self.assertEqual(server.requests, 3)
+
+        self.assertEqual(root.tree.resource("/subsystem=datasources/data-source=ExampleDS"), example)
+
+        for missing in (lambda: root['interface'], lambda: data_sources['MissingDS']):
+            self.assertRaises(KeyError, missing)
+
+        with self.assertRaises(OperationFailed):
+            root.tree.resource("/subsystem=missing").attributes
+
+    def test_ttls(self):
+        """See if runtime attributes expire much sooner than the configuration"""
+
+        server, client = self.serve()
+        undertow = ResourceTree(client, ttl=60, runtime_ttl=0).resource("/subsystem=undertow")
+
+        self.assertEqual(undertow.runtime_attributes, {"statistics-enabled": False})
+        undertow.runtime_attributes
+        self.assertEqual(server.requests, 2)
+
+        undertow.attributes
+        undertow.attributes
+        self.assertEqual(server.requests, 3)
+
+        undertow.refresh()
+        undertow.attributes
+        self.assertEqual(server.requests, 4)
+
+    def test_parallel_prefetch(self):
+        """See if iterating children reads the siblings in parallel and in order"""
+
+        server, client = self.serve(latency=LATENCY)
+        data_sources = ResourceTree(client).root['subsystem']['datasources']['data-source']
+
+        names = [data_source.name for data_source in data_sources]
+        self.assertEqual(names, ["ExampleDS", "OtherDS", "ThirdDS"])
+        self.assertGreater(server.max_in_flight, 1)
+
+        # Everything was read, so iterating again reads nothing
+        requests = server.requests
+        self.assertEqual([data_source.attributes["jndi-name"] for data_source in data_sources],
+                         [f'java:jboss/datasources/{name}' for name in names])
+        self.assertEqual(server.requests, requests)
+        self.assertEqual(data_sources.parent.tree.stats()["prefetched"], 3)
+
+    def test_bounded_memory_and_invalidation(self):
+        """See if the tree keeps at most maxsize resources and drops those a write through the client changes"""
+
+        _, client = self.serve()
+        tree = ResourceTree(client, maxsize=2)
+
+        for data_source in tree.root['subsystem']['datasources']['data-source']:
+            data_source.attributes
+
+        self.assertEqual(tree.stats()["cached"], 2)
+
+        tree = client.root.tree
+        for data_source in tree.root['subsystem']['datasources']['data-source']:
+            data_source.attributes
+
+        self.assertTrue(tree.cached(["subsystem", "datasources"]))
+
+        client.execute('/subsystem=datasources/data-source=ThirdDS:remove')
+
+        self.assertFalse(tree.cached(["subsystem", "datasources"]))
+        self.assertFalse(tree.cached(["subsystem", "datasources", "data-source", "ThirdDS"]))
+        self.assertTrue(tree.cached(["subsystem", "datasources", "data-source", "OtherDS"]))
+        self.assertEqual(client.root['subsystem']['datasources']['data-source'].names, ["ExampleDS", "OtherDS"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from benchmarks.standin import StandInServer
+from convert import format_cli_address, get_request_type, is_wildcard_command, split_command
+from jboss_client import JBossClient
+from jboss_wildcard import wildcard_results
+
+# Domain model served by the stand-in, server-three has no datasources subsystem
+MODEL = {
+    ("host", "master", "server", "server-one"): {"server-state": "running"},
+    ("host", "master", "server", "server-one", "subsystem", "datasources"): {"statistics-enabled": False},
+    ("host", "master", "server", "server-two"): {"server-state": "running"},
+    ("host", "master", "server", "server-two", "subsystem", "datasources"): {"statistics-enabled": False},
+    ("host", "slave", "server", "server-three"): {"server-state": "stopped"},
+}
+
+
+class TestWildcardTestCase(unittest.TestCase):
+    """Test case for jboss_wildcard and the wildcard helpers of convert"""
+
+    def test_wildcard_commands(self):
+        """See if wildcard commands are recognized, sent with HTTP POST and their addresses rebuilt"""
+
+        command = '/host=*/server=*/subsystem=naming/binding="java:global/a":read-resource'
+        elements, operation = split_command(command)
+
+        self.assertTrue(is_wildcard_command(command))
+        self.assertFalse(is_wildcard_command('/subsystem=undertow:write-attribute(name=x,value=*)'))
+        self.assertEqual(get_request_type(command), "POST")
+        self.assertEqual(operation, ':read-resource')
+        self.assertEqual(format_cli_address(elements) + operation, command)
+
+    def setUp(self):
+        self.server = StandInServer(model=MODEL).start()
+        self.addCleanup(self.server.stop)
+
+        self.client = JBossClient(self.server.url, self.server.port, "admin", "admin")
+        self.addCleanup(self.client.close)
+
+    def test_server_side_expansion(self):
+        """See if reads are sent once, with the results keyed by the address of each matched resource"""
+
+        results = dict(wildcard_results(self.client, '/host=*/server=*:read-attribute(name=server-state)'))
+
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(results, {"/host=master/server=server-one": {"outcome": "success", "result": "running"},
+                                   "/host=master/server=server-two": {"outcome": "success", "result": "running"},
+                                   "/host=slave/server=server-three": {"outcome": "success", "result": "stopped"}})
+
+    def test_walk(self):
+        """See if other operations run on every resource found by walking the children of each wildcard"""
+
+        command = '/host=*/server=*/subsystem=datasources:write-attribute(name=statistics-enabled,value=true)'
+        results = dict(wildcard_results(self.client, command, max_in_flight=4))
+
+        self.assertEqual(sorted(results), [
+            "/host=master/server=server-one/subsystem=datasources",
+            "/host=master/server=server-two/subsystem=datasources",
+            "/host=slave/server=server-three/subsystem=datasources",
+        ])
+        self.assertEqual(results["/host=master/server=server-two/subsystem=datasources"]["outcome"], "success")
+        self.assertEqual(results["/host=slave/server=server-three/subsystem=datasources"]["outcome"], "failed")
+        self.assertEqual(self.server.model[("host", "master", "server", "server-two", "subsystem", "datasources")],
+                         {"statistics-enabled": "true"})
+
+        # read-children-names of the hosts and of the servers of each host, then the write on each server
+        self.assertEqual(self.server.requests, 6)
+
+    def test_unknown_resource(self):
+        """See if a wildcard below a resource that does not exist yields the failure at the unexpanded address"""
+
+        results = list(wildcard_results(self.client, '/host=backup/server=*:reload'))
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0][0], "/host=backup/server=*")
+        self.assertIn("WFLYCTL0216", results[0][1]["failure-description"])
+
+
+if __name__ == '__main__':
+    unittest.main()